@@ -0,0 +1,94 @@
+import os
+import random
+from typing import List, Dict, Any
+import fitz
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+COMPONENTS = [
+    "clock divider", "watchdog timer", "interrupt controller", "power management unit",
+    "DMA engine", "UART", "SPI master", "I2C slave", "ADC", "PWM generator",
+    "GPIO bank", "flash controller", "cache controller", "temperature sensor", "boot loader",
+]
+ACTIONS = [
+    "is reset to its default value", "must be enabled before use", "raises an interrupt",
+    "is clocked from the main oscillator", "enters low power mode", "latches the input",
+    "is configured through the control register", "reports a fault in the status register",
+    "requires a stable supply voltage", "is disabled during sleep mode",
+]
+CONDITIONS = [
+    "after power-up", "when the enable bit is set", "on every rising edge",
+    "if the timeout expires", "while the bus is idle", "during a warm reset",
+    "when the FIFO is full", "after the calibration sequence completes",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    component = rng.choice(COMPONENTS)
+    register = f"0x{rng.randrange(0, 0xFFFF):04X}"
+    return (
+        f"The {component} {rng.choice(ACTIONS)} {rng.choice(CONDITIONS)}; "
+        f"see register {register} bit {rng.randrange(32)}."
+    )
+
+
+def generate_corpus(directory: str, num_docs: int = 20, pages_per_doc: int = 10,
+                    paragraphs_per_page: int = 6, seed: int = 0) -> Dict[str, Any]:
+    """
+    Write a synthetic corpus of specification-like PDFs.
+
+    The text is built from a fixed vocabulary of components, actions and
+    conditions, so runs with the same parameters produce the same corpus.
+
+    Args:
+        directory: Output directory, created when missing
+        num_docs: Number of PDF files
+        pages_per_doc: Pages per PDF
+        paragraphs_per_page: Paragraphs of five sentences per page
+        seed: Random seed
+
+    Returns:
+        Dictionary with 'files', 'pages', 'characters' and sample 'queries'
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+
+    files = []
+    characters = 0
+    queries: List[str] = []
+
+    for doc_index in range(num_docs):
+        pdf = fitz.open()
+        for page_index in range(pages_per_doc):
+            paragraphs = [
+                " ".join(_sentence(rng) for _ in range(5))
+                for _ in range(paragraphs_per_page)
+            ]
+            text = f"Section {doc_index + 1}.{page_index + 1}\n\n" + "\n\n".join(paragraphs)
+            characters += len(text)
+
+            page = pdf.new_page()
+            rect = fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50)
+            if page.insert_textbox(rect, text, fontsize=8) < 0:
+                logger.warning(f"Text of page {page_index} in document {doc_index} does not fit, page left empty")
+
+            if rng.random() < 0.2:
+                queries.append(f"Which register is used when the {rng.choice(COMPONENTS)} {rng.choice(ACTIONS)}?")
+
+        filename = f"synthetic_spec_{doc_index:04d}.pdf"
+        pdf.save(os.path.join(directory, filename))
+        pdf.close()
+        files.append(filename)
+
+    if not queries:
+        queries.append(f"Which register is used when the {COMPONENTS[0]} {ACTIONS[0]}?")
+
+    logger.info(f"Generated {num_docs} PDFs with {num_docs * pages_per_doc} pages in {directory}")
+
+    return {
+        "files": files,
+        "pages": num_docs * pages_per_doc,
+        "characters": characters,
+        "queries": queries,
+    }
@@ -0,0 +1,380 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config.config import get_config
+from src.config.logging import setup_logging, get_logger
+from benchmarks.corpus import generate_corpus
+
+logger = get_logger(__name__)
+
+RESULTS_FORMAT = 1
+
+# Whether a larger value of a metric is better
+METRICS = {
+    "extraction_pages_per_s": True,
+    "splitting_chunks_per_s": True,
+    "embedding_chunks_per_s": True,
+    "index_build_seconds": False,
+    "retrieval_p50_ms": False,
+    "retrieval_p99_ms": False,
+    "generation_ttft_p50_ms": False,
+    "generation_tokens_per_s": True,
+}
+
+def parse_overrides(values: List[str]) -> Dict[str, Any]:
+    """
+    Parse key=value config overrides, values are read as JSON when possible.
+
+    Args:
+        values: Strings like "chunk_size=500"
+
+    Returns:
+        Dictionary of overrides
+    """
+    overrides = {}
+    for value in values:
+        key, _, raw = value.partition("=")
+        try:
+            overrides[key] = json.loads(raw)
+        except ValueError:
+            overrides[key] = raw
+    return overrides
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    """Percentile of durations in seconds, in milliseconds."""
+    return float(np.percentile(np.array(samples) * 1000.0, q)) if samples else 0.0
+
+def bench_extraction(config) -> Dict[str, Any]:
+    """
+    Extract every PDF of the corpus.
+
+    Returns:
+        Stage results including the extracted documents
+    """
+    from src.data.pdf_processor import PDFProcessor
+
+    pdf_processor = PDFProcessor(
+        config["pdf_dir"],
+        num_workers=config.get("extraction_workers"),
+        pages_per_task=config.get("extraction_pages_per_task", 100)
+    )
+
+    start = time.perf_counter()
+    documents = list(pdf_processor.iter_documents())
+    seconds = time.perf_counter() - start
+
+    pages = sum(doc["metadata"].get("page_count", 0) for doc in documents)
+    return {"documents": documents, "pages": pages, "seconds": seconds}
+
+def bench_splitting(config, documents) -> Dict[str, Any]:
+    """
+    Split the extracted documents into chunks.
+
+    Returns:
+        Stage results including the splitter and the chunks
+    """
+    from src.data.text_splitter import DocumentSplitter
+
+    doc_splitter = DocumentSplitter(chunk_size=config["chunk_size"], chunk_overlap=config["chunk_overlap"])
+
+    start = time.perf_counter()
+    chunks = doc_splitter.split_documents(documents)
+    seconds = time.perf_counter() - start
+
+    return {"splitter": doc_splitter, "chunks": chunks, "seconds": seconds}
+
+def bench_embedding(embeddings, chunks, batch_size: int) -> Dict[str, Any]:
+    """
+    Embed every chunk in ingestion-sized batches.
+
+    Returns:
+        Stage results including the vectors keyed by text
+    """
+    texts = [chunk["content"] for chunk in chunks]
+    vectors = {}
+
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        batch = texts[offset:offset + batch_size]
+        vectors.update(zip(batch, embeddings.embed_documents(batch)))
+    seconds = time.perf_counter() - start
+
+    return {"vectors": vectors, "seconds": seconds}
+
+def bench_index_build(config, embeddings, vectors, chunks) -> Dict[str, Any]:
+    """
+    Build the vector store (and lexical index) from already computed vectors.
+
+    Returns:
+        Stage results including the loaded vector store
+    """
+    from src.embeddings.vector_store import VectorStore
+    from src.data.ingestion import IngestionPipeline
+    from benchmarks.stand_ins import PrecomputedEmbeddings
+
+    vector_store_manager = VectorStore(PrecomputedEmbeddings(embeddings, vectors))
+    pipeline = IngestionPipeline(None, None, vector_store_manager)
+
+    start = time.perf_counter()
+    vector_store = vector_store_manager.create_empty()
+    if pipeline.lexical_builder:
+        pipeline.lexical_builder.clear()
+
+    for batch in pipeline.iter_batches(chunks, pipeline.batch_size):
+        vector_store_manager.add_documents(vector_store, batch)
+        if pipeline.lexical_builder:
+            pipeline.lexical_builder.add_chunks(batch)
+
+    if hasattr(vector_store, "persist"):
+        vector_store.persist()
+    if pipeline.lexical_builder:
+        pipeline.lexical_builder.build(**config.get("bm25_params", {}))
+    seconds = time.perf_counter() - start
+
+    # Searches go through a freshly loaded store, as in the applications
+    vector_store = VectorStore(embeddings).load()
+
+    return {"vector_store": vector_store, "seconds": seconds}
+
+def bench_retrieval(vector_store, tokenizer, queries: List[str], num_queries: int) -> Dict[str, Any]:
+    """
+    Time retrieval through the configured retriever.
+
+    Returns:
+        Stage results with per-query latencies and sample contexts
+    """
+    from src.retrival.retrival import Retriever
+
+    retriever = Retriever(vector_store).get_retriever(tokenizer=tokenizer)
+    retriever.invoke(queries[0])
+
+    latencies = []
+    contexts = []
+    for i in range(num_queries):
+        start = time.perf_counter()
+        documents = retriever.invoke(queries[i % len(queries)])
+        latencies.append(time.perf_counter() - start)
+        if len(contexts) < len(queries):
+            contexts.append("\n\n".join(doc.page_content for doc in documents))
+
+    return {"latencies": latencies, "contexts": contexts}
+
+def bench_generation(llm_pipeline, prompts: List[str], max_new_tokens: int) -> Dict[str, Any]:
+    """
+    Time streamed generation of fixed-length answers.
+
+    Returns:
+        Stage results with times to first token and decode throughput
+    """
+    # Fixed answer length, so runs are comparable even when the model stops early
+    overrides = {"max_new_tokens": max_new_tokens, "min_new_tokens": max_new_tokens, "do_sample": False}
+    llm_pipeline.generate(prompts[0], **overrides)
+
+    before = llm_pipeline.stats()
+    first_tokens = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        first_token = None
+        for _ in llm_pipeline.stream(prompt, **overrides):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        first_tokens.append(first_token or 0.0)
+    after = llm_pipeline.stats()
+
+    new_tokens = after["new_tokens"] - before["new_tokens"]
+    seconds = after["seconds"] - before["seconds"]
+
+    return {"first_tokens": first_tokens, "tokens": new_tokens, "seconds": seconds}
+
+def run_benchmarks(args, config) -> Dict[str, Any]:
+    """
+    Run every stage on a synthetic corpus.
+
+    Args:
+        args: Parsed command line arguments
+        config: Configuration dictionary, already pointed at the work directory
+
+    Returns:
+        Results dictionary with 'meta', 'metrics' and per-stage 'details'
+    """
+    corpus = generate_corpus(config["pdf_dir"], num_docs=args.docs, pages_per_doc=args.pages, seed=args.seed)
+    metrics: Dict[str, float] = {}
+    details: Dict[str, Any] = {"corpus": {key: corpus[key] for key in ("pages", "characters")}}
+
+    extraction = bench_extraction(config)
+    metrics["extraction_pages_per_s"] = extraction["pages"] / extraction["seconds"]
+    details["extraction"] = {"pages": extraction["pages"], "seconds": extraction["seconds"]}
+
+    splitting = bench_splitting(config, extraction["documents"])
+    chunks = splitting["chunks"]
+    metrics["splitting_chunks_per_s"] = len(chunks) / splitting["seconds"]
+    details["splitting"] = {"chunks": len(chunks), "seconds": splitting["seconds"]}
+
+    if args.real_models:
+        from src.embeddings.embeddor import Embedder
+        embeddings = Embedder().get_embedder()
+    else:
+        from benchmarks.stand_ins import HashingEmbeddings
+        embeddings = HashingEmbeddings()
+
+    embedding = bench_embedding(embeddings, chunks, config.get("embedding_batch_size", 256))
+    metrics["embedding_chunks_per_s"] = len(chunks) / embedding["seconds"]
+    details["embedding"] = {"chunks": len(chunks), "seconds": embedding["seconds"]}
+
+    index_build = bench_index_build(config, embeddings, embedding["vectors"], chunks)
+    metrics["index_build_seconds"] = index_build["seconds"]
+    details["index_build"] = {"backend": config.get("vector_backend"), "seconds": index_build["seconds"]}
+
+    if args.real_models:
+        from src.llm.load_models import LlamaLoader
+        model, tokenizer = LlamaLoader().load_model_and_tokenizer()
+    else:
+        from benchmarks.stand_ins import build_tiny_llm
+        model, tokenizer = build_tiny_llm(chunk["content"] for chunk in chunks)
+
+    retrieval = bench_retrieval(index_build["vector_store"], tokenizer, corpus["queries"], args.queries)
+    metrics["retrieval_p50_ms"] = percentile_ms(retrieval["latencies"], 50)
+    metrics["retrieval_p99_ms"] = percentile_ms(retrieval["latencies"], 99)
+    details["retrieval"] = {"queries": args.queries, "k": config.get("retriever_k"), "search_type": config.get("search_type")}
+
+    from src.llm.pipeline import LlamaPipeline
+
+    llm_pipeline = LlamaPipeline(model, tokenizer)
+    prompts = [
+        f"Use the following pieces of context to answer the question.\n\n{context}\n\nQuestion: {query}\nHelpful Answer:"
+        for context, query in zip(retrieval["contexts"], corpus["queries"])
+    ][:args.generations]
+
+    generation = bench_generation(llm_pipeline, prompts, args.max_new_tokens)
+    metrics["generation_ttft_p50_ms"] = percentile_ms(generation["first_tokens"], 50)
+    metrics["generation_tokens_per_s"] = generation["tokens"] / generation["seconds"] if generation["seconds"] else 0.0
+    details["generation"] = {
+        "requests": len(prompts),
+        "tokens": generation["tokens"],
+        "ttft_p99_ms": percentile_ms(generation["first_tokens"], 99),
+    }
+
+    return {
+        "format_version": RESULTS_FORMAT,
+        "meta": {
+            "created": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stand_ins": not args.real_models,
+            "docs": args.docs,
+            "pages_per_doc": args.pages,
+            "config": {key: config.get(key) for key in args.report_keys},
+        },
+        "metrics": metrics,
+        "details": details,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """
+    Print every metric against a baseline run.
+
+    Args:
+        results: Current results
+        baseline: Saved results to compare with
+        max_regression: Largest accepted relative slowdown, e.g. 0.1
+
+    Returns:
+        True when no metric regressed by more than max_regression
+    """
+    ok = True
+    print(f"\n  {'metric':<26}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+
+    for name, higher_is_better in METRICS.items():
+        current = results["metrics"].get(name)
+        previous = baseline.get("metrics", {}).get(name)
+        if current is None or not previous:
+            continue
+
+        change = (current - previous) / previous
+        regression = -change if higher_is_better else change
+        flag = ""
+        if regression > max_regression:
+            flag = "  REGRESSION"
+            ok = False
+
+        print(f"  {name:<26}  {previous:>10.2f}  {current:>10.2f}  {change:>+7.1%}{flag}")
+
+    return ok
+
+def main():
+    """
+    Benchmark the pipeline end to end on a synthetic corpus.
+    """
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Benchmark extraction, indexing, retrieval and generation")
+    parser.add_argument("--docs", type=int, default=20, help="Number of synthetic PDFs")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per synthetic PDF")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--queries", type=int, default=200, help="Number of timed retrievals")
+    parser.add_argument("--generations", type=int, default=8, help="Number of timed generations")
+    parser.add_argument("--max_new_tokens", type=int, default=32, help="Generated tokens per request")
+    parser.add_argument("--real_models", action="store_true", help="Use the configured models instead of stand-ins")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override a config value")
+    parser.add_argument("--work_dir", type=str, help="Directory for the corpus and indexes, temporary by default")
+    parser.add_argument("--output", type=str, default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", type=str, help="Results file to compare against")
+    parser.add_argument("--max_regression", type=float, default=0.1, help="Relative slowdown that fails the comparison")
+    args = parser.parse_args()
+
+    overrides = parse_overrides(args.set)
+    args.report_keys = sorted(set(overrides) | {
+        "chunk_size", "chunk_overlap", "retriever_k", "search_type", "vector_backend", "max_length"
+    })
+
+    config = get_config()
+    config.update(overrides)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="rag_bench_")
+    config["pdf_dir"] = os.path.join(work_dir, "pdfs")
+    config["vector_store_dir"] = os.path.join(work_dir, "vector_store")
+    config["lexical_index_dir"] = None
+    # Every run has to embed and answer from scratch
+    config["embedding_cache"] = False
+    config["answer_cache"] = False
+    os.makedirs(config["vector_store_dir"], exist_ok=True)
+
+    # Read before the results are written, the two may be the same file
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    try:
+        results = run_benchmarks(args, config)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nBenchmark results ({'stand-in' if not args.real_models else 'configured'} models):")
+    for name, value in results["metrics"].items():
+        print(f"  {name:<26}  {value:>10.2f}")
+    print(f"\nWritten to {args.output}")
+
+    if baseline is not None:
+        if not compare(results, baseline, args.max_regression):
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
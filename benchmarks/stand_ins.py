@@ -0,0 +1,164 @@
+import hashlib
+import re
+from typing import List, Dict, Iterable
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Tiny offline stand-in for the sentence-transformers embedder.
+
+    Words are hashed into a fixed number of dimensions and the counts are
+    L2-normalised, so texts sharing words end up close together. It needs no
+    model download and costs almost nothing, which keeps the benchmark
+    focused on the pipeline around the model.
+    """
+
+    def __init__(self, dim: int = 384):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of embedding vectors
+        """
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        return self._embed(text).tolist()
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """
+    Serve vectors computed earlier, so index build time excludes embedding.
+    """
+
+    def __init__(self, embeddings: Embeddings, vectors: Dict[str, List[float]]):
+        """
+        Initialize with known vectors.
+
+        Args:
+            embeddings: Embedder used for texts without a stored vector
+            vectors: Vectors keyed by text
+        """
+        self.embeddings = embeddings
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Look up document vectors, embedding unknown texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of embedding vectors
+        """
+        missing = [text for text in texts if text not in self.vectors]
+        if missing:
+            self.vectors.update(zip(missing, self.embeddings.embed_documents(missing)))
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query with the wrapped embedder.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        return self.embeddings.embed_query(text)
+
+
+def build_tiny_llm(texts: Iterable[str], vocab_size: int = 4000, hidden_size: int = 128,
+                   num_layers: int = 2, seed: int = 0):
+    """
+    Build a small randomly initialised Llama model and a word-level tokenizer.
+
+    The tokenizer is trained on the given texts, so nothing is downloaded.
+    The model's answers are meaningless, but it runs the real generation
+    code path (prefix cache, streaming, batching) on CPU in milliseconds.
+
+    Args:
+        texts: Texts to build the vocabulary from
+        vocab_size: Maximum vocabulary size
+        hidden_size: Model width
+        num_layers: Number of decoder layers
+        seed: Random seed for the weights
+
+    Returns:
+        Tuple of (model, tokenizer)
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders, trainers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    special_tokens = ["<unk>", "<pad>", "<s>", "</s>"]
+    word_tokenizer = Tokenizer(models.WordLevel(unk_token="<unk>"))
+    word_tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    word_tokenizer.decoder = decoders.WordPiece(prefix="##")
+    trainer = trainers.WordLevelTrainer(vocab_size=vocab_size, special_tokens=special_tokens)
+    word_tokenizer.train_from_iterator(texts, trainer=trainer)
+
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=word_tokenizer,
+        unk_token="<unk>",
+        pad_token="<pad>",
+        bos_token="<s>",
+        eos_token="</s>"
+    )
+
+    torch.manual_seed(seed)
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=4096,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id
+    )
+    model = LlamaForCausalLM(config).eval()
+
+    logger.info(f"Built stand-in LLM with {len(tokenizer)} tokens and {sum(p.numel() for p in model.parameters())} parameters")
+
+    return model, tokenizer
@@ -4,10 +4,11 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+from src.monitoring.startup import get_startup_timer
+from src.monitoring.metrics import start_exporters
+from src.monitoring.profiling import Profiler
 from src.config.logging import setup_logging, get_logger
 from src.config.config import get_config
-from ui.cli import CliInterface
-from ui.web import WebInterface
 
 logger = get_logger(__name__)
 
@@ -20,10 +21,19 @@ def main():
     parser.add_argument("--web", action="store_true", help="Launch web interface")
     parser.add_argument("--rebuild", action="store_true", help="Rebuild vector store")
     parser.add_argument("--pdf_dir", type=str, help="Custom PDF directory")
+    parser.add_argument("--profile", action="store_true", help="Write CPU, allocation and per-query stage profiles on exit")
     args = parser.parse_args()
     
     config = get_config()
     
+    # Started before the exporters, so the registry is enabled when they check it
+    profiler = None
+    if args.profile:
+        profiler = Profiler.from_config("web" if args.web else "cli")
+        profiler.start()
+    
+    start_exporters()
+    
     if args.pdf_dir:
         config["pdf_dir"] = args.pdf_dir
         logger.info(f"Using custom PDF directory: {args.pdf_dir}")
@@ -39,15 +49,22 @@ def main():
         print(f"Please add PDF files to {config['pdf_dir']} before building the vector store.")
     
     try:
+        # Interfaces are imported on demand, so each mode only pulls in its own dependencies
+        timer = get_startup_timer()
+        
         if args.web:
             logger.info("Starting web interface")
+            with timer.phase("imports"):
+                from ui.web import WebInterface
             web_ui = WebInterface()
             web_ui.setup(rebuild_vector_store=args.rebuild)
             web_ui.launch()
         else:
             logger.info("Starting CLI interface")
+            with timer.phase("imports"):
+                from ui.cli import CliInterface
             cli_ui = CliInterface()
-            cli_ui.run()
+            cli_ui.run(rebuild_vector_store=args.rebuild)
     except KeyboardInterrupt:
         logger.info("Application terminated by user")
         print("\nApplication terminated by user")
@@ -55,6 +72,9 @@ def main():
         logger.error(f"Error in main application: {str(e)}")
         print(f"\nError: {str(e)}")
         return 1
+    finally:
+        if profiler:
+            print(f"Profile written to {profiler.stop()}")
     
     return 0
 
@@ -6,14 +6,59 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.data.pdf_processor import PDFProcessor
+from src.data.page_cache import page_cache_dir
 from src.data.text_splitter import DocumentSplitter
 from src.embeddings.embeddor import Embedder
 from src.embeddings.vector_store import VectorStore
+from src.data.ingestion import IngestionPipeline
 from src.config.config import get_config
+from src.monitoring.profiling import Profiler
 from src.config.logging import setup_logging, get_logger
 
 logger = get_logger(__name__)
 
+def report_recall(vector_store, k):
+    """
+    Print recall@k and latency of the approximate index for several nprobe values.
+    
+    Args:
+        vector_store: Vector store returned by the ingestion pipeline
+        k: Number of results per query
+    """
+    if getattr(vector_store, "ivf", None) is None:
+        print("Recall check needs vector_backend 'flat' with ann_index 'ivf' and a built index")
+        return
+    
+    from src.embeddings.ivf_index import evaluate_recall
+    
+    print(f"\nRecall@{k} against exact search ({vector_store.ivf.nlist} lists):")
+    for result in evaluate_recall(vector_store, k=k):
+        nprobe = "exact" if result["nprobe"] is None else f"nprobe={result['nprobe']}"
+        print(f"  {nprobe:>12}  recall {result['recall']:.3f}  {result['latency_ms']:.2f} ms/query")
+
+def report_quantization(vector_store, k):
+    """
+    Print memory footprint and search latency with and without quantized codes.
+    
+    Args:
+        vector_store: Vector store returned by the ingestion pipeline
+        k: Number of results per query
+    """
+    if getattr(vector_store, "quantized", None) is None:
+        return
+    
+    from src.embeddings.search_eval import sample_queries, run_queries, recall_at_k
+    
+    queries = sample_queries(vector_store)
+    exact, exact_ms = run_queries(vector_store, queries, k, exact=True)
+    quantized, quantized_ms = run_queries(vector_store, queries, k)
+    footprint = vector_store.memory_footprint()
+    
+    print(f"\nVector quantization ({vector_store.quantized.kind}, rescore factor {vector_store.quantized.rescore_factor}):")
+    print(f"  before: {footprint['vectors_mb']:.1f} MB in memory, {exact_ms:.2f} ms/query")
+    print(f"  after:  {footprint['codes_mb']:.1f} MB in memory, {quantized_ms:.2f} ms/query, "
+          f"recall@{k} {recall_at_k(quantized, exact):.3f}")
+
 def main():
     """
     Build the vector store from PDF files.
@@ -25,6 +70,11 @@ def main():
     parser.add_argument("--vector_dir", type=str, help="Vector store directory")
     parser.add_argument("--chunk_size", type=int, help="Chunk size")
     parser.add_argument("--chunk_overlap", type=int, help="Chunk overlap")
+    parser.add_argument("--workers", type=int, help="Number of PDF extraction processes")
+    parser.add_argument("--batch_size", type=int, help="Number of chunks embedded per batch")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rebuild everything")
+    parser.add_argument("--check_recall", action="store_true", help="Report recall@k of the approximate index against exact search")
+    parser.add_argument("--profile", action="store_true", help="Write CPU, allocation and stage profiles of the build (use --workers 1 to profile extraction)")
     args = parser.parse_args()
     
     # Get config
@@ -39,6 +89,10 @@ def main():
         config["chunk_size"] = args.chunk_size
     if args.chunk_overlap:
         config["chunk_overlap"] = args.chunk_overlap
+    if args.workers:
+        config["extraction_workers"] = args.workers
+    if args.batch_size:
+        config["embedding_batch_size"] = args.batch_size
     
     # Check if PDF directory exists
     if not os.path.exists(config["pdf_dir"]):
@@ -49,33 +103,56 @@ def main():
     logger.info(f"Building vector store from PDFs in {config['pdf_dir']}")
     logger.info(f"Using chunk size {config['chunk_size']} and overlap {config['chunk_overlap']}")
     
+    profiler = None
+    if args.profile:
+        profiler = Profiler.from_config("build")
+        profiler.start()
+    
     try:
-        # Process PDFs
-        pdf_processor = PDFProcessor(config["pdf_dir"])
-        documents = pdf_processor.process_all_pdfs()
-        logger.info(f"Processed {len(documents)} PDF documents")
+        # Stream PDFs through extraction, splitting and embedding
+        pdf_processor = PDFProcessor(
+            config["pdf_dir"],
+            num_workers=config.get("extraction_workers"),
+            pages_per_task=config.get("extraction_pages_per_task", 100),
+            cache_dir=page_cache_dir(config)
+        )
         
-        # Split documents
         doc_splitter = DocumentSplitter(
             chunk_size=config["chunk_size"],
             chunk_overlap=config["chunk_overlap"]
         )
-        chunks = doc_splitter.split_documents(documents)
-        logger.info(f"Created {len(chunks)} document chunks")
         
         # Create embeddings and vector store
         embedder = Embedder()
         embedding_model = embedder.get_embedder()
         
         vector_store_manager = VectorStore(embedding_model)
-        vector_store = vector_store_manager.create_from_documents(chunks)
         
-        logger.info(f"Vector store created and saved to {config['vector_store_dir']}")
-        print(f"Success: Vector store created with {len(chunks)} chunks")
+        pipeline = IngestionPipeline(pdf_processor, doc_splitter, vector_store_manager)
+        vector_store = pipeline.run(full_rebuild=args.full)
+        stats = pipeline.stats
+        
+        if profiler:
+            profiler.snapshot("ingestion")
+        
+        for name, values in embedder.stats().items():
+            logger.info(f"Embedding {name}: {values}")
+        embedder.close()
+        
+        report_quantization(vector_store, config.get("retriever_k", 3))
+        
+        if args.check_recall:
+            report_recall(vector_store, config.get("retriever_k", 3))
+        
+        logger.info(f"Vector store updated and saved to {config['vector_store_dir']}")
+        print(f"Success: Indexed {stats['chunks']} chunks from {stats['documents']} new or changed documents")
         
     except Exception as e:
         logger.error(f"Error building vector store: {str(e)}")
         print(f"Error: {str(e)}")
+    finally:
+        if profiler:
+            print(f"Profile written to {profiler.stop()}")
         
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,11 +6,37 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.config.config import get_config
 from src.config.logging import setup_logging, get_logger
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from sentence_transformers import SentenceTransformer
 
 logger = get_logger(__name__)
 
+def prepare(args, config):
+    """
+    Convert the configured models into ready-to-load artifacts, offline.
+    
+    Args:
+        args: Parsed command line arguments
+        config: Configuration dictionary
+    """
+    # Must be set before transformers and huggingface_hub are imported
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    
+    from src.llm.load_models import LlamaLoader
+    from src.embeddings.embeddor import Embedder
+    
+    if not args.embeddings_only:
+        loader = LlamaLoader()
+        directory = loader.prepare(source=args.model_path)
+        print(f"LLM prepared in {directory}")
+        
+        if config.get("draft_model"):
+            directory = loader.prepare(model_name=config["draft_model"], source=args.draft_model_path, quantize=False)
+            print(f"Draft model prepared in {directory}")
+    
+    if not args.llm_only:
+        directory = Embedder.prepare(source=args.embedding_model_path)
+        print(f"Embedding model prepared in {directory}")
+
 def main():
     """
     Download and cache the required models.
@@ -22,6 +48,10 @@ def main():
     parser = argparse.ArgumentParser(description="Download and cache models")
     parser.add_argument("--llm_only", action="store_true", help="Download only the LLM")
     parser.add_argument("--embeddings_only", action="store_true", help="Download only the embedding model")
+    parser.add_argument("--prepare", action="store_true", help="Write pre-quantized artifacts instead of downloading, offline")
+    parser.add_argument("--model_path", type=str, help="Local LLM directory to prepare from")
+    parser.add_argument("--draft_model_path", type=str, help="Local draft model directory to prepare from")
+    parser.add_argument("--embedding_model_path", type=str, help="Local embedding model directory to prepare from")
     args = parser.parse_args()
     
     # Get config
@@ -30,6 +60,17 @@ def main():
     # Create cache directory if it doesn't exist
     os.makedirs(config["model_cache_dir"], exist_ok=True)
     
+    if args.prepare:
+        try:
+            prepare(args, config)
+        except Exception as e:
+            logger.error(f"Error preparing models: {str(e)}")
+            print(f"Error: {str(e)}")
+        return
+    
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from sentence_transformers import SentenceTransformer
+    
     try:
         # Download LLM
         if not args.embeddings_only:
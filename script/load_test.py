@@ -0,0 +1,123 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config.config import get_config
+from src.config.logging import setup_logging, get_logger
+from src.llm.load_models import LlamaLoader
+from src.llm.pipeline import LlamaPipeline
+from src.llm.scheduler import GenerationScheduler
+
+logger = get_logger(__name__)
+
+DEFAULT_QUESTIONS = [
+    "What is the reset value of the control register?",
+    "Summarize the power-up sequence described in the specification.",
+    "Which interrupts can wake the device from sleep mode?",
+    "How is the clock divider configured?",
+    "List the electrical characteristics of the I/O pins.",
+    "What happens when the watchdog timer expires?",
+]
+
+def run_level(generator, prompts, concurrency, num_requests, max_new_tokens):
+    """
+    Send requests from concurrent clients and measure latency.
+
+    Args:
+        generator: LlamaPipeline or GenerationScheduler
+        prompts: Prompts to cycle through
+        concurrency: Number of concurrent clients
+        num_requests: Total number of requests
+        max_new_tokens: Generated tokens per request
+
+    Returns:
+        Dictionary with throughput and latency percentiles
+    """
+    def request(i):
+        start = time.perf_counter()
+        first_token = None
+        for _ in generator.stream(prompts[i % len(prompts)], max_new_tokens=max_new_tokens):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        return time.perf_counter() - start, first_token or 0.0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(request, range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results])
+    first_tokens = np.array([first_token for _, first_token in results])
+
+    return {
+        "concurrency": concurrency,
+        "throughput": num_requests / elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "ttft_p50": float(np.percentile(first_tokens, 50)),
+    }
+
+def main():
+    """
+    Load test LLM generation with and without dynamic batching.
+    """
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Load test LLM generation")
+    parser.add_argument("--concurrency", type=str, default="1,2,4,8", help="Comma separated client counts")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per concurrency level")
+    parser.add_argument("--max_new_tokens", type=int, default=64, help="Generated tokens per request")
+    parser.add_argument("--max_batch_size", type=int, help="Override the scheduler batch size")
+    parser.add_argument("--max_wait_ms", type=float, help="Override the scheduler wait time")
+    parser.add_argument("--no_batching", action="store_true", help="Call the pipeline directly")
+    parser.add_argument("--no_draft", action="store_true", help="Ignore the configured draft model")
+    args = parser.parse_args()
+
+    config = get_config()
+    params = config.get("generation_batching", {})
+
+    model_loader = LlamaLoader()
+    model, tokenizer = model_loader.load_model_and_tokenizer()
+    assistant_model = None if args.no_draft else model_loader.load_draft_model(tokenizer)
+    llm_pipeline = LlamaPipeline(model, tokenizer, assistant_model=assistant_model)
+
+    if args.no_batching or assistant_model is not None:
+        generator = llm_pipeline
+    else:
+        generator = GenerationScheduler(
+            llm_pipeline,
+            max_batch_size=args.max_batch_size or params.get("max_batch_size", 4),
+            max_wait_ms=args.max_wait_ms if args.max_wait_ms is not None else params.get("max_wait_ms", 20),
+            max_padding_ratio=params.get("max_padding_ratio", 0.5)
+        )
+
+    prompts = [f"Question: {question}\nHelpful Answer:" for question in DEFAULT_QUESTIONS]
+
+    # Warm up once so model loading effects are not measured
+    generator.generate(prompts[0], max_new_tokens=4)
+
+    batched = generator is not llm_pipeline
+    mode = "batched" if batched else "direct"
+    if assistant_model is not None:
+        mode += ", assisted"
+    print(f"\nLoad test ({mode}, {args.requests} requests per level, {args.max_new_tokens} new tokens):")
+    print(f"  {'clients':>7}  {'req/s':>7}  {'p50 s':>7}  {'p99 s':>7}  {'TTFT p50 s':>10}")
+
+    for concurrency in [int(value) for value in args.concurrency.split(",")]:
+        result = run_level(generator, prompts, concurrency, args.requests, args.max_new_tokens)
+        print(f"  {result['concurrency']:>7}  {result['throughput']:>7.2f}  {result['p50']:>7.2f}  "
+              f"{result['p99']:>7.2f}  {result['ttft_p50']:>10.2f}")
+
+    logger.info(f"Decoding: {llm_pipeline.stats()}")
+    if batched:
+        logger.info(f"Batching: {generator.batch_stats()}")
+        generator.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import numpy as np
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+ANSWER_CACHE_FORMAT = 1
+
+
+class AnswerCache:
+    """
+    Semantic cache of chatbot answers.
+
+    A question hits the cache when the embedding of a previously answered
+    question is at least `threshold` cosine-similar to it. Entries belong to
+    one index version, so rebuilding the vector store invalidates them, and
+    are evicted least recently used first or once older than the TTL.
+
+    When persisted, the file is written on a timer thread save_delay_seconds
+    after the first change, so bursts of answers cost one write and the
+    request path never waits on disk.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        index_version: str,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = 86400,
+        path: Optional[str] = None,
+        save_delay_seconds: float = 5.0
+    ):
+        """
+        Initialize the answer cache.
+
+        Args:
+            embeddings: LangChain embeddings used to embed questions
+            index_version: Version of the vector store answers come from
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Maximum age of an answer, None keeps answers forever
+            path: JSON file to persist the cache to, None keeps it in memory
+            save_delay_seconds: Delay between a change and writing the file
+        """
+        self.embeddings = embeddings
+        self.index_version = index_version
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.save_delay = save_delay_seconds
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._dirty = False
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._matrix = None
+        self._matrix_ids = []
+
+        self.counters = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "saved_seconds": 0.0,
+            "lookup_seconds": 0.0,
+        }
+
+        if self.path:
+            self._load()
+            # Pending changes are written on a clean exit
+            atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry["created"] > self.ttl_seconds
+
+    def _similarity_matrix(self) -> np.ndarray:
+        """Stack the cached question vectors, rebuilt only after changes."""
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries.keys())
+            vectors = [self._entries[entry_id]["vector"] for entry_id in self._matrix_ids]
+            self._matrix = np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return self._matrix
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the answer to a similar question.
+
+        Args:
+            question: User question
+
+        Returns:
+            Cached response dictionary, or None on a miss
+        """
+        start = time.perf_counter()
+        vector = self._embed(question)
+        now = time.time()
+
+        with self._lock:
+            self.counters["lookups"] += 1
+            try:
+                return self._lookup(vector, now)
+            finally:
+                self.counters["lookup_seconds"] += time.perf_counter() - start
+
+    def _lookup(self, vector: np.ndarray, now: float) -> Optional[Dict[str, Any]]:
+        """Find the closest live entry, called with the lock held."""
+        self._drop_expired(now)
+
+        matrix = self._similarity_matrix()
+        if len(matrix):
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                entry_id = self._matrix_ids[best]
+                entry = self._entries[entry_id]
+                self._entries.move_to_end(entry_id)
+
+                self.counters["hits"] += 1
+                self.counters["saved_seconds"] += entry["seconds"]
+                logger.info(f"Answer cache hit (similarity {similarities[best]:.3f}): {entry['question']!r}")
+                return entry["response"]
+
+        self.counters["misses"] += 1
+        return None
+
+    def put(self, question: str, response: Dict[str, Any], seconds: float):
+        """
+        Cache an answer.
+
+        Args:
+            question: User question
+            response: Formatted response dictionary
+            seconds: Time it took to produce the answer
+        """
+        vector = self._embed(question)
+
+        with self._lock:
+            self._entries[self._next_id] = {
+                "question": question,
+                "vector": vector,
+                "response": response,
+                "seconds": seconds,
+                "created": time.time(),
+            }
+            self._next_id += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+            self._matrix = None
+
+            if self.path:
+                self._schedule_save()
+
+    def _schedule_save(self):
+        """Write the file after the save delay, called with the lock held."""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes to the cache file."""
+        # Serialized, so an older snapshot never overwrites a newer one
+        with self._save_lock:
+            with self._lock:
+                self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = list(self._entries.values())
+
+            self._save(entries)
+
+    def _drop_expired(self, now: float):
+        expired = [entry_id for entry_id, entry in self._entries.items() if self._expired(entry, now)]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self.counters["expired"] += len(expired)
+            self._matrix = None
+
+    def clear(self):
+        """Remove every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._dirty = False
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dictionary with counters, hit rate and number of entries
+        """
+        with self._lock:
+            lookups = self.counters["lookups"]
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _save(self, entries):
+        """
+        Write the cache atomically.
+
+        Args:
+            entries: Snapshot of the cache entries
+        """
+        entries = [
+            {**entry, "vector": entry["vector"].tolist()}
+            for entry in entries
+        ]
+        data = {"format": ANSWER_CACHE_FORMAT, "index_version": self.index_version, "entries": entries}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        """Load persisted answers of the current index version."""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable answer cache {self.path}: {str(e)}")
+            return
+
+        if data.get("format") != ANSWER_CACHE_FORMAT or data.get("index_version") != self.index_version:
+            logger.info("Discarding answer cache built for another index version")
+            return
+
+        now = time.time()
+        for entry in data.get("entries", [])[-self.max_entries:]:
+            entry["vector"] = np.asarray(entry["vector"], dtype=np.float32)
+            if not self._expired(entry, now):
+                self._entries[self._next_id] = entry
+                self._next_id += 1
+
+        logger.info(f"Loaded {len(self._entries)} cached answers from {self.path}")
@@ -1,7 +1,14 @@
+import time
 from langchain.chains import ConversationalRetrievalChain
+from langchain.chains.conversational_retrieval.prompts import QA_PROMPT
+from src.chat.answer_cache import AnswerCache
+from src.chat.condense import QuestionCondenser
 from src.config.config import get_config
 from src.config.logging import get_logger
-from typing import Dict, Any
+from src.embeddings.manifest import IndexManifest
+from src.monitoring.metrics import get_metrics
+from src.retrival.context_packer import count_tokens
+from typing import Dict, Any, Iterator, Optional
 
 logger = get_logger(__name__)
 
@@ -10,7 +17,7 @@ class ChatChain:
     Build and manage the RAG conversation chain.
     """
     
-    def __init__(self, llm, retriever, memory):
+    def __init__(self, llm, retriever, memory, embeddings=None, generator=None, condenser=None):
         """
         Initialize with required components.
         
@@ -18,11 +25,57 @@ class ChatChain:
             llm: Language model
             retriever: Document retriever
             memory: Conversation memory
+            embeddings: Embedding model for the answer cache, None disables it
+            generator: LlamaPipeline used for token streaming, None runs the
+                blocking LangChain chain instead
+            condenser: QuestionCondenser for follow-up questions, defaults
+                to rewriting every follow-up with the generator
         """
         self.llm = llm
         self.retriever = retriever
         self.memory = memory
+        self.generator = generator
+        self.condenser = condenser
+        if self.condenser is None and generator is not None:
+            self.condenser = QuestionCondenser(generator, mode="always")
         self.config = get_config()
+        self.metrics = get_metrics()
+        self.chain = None
+        self.answer_cache = self._create_answer_cache(embeddings)
+        
+    def _create_answer_cache(self, embeddings) -> Optional[AnswerCache]:
+        """
+        Create the answer cache for the current vector store.
+        
+        Args:
+            embeddings: Embedding model used to compare questions
+            
+        Returns:
+            AnswerCache instance, or None when disabled
+        """
+        if embeddings is None or not self.config.get("answer_cache", True):
+            return None
+        
+        params = self.config.get("answer_cache_params", {})
+        
+        # Answers depend on the indexed content and on how they were generated
+        manifest = IndexManifest.load(self.config.get("vector_store_dir", "./vector_store"))
+        index_version = ":".join([
+            manifest.version,
+            str(self.config.get("model_name")),
+            str(self.config.get("search_type")),
+            str(self.config.get("retriever_k")),
+        ])
+        
+        return AnswerCache(
+            embeddings,
+            index_version,
+            threshold=params.get("threshold", 0.95),
+            max_entries=params.get("max_entries", 1000),
+            ttl_seconds=params.get("ttl_seconds", 86400),
+            path=params.get("path") if params.get("persist", False) else None,
+            save_delay_seconds=params.get("save_delay_seconds", 5.0)
+        )
         
     def create_chain(self):
         """
@@ -44,8 +97,158 @@ class ChatChain:
             return_source_documents=return_source_docs
         )
         
+        self.chain = qa_chain
         return qa_chain
     
+    def ask(self, question: str, memory=None) -> Dict[str, Any]:
+        """
+        Answer a question without streaming.
+        
+        Args:
+            question: User question
+            memory: Conversation memory of the session, defaults to the chain's
+            
+        Returns:
+            Formatted response with 'cached' and 'timings' entries
+        """
+        response = None
+        for event in self.stream(question, memory=memory):
+            if event["type"] == "done":
+                response = event["response"]
+        return response
+    
+    def stream(self, question: str, memory=None) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a question, yielding the answer as it is generated.
+        
+        The first question of a conversation is looked up in the answer
+        cache, since follow-up questions depend on the chat history. Without
+        a generator the blocking chain runs, always with the chain's own
+        memory, and its answer arrives as a single token event.
+        
+        Args:
+            question: User question
+            memory: Conversation memory of the session, defaults to the chain's
+            
+        Yields:
+            {"type": "token", "text": ...} events, then one
+            {"type": "done", "response": ...} event with the formatted
+            response, its 'cached' flag and 'timings'
+        """
+        start = time.perf_counter()
+        if memory is None or self.generator is None:
+            memory = self.memory
+        use_cache = self.answer_cache is not None and not memory.chat_memory.messages
+        
+        if use_cache:
+            with self.metrics.span("answer_cache"):
+                cached = self.answer_cache.get(question)
+            if cached is not None:
+                # Keep the conversation consistent for follow-up questions
+                memory.save_context({"question": question}, {"answer": cached["answer"]})
+                elapsed = time.perf_counter() - start
+                yield {"type": "token", "text": cached["answer"]}
+                yield {"type": "done", "response": {**cached, "cached": True, "timings": {"first_token": elapsed, "total": elapsed}}}
+                return
+        
+        if self.generator is None:
+            if self.chain is None:
+                self.create_chain()
+            with self.metrics.span("chain"):
+                formatted = self.format_response(self.chain({"question": question}))
+            timings = {"first_token": time.perf_counter() - start}
+            yield {"type": "token", "text": formatted["answer"]}
+        else:
+            timings = {}
+            parts = []
+            documents = []
+            for event in self._stream_staged(question, memory, start, timings):
+                if event["type"] == "documents":
+                    documents = event["documents"]
+                    continue
+                parts.append(event["text"])
+                yield event
+            
+            answer = "".join(parts).strip()
+            memory.save_context({"question": question}, {"answer": answer})
+            
+            chain_response = {"answer": answer}
+            if self.config.get("return_source_docs", True):
+                chain_response["source_documents"] = documents
+            formatted = self.format_response(chain_response)
+        
+        timings["total"] = time.perf_counter() - start
+        # An empty answer (immediate end of sequence) never sets it
+        timings.setdefault("first_token", timings["total"])
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items() if name != "total")
+        logger.info(f"Answered in {timings['total']:.2f}s ({stages})")
+        if self.metrics.enabled:
+            self.metrics.record("query", timings["total"], {"first_token_seconds": timings["first_token"]})
+        
+        if use_cache:
+            self.answer_cache.put(question, formatted, timings["total"])
+        
+        yield {"type": "done", "response": {**formatted, "cached": False, "timings": timings}}
+    
+    def _stream_staged(self, question: str, memory, start: float, timings: Dict[str, float]) -> Iterator[Dict[str, Any]]:
+        """
+        Run the conversational retrieval steps with a streamed final answer.
+        
+        Mirrors ConversationalRetrievalChain with its default prompts:
+        condense the question with the chat history, retrieve, then answer
+        from the stuffed context.
+        
+        Args:
+            question: User question
+            memory: Conversation memory holding the chat history
+            start: perf_counter() value the request started at
+            timings: Dictionary filled with stage durations
+            
+        Yields:
+            One {"type": "documents"} event, then token events
+        """
+        tokenizer = getattr(self.generator, "tokenizer", None)
+        
+        with self.metrics.span("condense") as span:
+            condensed = self.condenser.condense(question, memory.chat_memory.messages)
+            span.set(llm_calls=int(condensed["condensed"]))
+        standalone = condensed["question"]
+        timings["condense"] = condensed["seconds"]
+        
+        # Query embedding and vector search record their own spans inside
+        with self.metrics.span("retrieval") as span:
+            retrieval_start = time.perf_counter()
+            documents = self.retriever.invoke(standalone)
+            timings["retrieval"] = time.perf_counter() - retrieval_start
+            span.set(documents=len(documents))
+        yield {"type": "documents", "documents": documents}
+        
+        with self.metrics.span("prompt") as span:
+            context = "\n\n".join(doc.page_content for doc in documents)
+            prompt = QA_PROMPT.format(context=context, question=standalone)
+            if span.enabled:
+                tokens_in = count_tokens(prompt, tokenizer)
+                span.set(tokens=tokens_in, context_tokens=count_tokens(context, tokenizer))
+        
+        with self.metrics.span("generation") as span:
+            parts = []
+            for text in self.generator.stream(prompt):
+                if "first_token" not in timings:
+                    timings["first_token"] = time.perf_counter() - start
+                parts.append(text)
+                yield {"type": "token", "text": text}
+            if span.enabled:
+                span.set(tokens_in=tokens_in, tokens_out=count_tokens("".join(parts), tokenizer))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get answer cache counters.
+        
+        Returns:
+            Dictionary of counters, empty when the cache is disabled
+        """
+        return self.answer_cache.stats() if self.answer_cache else {}
+    
     @staticmethod
     def format_response(chain_response: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -67,6 +270,7 @@ class ChatChain:
             for i, doc in enumerate(chain_response["source_documents"]):
                 formatted["sources"].append({
                     "source": doc.metadata.get("source", "Unknown"),
+                    "page": doc.metadata.get("page"),
                     "content": doc.page_content[:200] + "...",  # Preview
                 })
         
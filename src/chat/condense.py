@@ -0,0 +1,142 @@
+import re
+import time
+from typing import List, Dict, Any
+from langchain.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
+from src.config.config import get_config
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Words that only make sense with the previous turns
+REFERENCE_PATTERN = re.compile(
+    r"\b(it|its|this|that|these|those|they|them|their|he|she|his|her|"
+    r"above|previous|earlier|same|former|latter|one|ones|else|more)\b",
+    re.IGNORECASE
+)
+CONTINUATION_PATTERN = re.compile(r"^\s*(and|also|but|so|then|or|what about|how about)\b", re.IGNORECASE)
+
+CONDENSE_MODES = ("always", "heuristic", "never")
+
+
+def is_self_contained(question: str, min_words: int = 4) -> bool:
+    """
+    Guess whether a question can be answered without the chat history.
+
+    Args:
+        question: User question
+        min_words: Shorter questions are treated as follow-ups
+
+    Returns:
+        True when the question has no references to earlier turns
+    """
+    if len(question.split()) < min_words:
+        return False
+    if CONTINUATION_PATTERN.search(question):
+        return False
+    return REFERENCE_PATTERN.search(question) is None
+
+
+class QuestionCondenser:
+    """
+    Rewrite follow-up questions into standalone questions.
+
+    In "heuristic" mode the LLM call is skipped for the first turn and for
+    questions that look self-contained. Rewriting can run on a smaller
+    generator than the answering model and is capped at a few new tokens.
+    """
+
+    def __init__(self, generator, mode: str = "heuristic", max_new_tokens: int = 64):
+        """
+        Initialize the condenser.
+
+        Args:
+            generator: LlamaPipeline used for rewriting
+            mode: "always", "heuristic" or "never"
+            max_new_tokens: Maximum length of the rewritten question
+        """
+        if mode not in CONDENSE_MODES:
+            raise ValueError(f"Unknown condense mode: {mode}")
+
+        self.generator = generator
+        self.mode = mode
+        self.max_new_tokens = max_new_tokens
+        self.stats = {"questions": 0, "condensed": 0, "skipped": 0, "seconds": 0.0}
+
+    @classmethod
+    def from_config(cls, generator) -> "QuestionCondenser":
+        """
+        Create a condenser from config, loading condense_model when set.
+
+        Args:
+            generator: LlamaPipeline of the answering model
+
+        Returns:
+            QuestionCondenser instance
+        """
+        config = get_config()
+        condense_model = config.get("condense_model")
+
+        if condense_model:
+            from src.llm.load_models import LlamaLoader
+            from src.llm.pipeline import LlamaPipeline
+
+            model, tokenizer = LlamaLoader().load_model_and_tokenizer(model_name=condense_model)
+            generator = LlamaPipeline(model, tokenizer)
+
+        return cls(
+            generator,
+            mode=config.get("condense_mode", "heuristic"),
+            max_new_tokens=config.get("condense_max_new_tokens", 64)
+        )
+
+    @staticmethod
+    def format_history(messages: List[Any]) -> str:
+        """
+        Render chat messages for the condense prompt.
+
+        Args:
+            messages: Chat memory messages
+
+        Returns:
+            History text
+        """
+        return "\n".join(
+            f"{'Human' if message.type == 'human' else 'Assistant'}: {message.content}" for message in messages
+        )
+
+    def condense(self, question: str, messages: List[Any]) -> Dict[str, Any]:
+        """
+        Get the standalone form of a question.
+
+        Args:
+            question: User question
+            messages: Chat memory messages
+
+        Returns:
+            Dictionary with 'question', 'condensed' flag and 'seconds' spent
+        """
+        self.stats["questions"] += 1
+
+        skip = (
+            not messages
+            or self.mode == "never"
+            or (self.mode == "heuristic" and is_self_contained(question))
+        )
+        if skip:
+            self.stats["skipped"] += 1
+            return {"question": question, "condensed": False, "seconds": 0.0}
+
+        start = time.perf_counter()
+        prompt = CONDENSE_QUESTION_PROMPT.format(chat_history=self.format_history(messages), question=question)
+        output = self.generator.generate(prompt, max_new_tokens=self.max_new_tokens, do_sample=False)
+        seconds = time.perf_counter() - start
+
+        # The standalone question is the first non-empty line
+        lines = [line.strip() for line in output.splitlines() if line.strip()]
+        standalone = lines[0] if lines else question
+
+        self.stats["condensed"] += 1
+        self.stats["seconds"] += seconds
+        logger.debug(f"Condensed {question!r} to {standalone!r} in {seconds:.2f}s")
+
+        return {"question": standalone, "condensed": True, "seconds": seconds}
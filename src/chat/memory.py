@@ -1,4 +1,5 @@
 from langchain.memory import ConversationBufferMemory
+from src.chat.session_store import SessionMemoryStore
 from src.config.config import get_config
 
 class ConversationMemory:
@@ -25,4 +26,25 @@ class ConversationMemory:
             return_messages=return_messages
         )
         
-        return memory
\ No newline at end of file
+        return memory
+    
+    def create_session_store(self, tokenizer=None):
+        """
+        Create a store of per-session conversation memories.
+        
+        Args:
+            tokenizer: LLM tokenizer used to measure history length
+            
+        Returns:
+            SessionMemoryStore instance
+        """
+        params = self.config.get("session_memory", {})
+        
+        return SessionMemoryStore(
+            self.create_memory,
+            tokenizer=tokenizer,
+            max_history_tokens=params.get("max_history_tokens", 1024),
+            max_sessions=params.get("max_sessions", 1000),
+            max_total_tokens=params.get("max_total_tokens", 2000000),
+            ttl_seconds=params.get("ttl_seconds", 3600)
+        )
\ No newline at end of file
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from src.config.logging import get_logger
+from src.retrival.context_packer import count_tokens
+
+logger = get_logger(__name__)
+
+
+class SessionMemoryStore:
+    """
+    Conversation memories keyed by session.
+
+    Every session gets its own memory whose history is trimmed to a token
+    budget by dropping the oldest turns. Sessions idle for longer than the
+    TTL are evicted, and least recently used sessions are evicted when there
+    are too many or their histories together exceed the total token budget.
+    """
+
+    def __init__(
+        self,
+        memory_factory,
+        tokenizer=None,
+        max_history_tokens: int = 1024,
+        max_sessions: int = 1000,
+        max_total_tokens: int = 2000000,
+        ttl_seconds: Optional[float] = 3600
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            memory_factory: Callable creating an empty conversation memory
+            tokenizer: LLM tokenizer used to count history tokens, estimated when None
+            max_history_tokens: Token budget of one session's history
+            max_sessions: Maximum number of live sessions
+            max_total_tokens: Token budget of all histories together
+            ttl_seconds: Idle time after which a session is evicted, None disables it
+        """
+        self.memory_factory = memory_factory
+        self.tokenizer = tokenizer
+        self.max_history_tokens = max_history_tokens
+        self.max_sessions = max_sessions
+        self.max_total_tokens = max_total_tokens
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_tokens = 0
+
+        self.counters = {"created": 0, "expired": 0, "evicted": 0, "trimmed_turns": 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str):
+        """
+        Get the memory of a session, creating it when needed.
+
+        The history is trimmed to the token budget before it is returned, so
+        the prompt built from it stays bounded.
+
+        Args:
+            session_id: Session key, e.g. the Gradio session hash
+
+        Returns:
+            Conversation memory instance
+        """
+        now = time.time()
+
+        with self._lock:
+            self._drop_expired(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = {"memory": self.memory_factory(), "tokens": 0}
+                self._sessions[session_id] = session
+                self.counters["created"] += 1
+
+            session["last_used"] = now
+            self._sessions.move_to_end(session_id)
+
+            self._trim(session)
+            self._enforce_limits(keep=session_id)
+
+            return session["memory"]
+
+    def clear(self, session_id: str):
+        """
+        Forget the history of a session.
+
+        Args:
+            session_id: Session key
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_tokens -= session["tokens"]
+
+    def _trim(self, session: Dict[str, Any]):
+        """Drop the oldest turns until the history fits its budget."""
+        messages = session["memory"].chat_memory.messages
+        sizes = [count_tokens(message.content, self.tokenizer) for message in messages]
+        tokens = sum(sizes)
+
+        # A turn is a question and an answer message
+        drop = 0
+        while tokens > self.max_history_tokens and drop < len(messages):
+            tokens -= sum(sizes[drop:drop + 2])
+            drop += 2
+
+        if drop:
+            session["memory"].chat_memory.messages = messages[drop:]
+            self.counters["trimmed_turns"] += drop // 2
+
+        self._total_tokens += tokens - session["tokens"]
+        session["tokens"] = tokens
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._total_tokens -= session["tokens"]
+
+    def _drop_expired(self, now: float):
+        if self.ttl_seconds is None:
+            return
+
+        # Sessions are ordered by last use, so expired ones come first
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session["last_used"] <= self.ttl_seconds:
+                break
+            self._evict(session_id)
+            self.counters["expired"] += 1
+
+    def _enforce_limits(self, keep: str):
+        """Evict least recently used sessions until both limits hold."""
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_tokens > self.max_total_tokens
+        ):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            self._evict(session_id)
+            self.counters["evicted"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store counters.
+
+        Returns:
+            Dictionary with counters, live sessions and total history tokens
+        """
+        with self._lock:
+            return {**self.counters, "sessions": len(self._sessions), "total_tokens": self._total_tokens}
@@ -25,27 +25,192 @@ def load_config():
         "use_4bit": False,
         "use_gpu": True,
         
+        # "auto" picks cuda, then mps, then cpu
+        "device": "auto",
+        # CPU loading: dtype is "bfloat16", "float32" or "int8" (dynamic
+        # quantization), num_threads None keeps the torch default
+        "cpu_params": {
+            "dtype": "bfloat16",
+            "num_threads": None
+        },
+        
         "max_length": 512,
+        # Greedy decoding unless enabled; temperature and top_p only apply when sampling
+        "do_sample": False,
         "temperature": 0.7,
         "top_p": 0.95,
         "repetition_penalty": 1.15,
         
+        # Reuse of prompt prefix key/values (QA template, chat history)
+        "prefix_cache": {
+            "enabled": True,
+            "max_entries": 16,
+            "max_mb": 512,
+            "min_tokens": 32
+        },
+        
+        # Assisted (speculative) generation with a small model sharing the tokenizer
+        "draft_model": None,
+        "draft_num_tokens": 5,
+        
+        # Dynamic batching of concurrent web requests
+        "generation_batching": {
+            "enabled": True,
+            "max_batch_size": 4,
+            "max_wait_ms": 20,
+            "max_padding_ratio": 0.5
+        },
+        "web_concurrency": 8,
+        
         "chunk_size": 1000,
         "chunk_overlap": 200,
         
+        # PDF extraction (None uses every CPU core)
+        "extraction_workers": None,
+        "extraction_pages_per_task": 100,
+        # Extracted page text cached per file hash, so re-chunking skips
+        # PDF parsing (None keeps it in ./data/page_cache)
+        "page_cache": True,
+        "page_cache_dir": None,
+        
+        # Streaming ingestion
+        "embedding_batch_size": 256,
+        "progress_interval": 10.0,
+        
+        # Embedding engine ("bucketed" or "langchain")
+        "embedding_engine": "bucketed",
+        "embedding_engine_batch_size": 32,
+        "embedding_threads": None,
+        "embedding_replicas": 1,
+        # "float32", "bfloat16" or "int8" (dynamic quantization)
+        "embedding_dtype": "float32",
+        
+        # Embedding cache
+        "embedding_cache": True,
+        "embedding_cache_dir": "./data/embedding_cache",
+        "embedding_cache_max_mb": 1024,
+        # Query vectors are cached in memory only
+        "query_embedding_cache_size": 256,
+        
         "retriever_k": 3,
         "search_type": "similarity",
         
+        # BM25 index for the "hybrid" search type (None keeps it in vector_store_dir/lexical)
+        "lexical_index": True,
+        "lexical_index_dir": None,
+        "bm25_params": {
+            "k1": 1.5,
+            "b": 0.75
+        },
+        "hybrid_params": {
+            "candidate_k": 20,
+            "rrf_k": 60
+        },
+        
+        # Merge neighbouring chunks and cap the prompt context (in LLM tokens)
+        "context_packing": True,
+        "context_max_tokens": 1500,
+        
+        # Vector store backend ("chroma" or "flat") and flat vector dtype
+        "vector_backend": "chroma",
+        "flat_dtype": "float32",
+        
+        # Approximate search for the flat backend ("none" or "ivf")
+        "ann_index": "none",
+        "ivf_params": {
+            "nlist": 0,
+            "nprobe": 8,
+            "train_size": 50000,
+            "iterations": 10,
+            "min_rows": 10000,
+            "rebuild_ratio": 0.1
+        },
+        
+        # Quantized vectors for the flat backend ("none", "int8" or "pq")
+        "vector_quantization": "none",
+        "quantization_params": {
+            "train_size": 50000,
+            "pq_m": 0,
+            "pq_iterations": 10,
+            "rescore_factor": 4,
+            "max_rescore_factor": 64,
+            "recall_tolerance": 0.01,
+            "min_rows": 10000,
+            "rebuild_ratio": 0.1
+        },
+        
+        # Semantic answer cache (persisted to path when persist is set)
+        "answer_cache": True,
+        "answer_cache_params": {
+            "threshold": 0.95,
+            "max_entries": 1000,
+            "ttl_seconds": 86400,
+            "persist": False,
+            "path": "./data/answer_cache.json",
+            # Persisted file is written in the background this long after a change
+            "save_delay_seconds": 5.0
+        },
+        
+        # Follow-up question rewriting ("always", "heuristic" or "never");
+        # condense_model is an optional smaller model used for it
+        "condense_mode": "heuristic",
+        "condense_model": None,
+        "condense_max_new_tokens": 64,
+        
         "memory_key": "chat_history",
         "return_messages": True,
         "return_source_docs": True,
         
+        # Per-session memory of the web interface (history budgets in LLM tokens)
+        "session_memory": {
+            "max_history_tokens": 1024,
+            "max_sessions": 1000,
+            "max_total_tokens": 2000000,
+            "ttl_seconds": 3600
+        },
+        
         "pdf_dir": "./data/pdf_specs",
         "vector_store_dir": "./data/vector_store",
         "model_cache_dir": "./models",
+        # Load artifacts written by script/download_model.py --prepare when present
+        "use_prepared_models": True,
+        # Load the vector store and the LLM concurrently at startup
+        "parallel_startup": True,
+        
+        # Stage spans aggregated into histograms, exposed on
+        # http://127.0.0.1:<port>/metrics and/or logged every interval
+        "metrics": {
+            "enabled": False,
+            "port": None,
+            "log_interval_seconds": 60
+        },
+        
+        # --profile output: pstats, collapsed stacks, tracemalloc snapshots
+        # and stage timings in <output_dir>/<run>-<timestamp>
+        "profiling": {
+            "output_dir": "./profiles",
+            "sample_interval_seconds": 0.005,
+            "tracemalloc_frames": 10
+        },
         
         # Logging
-        "log_level": "INFO"
+        "log_level": "INFO",
+        # Records go through a bounded queue to a background writer; the file
+        # is rotated at max_bytes, and each call site at or below
+        # rate_limit.max_level is limited to per_second records after a burst
+        "logging": {
+            "file": "logs/pdf_bot.log",
+            "max_bytes": 10 * 1024 * 1024,
+            "backup_count": 5,
+            "json": False,
+            "queue_size": 10000,
+            "rate_limit": {
+                "enabled": True,
+                "max_level": "DEBUG",
+                "per_second": 10.0,
+                "burst": 20
+            }
+        }
     }
     
     config_path = os.environ.get("CONFIG_PATH", "config.json")
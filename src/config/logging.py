@@ -1,26 +1,219 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from src.config.config import get_config
 
+_listener = None
+_queue_handler = None
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+    """
+    
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit chatty log call sites.
+    
+    Every call site (file and line) at or below max_level gets a token
+    bucket, so a per-page or per-chunk debug message is let through at most
+    `rate` times per second after an initial burst. Records above max_level
+    always pass. The next record let through reports how many were dropped.
+    """
+    
+    def __init__(self, rate: float = 10.0, burst: int = 20, max_level: int = logging.DEBUG):
+        """
+        Initialize the filter.
+        
+        Args:
+            rate: Records per second allowed per call site
+            burst: Records allowed at once before limiting starts
+            max_level: Highest level that is rate limited
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self._lock = threading.Lock()
+        # (pathname, lineno) -> [tokens, last refill, suppressed]
+        self._buckets = {}
+    
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that drops records instead of blocking when the queue is full.
+    
+    The caller only formats the record and appends it to the queue, file and
+    terminal writes happen on the listener thread.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Only merge the arguments into the message while they are current;
+        # the traceback is kept for the writer's formatter (text or JSON)
+        # instead of being folded into the message here
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BlockingStopQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener whose stop sentinel waits for room in a full queue.
+    
+    The default put_nowait raises queue.Full at exit when the queue is full;
+    the writer thread keeps draining, so a blocking put always gets through.
+    """
+    
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _build_handlers(params: dict, log_level: int):
+    """
+    Create the handlers run by the background writer thread.
+    
+    Args:
+        params: Config "logging" section
+        log_level: Level of the file and console handlers
+    
+    Returns:
+        List of handlers
+    """
+    formatter = JsonFormatter() if params.get("json", False) else logging.Formatter(LOG_FORMAT)
+    
+    path = params.get("file", "logs/pdf_bot.log")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    file_handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=params.get("max_bytes", 10 * 1024 * 1024),
+        backupCount=params.get("backup_count", 5),
+        encoding="utf-8"
+    )
+    console_handler = logging.StreamHandler()
+    
+    handlers = [file_handler, console_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.setLevel(log_level)
+    return handlers
+
+def _stop_listener():
+    """Flush the queue and stop the writer thread."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        if _queue_handler.dropped:
+            _listener.handle(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {_queue_handler.dropped} log records because the log queue was full",
+            }))
+        _listener = None
+        _queue_handler = None
+
 # Configure logging
 def setup_logging():
-    """Configure global logging settings."""
+    """
+    Configure global logging settings.
+    
+    Records are put on a bounded queue by a non-blocking handler and written
+    to a size-rotated file and the terminal by a background thread, so
+    logging never waits on disk or terminal I/O. Calling it again is a no-op.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    
     config = get_config()
     log_level_str = config.get("log_level", "INFO")
     log_level = getattr(logging, log_level_str)
+    params = config.get("logging", {})
+    
+    log_queue = queue.Queue(maxsize=params.get("queue_size", 10000))
+    queue_handler = _queue_handler = NonBlockingQueueHandler(log_queue)
+    
+    rate_limit = params.get("rate_limit", {})
+    if rate_limit.get("enabled", True):
+        # Filtered on the caller's thread, so suppressed records are never queued
+        queue_handler.addFilter(RateLimitFilter(
+            rate=rate_limit.get("per_second", 10.0),
+            burst=rate_limit.get("burst", 20),
+            max_level=getattr(logging, rate_limit.get("max_level", "DEBUG"))
+        ))
     
-    # Create logs directory if it doesn't exist
-    os.makedirs("logs", exist_ok=True)
-    
-    # Configure logging
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler("logs/pdf_bot.log"),
-            logging.StreamHandler()
-        ]
+    root = logging.getLogger()
+    root.setLevel(log_level)
+    root.addHandler(queue_handler)
+    
+    _listener = BlockingStopQueueListener(
+        log_queue,
+        *_build_handlers(params, log_level),
+        respect_handler_level=True
     )
+    _listener.start()
+    atexit.register(_stop_listener)
 
 def get_logger(name):
     """
@@ -28,8 +221,8 @@ def get_logger(name):
     
     Args:
         name: Logger name, typically __name__
-        
+    
     Returns:
         Logger instance
     """
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,270 @@
+import time
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator
+from src.config.config import get_config
+from src.config.logging import get_logger
+from src.embeddings.manifest import IndexManifest
+from src.monitoring.memory import peak_rss_mb
+from src.monitoring.metrics import get_metrics
+from src.retrival.bm25 import BM25Builder, lexical_index_dir
+
+logger = get_logger(__name__)
+
+
+class IngestionPipeline:
+    """
+    Stream PDFs into the vector store with bounded memory.
+
+    Documents are extracted lazily, split into chunks, grouped into fixed
+    size embedding batches and written to the store batch by batch, so at
+    most one document and one batch of chunks are held in memory.
+    """
+
+    def __init__(self, pdf_processor, doc_splitter, vector_store_manager, batch_size: int = None):
+        """
+        Initialize the ingestion pipeline.
+
+        Args:
+            pdf_processor: PDFProcessor instance
+            doc_splitter: DocumentSplitter instance
+            vector_store_manager: VectorStore instance
+            batch_size: Number of chunks embedded and written at once
+        """
+        self.config = get_config()
+        self.pdf_processor = pdf_processor
+        self.doc_splitter = doc_splitter
+        self.vector_store_manager = vector_store_manager
+        self.batch_size = batch_size or self.config.get("embedding_batch_size", 256)
+        self.progress_interval = self.config.get("progress_interval", 10.0)
+        self.metrics = get_metrics()
+
+        self.stats = {
+            "documents": 0,
+            "chunks": 0,
+            "batches": 0,
+        }
+        self.chunk_counts: Dict[str, int] = {}
+
+        self.lexical_builder = None
+        if self.config.get("lexical_index", True):
+            self.lexical_builder = BM25Builder(lexical_index_dir(self.config))
+
+    def _count_documents(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass documents through while counting them."""
+        for doc in documents:
+            self.stats["documents"] += 1
+            self.chunk_counts[doc["metadata"]["source"]] = 0
+            yield doc
+
+    def _iter_chunks(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Split documents into chunks, timing extraction and splitting apart.
+
+        Documents are pulled one at a time, so the extraction span covers
+        reading the next document and the splitting span its chunking.
+
+        Args:
+            documents: Lazily extracted documents
+
+        Yields:
+            Document chunks
+        """
+        documents = self._count_documents(documents)
+        while True:
+            with self.metrics.span("extraction"):
+                doc = next(documents, None)
+            if doc is None:
+                return
+
+            with self.metrics.span("splitting") as span:
+                chunks = list(self.doc_splitter.iter_split_documents([doc]))
+                span.set(chunks=len(chunks))
+            yield from chunks
+
+    @staticmethod
+    def iter_batches(chunks: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Group a chunk stream into fixed size batches.
+
+        Args:
+            chunks: Iterable of document chunks
+            batch_size: Maximum batch size
+
+        Yields:
+            Lists of at most batch_size chunks
+        """
+        chunks = iter(chunks)
+        while True:
+            batch = list(islice(chunks, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def build_params(self) -> Dict[str, Any]:
+        """
+        Get the parameters that invalidate the whole index when they change.
+
+        Returns:
+            Dictionary of build parameters recorded in the manifest
+        """
+        embedding_model = self.config.get("embedding_model")
+        embedding_dtype = self.config.get("embedding_dtype", "float32")
+        if embedding_dtype != "float32":
+            embedding_model = f"{embedding_model}@{embedding_dtype}"
+
+        params = {
+            "chunk_size": self.doc_splitter.chunk_size,
+            "chunk_overlap": self.doc_splitter.chunk_overlap,
+            "chunk_metadata_version": self.doc_splitter.metadata_version,
+            "embedding_model": embedding_model,
+            "lexical_index": self.lexical_builder is not None,
+            "vector_backend": self.vector_store_manager.backend,
+        }
+
+        if self.vector_store_manager.backend == "flat":
+            # Search-time settings (nprobe, rescore factor) are left out, they need no rebuild
+            ivf_params = self.config.get("ivf_params") or {}
+            quantization_params = self.config.get("quantization_params") or {}
+            params.update({
+                "flat_dtype": self.config.get("flat_dtype", "float32"),
+                "ann_index": self.config.get("ann_index", "none"),
+                "ivf_build": {key: ivf_params.get(key) for key in ("nlist", "train_size", "iterations")},
+                "vector_quantization": self.config.get("vector_quantization", "none"),
+                "quantization_build": {key: quantization_params.get(key) for key in ("train_size", "pq_m", "pq_iterations")},
+            })
+
+        return params
+
+    def run(self, full_rebuild: bool = False):
+        """
+        Bring the vector store up to date with the PDF directory.
+
+        Only new or changed PDFs are extracted and embedded, and chunks of
+        changed or deleted PDFs are removed from the store. Everything is
+        rebuilt when there is no manifest, the build parameters changed or
+        full_rebuild is set.
+
+        Args:
+            full_rebuild: Ignore the manifest and rebuild from scratch
+
+        Returns:
+            Vector store instance
+        """
+        persist_directory = self.vector_store_manager.persist_directory
+        manifest = IndexManifest.load(persist_directory)
+        params = self.build_params()
+
+        pdf_files = self.pdf_processor.list_pdf_files()
+        fingerprints = manifest.hash_files(self.pdf_processor.pdf_dir, pdf_files)
+        previous_hashes = {entry["hash"] for entry in manifest.files.values()}
+
+        if full_rebuild or not manifest.files or manifest.params != params:
+            logger.info(f"Full rebuild of {len(pdf_files)} PDFs")
+            vector_store = self.vector_store_manager.create_empty()
+            if self.lexical_builder:
+                self.lexical_builder.clear()
+            manifest.files = {}
+            to_index = pdf_files
+            removed_sources = []
+        else:
+            added, changed, removed = manifest.diff(fingerprints)
+            logger.info(
+                f"Incremental rebuild: {len(added)} added, {len(changed)} changed, "
+                f"{len(removed)} removed, {len(pdf_files) - len(added) - len(changed)} unchanged"
+            )
+
+            vector_store = self.vector_store_manager.load()
+            removed_sources = changed + removed
+            for filename in removed_sources:
+                entry = manifest.files.pop(filename)
+                self.vector_store_manager.delete_source(vector_store, filename, entry.get("chunks", 0))
+                if self.lexical_builder:
+                    self.lexical_builder.remove_source(filename)
+
+            to_index = sorted(added + changed)
+
+        manifest.params = params
+
+        if to_index:
+            hashes = {filename: fingerprints[filename]["hash"] for filename in to_index}
+            self.ingest(vector_store, self.pdf_processor.iter_documents(to_index, hashes=hashes))
+        elif removed_sources and hasattr(vector_store, "persist"):
+            # ingest() persists after adding, a deletion-only run has to do it here
+            with self.metrics.span("persist"):
+                vector_store.persist()
+
+        if self.lexical_builder and (to_index or removed_sources or not self.lexical_builder.is_built()):
+            self.lexical_builder.build(**self.config.get("bm25_params", {}))
+
+        for filename, chunk_count in self.chunk_counts.items():
+            manifest.files[filename] = {**fingerprints[filename], "chunks": chunk_count}
+
+        manifest.save()
+        self.stats["index_version"] = manifest.version
+
+        # Extracted pages of changed or removed PDFs are never read again
+        page_cache = getattr(self.pdf_processor, "page_cache", None)
+        if page_cache is not None:
+            for file_hash in previous_hashes - {entry["hash"] for entry in fingerprints.values()}:
+                page_cache.remove(file_hash)
+
+        return vector_store
+
+    def ingest(self, vector_store, documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Stream documents into an existing vector store.
+
+        Args:
+            vector_store: Vector store instance to add chunks to
+            documents: Iterable of documents with 'content' and 'metadata'
+
+        Returns:
+            Dictionary of ingestion statistics
+        """
+        start = time.perf_counter()
+        last_report = start
+
+        chunks = self._iter_chunks(documents)
+
+        for batch in self.iter_batches(chunks, self.batch_size):
+            # Embedding plus the store write, the embedder records its own span
+            with self.metrics.span("indexing") as span:
+                span.set(chunks=len(batch))
+                self.vector_store_manager.add_documents(vector_store, batch)
+            if self.lexical_builder:
+                with self.metrics.span("lexical_indexing"):
+                    self.lexical_builder.add_chunks(batch)
+            self.stats["chunks"] += len(batch)
+            for chunk in batch:
+                self.chunk_counts[chunk["metadata"]["source"]] = chunk["metadata"]["chunk_count"]
+            self.stats["batches"] += 1
+
+            now = time.perf_counter()
+            if now - last_report >= self.progress_interval:
+                self._report(now - start)
+                last_report = now
+
+        if hasattr(vector_store, "persist"):
+            with self.metrics.span("persist"):
+                vector_store.persist()
+
+        self.stats["seconds"] = time.perf_counter() - start
+        self.stats["peak_rss_mb"] = peak_rss_mb()
+        self._report(self.stats["seconds"], final=True)
+
+        return self.stats
+
+    def _report(self, elapsed: float, final: bool = False):
+        """
+        Log progress and throughput.
+
+        Args:
+            elapsed: Seconds since ingestion started
+            final: Whether this is the final summary
+        """
+        rate = self.stats["chunks"] / elapsed if elapsed > 0 else 0.0
+        prefix = "Ingestion finished" if final else "Ingestion progress"
+        logger.info(
+            f"{prefix}: {self.stats['documents']} documents, {self.stats['chunks']} chunks "
+            f"in {elapsed:.1f}s ({rate:.1f} chunks/s), peak RSS {peak_rss_mb():.0f} MB"
+        )
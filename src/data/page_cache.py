@@ -0,0 +1,171 @@
+import glob
+import gzip
+import json
+import os
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def page_offsets(pages: List[str]) -> List[int]:
+    """
+    Get the character offset of every page in the joined document text.
+
+    Pages are joined with a trailing newline each, as PDFProcessor does.
+
+    Args:
+        pages: Page texts in page order
+
+    Returns:
+        Start offset of each page
+    """
+    offsets = []
+    position = 0
+    for text in pages:
+        offsets.append(position)
+        position += len(text) + 1
+    return offsets
+
+
+def page_at(offsets: List[int], position: int) -> int:
+    """
+    Find the page containing a character offset.
+
+    Args:
+        offsets: Start offset of each page
+        position: Character offset in the document text
+
+    Returns:
+        1-based page number
+    """
+    return max(bisect_right(offsets, position), 1)
+
+
+class PageCache:
+    """
+    Extracted page text stored on disk, keyed by file hash and extractor version.
+
+    Every PDF gets one gzip file holding a JSON header line with the page
+    count and the offset of every page, followed by the document text. A
+    re-chunking build reads the text back instead of parsing the PDF again,
+    and a changed file or extractor simply misses the cache.
+    """
+
+    def __init__(self, directory: str, extractor_version: str):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory, created on first write
+            extractor_version: Version of the extraction code and library,
+                part of every key so an upgrade invalidates old entries
+        """
+        self.directory = directory
+        self.extractor_version = extractor_version
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, file_hash: str) -> str:
+        """
+        Get the cache file of a PDF.
+
+        Args:
+            file_hash: SHA-256 of the PDF file
+
+        Returns:
+            Path of the cache entry
+        """
+        return os.path.join(self.directory, file_hash[:2], f"{file_hash}-{self.extractor_version}.pages.gz")
+
+    def load(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the extracted text of a PDF.
+
+        Args:
+            file_hash: SHA-256 of the PDF file
+
+        Returns:
+            Dictionary with 'content', 'page_count' and 'page_offsets', or
+            None when the entry is missing or unreadable
+        """
+        path = self.path(file_hash)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                content = f.read()
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page cache entry {path}: {str(e)}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {
+            "content": content,
+            "page_count": header["page_count"],
+            "page_offsets": header["page_offsets"],
+        }
+
+    def save(self, file_hash: str, content: str, offsets: List[int]):
+        """
+        Store the extracted text of a PDF.
+
+        The entry is written to a temporary file and renamed, so readers
+        never see a partial entry.
+
+        Args:
+            file_hash: SHA-256 of the PDF file
+            content: Document text, pages joined as by PDFProcessor
+            offsets: Start offset of each page
+        """
+        path = self.path(file_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        header = {
+            "extractor_version": self.extractor_version,
+            "page_count": len(offsets),
+            "page_offsets": offsets,
+        }
+        tmp_path = f"{path}.tmp"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                f.write(json.dumps(header) + "\n")
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove(self, file_hash: str):
+        """
+        Drop every entry of a PDF, whatever extractor version wrote it.
+
+        Args:
+            file_hash: SHA-256 of the PDF file
+        """
+        for path in glob.glob(os.path.join(self.directory, file_hash[:2], f"{file_hash}-*.pages.gz")):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove page cache entry {path}: {str(e)}")
+
+
+def page_cache_dir(config: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the page cache directory, ./data/page_cache by default.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Directory path, or None when the cache is disabled
+    """
+    if not config.get("page_cache", True):
+        return None
+    return config.get("page_cache_dir") or "./data/page_cache"
@@ -1,87 +1,317 @@
 import os
-import fitz  
-from typing import List, Dict, Any
+import fitz
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from src.config.logging import get_logger
+from src.data.page_cache import PageCache, page_offsets
+from src.embeddings.manifest import file_sha256
 
 logger = get_logger(__name__)
 
+# Part of every page cache key, bump it when the extracted text changes
+EXTRACTOR_VERSION = f"1-pymupdf{fitz.version[0]}"
+
+
+def _get_page_text(page) -> str:
+    """
+    Extract the text of a single page, supporting older PyMuPDF APIs.
+
+    Args:
+        page: PyMuPDF page object
+
+    Returns:
+        Page text
+    """
+    try:
+        return page.get_text()
+    except AttributeError:
+        try:
+            return page.getText()
+        except AttributeError:
+            # Last resort for very old versions
+            return page.extractText()
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract the text of pages [start, end) from a PDF file.
+
+    This runs inside worker processes, so it has to stay a module level
+    function that can be pickled.
+
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page number (inclusive)
+        end: Last page number (exclusive)
+
+    Returns:
+        List of page texts in page order
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        return [
+            _get_page_text(doc.load_page(page_num))
+            for page_num in range(start, min(end, len(doc)))
+        ]
+    finally:
+        doc.close()
+
+
 class PDFProcessor:
     """
     Extract and process text from PDF files.
     """
-    
-    def __init__(self, pdf_dir: str):
+
+    def __init__(self, pdf_dir: str, num_workers: Optional[int] = 1, pages_per_task: int = 100,
+                 cache_dir: Optional[str] = None):
         """
         Initialize the PDF processor.
-        
+
         Args:
             pdf_dir: Directory containing PDF files
+            num_workers: Number of extraction processes. 1 extracts in the
+                current process, None uses every available CPU core
+            pages_per_task: Maximum number of pages handed to a worker at
+                once, so very large PDFs are split across workers
+            cache_dir: Page cache directory, extracted text is stored there
+                and read back instead of parsing unchanged PDFs again
         """
         self.pdf_dir = pdf_dir
-        
+        self.num_workers = num_workers if num_workers is not None else (os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task)
+        self.page_cache = PageCache(cache_dir, EXTRACTOR_VERSION) if cache_dir else None
+
+    def list_pdf_files(self) -> List[str]:
+        """
+        List the PDF files in the directory in a deterministic order.
+
+        Returns:
+            Sorted list of PDF file names
+        """
+        return sorted(f for f in os.listdir(self.pdf_dir) if f.lower().endswith('.pdf'))
+
     def process_all_pdfs(self) -> List[Dict[str, Any]]:
         """
         Process all PDF files in the directory.
-        
+
         Returns:
-            List of documents with text content and metadata
+            List of documents with text content and metadata, ordered by file name
         """
-        documents = []
-        pdf_files = [f for f in os.listdir(self.pdf_dir) if f.lower().endswith('.pdf')]
-        
+        return list(self.iter_documents())
+
+    def iter_documents(self, pdf_files: Optional[List[str]] = None,
+                       hashes: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily extract PDF files one document at a time.
+
+        Only the documents currently being extracted are held in memory, so
+        this is the entry point for streaming ingestion. With a page cache,
+        cached documents are read back first, then the remaining PDFs are
+        parsed and added to the cache, so each group is in file name order
+        but the two are not interleaved. The cache is best effort: entries
+        that cannot be written are only logged.
+
+        Args:
+            pdf_files: PDF file names to extract, defaults to every PDF in the directory
+            hashes: Known SHA-256 hashes by file name, computed when missing
+
+        Yields:
+            Documents with text content, metadata and 'page_offsets', the
+            start of every page in the content
+        """
+        if pdf_files is None:
+            pdf_files = self.list_pdf_files()
+
         logger.info(f"Found {len(pdf_files)} PDF files to process")
-        
+
+        if self.page_cache is None:
+            yield from self._iter_extracted(pdf_files)
+            return
+
+        hashes = dict(hashes or {})
+        missing = []
+        for filename in pdf_files:
+            if filename not in hashes:
+                hashes[filename] = file_sha256(os.path.join(self.pdf_dir, filename))
+            cached = self.page_cache.load(hashes[filename])
+            if cached is None:
+                missing.append(filename)
+                continue
+
+            yield self._make_document(filename, cached["content"], cached["page_offsets"])
+
+        if missing:
+            logger.info(f"Page cache: {len(pdf_files) - len(missing)} PDFs cached, parsing {len(missing)}")
+
+        for doc in self._iter_extracted(missing):
+            try:
+                self.page_cache.save(hashes[doc["metadata"]["source"]], doc["content"], doc["page_offsets"])
+            except OSError as e:
+                logger.warning(f"Could not cache pages of {doc['metadata']['source']}: {str(e)}")
+            yield doc
+
+    @staticmethod
+    def _make_document(filename: str, content: str, offsets: List[int]) -> Dict[str, Any]:
+        """
+        Build a document from its text and page offsets.
+
+        Args:
+            filename: PDF file name
+            content: Text of every page, each followed by a newline
+            offsets: Start offset of each page in content
+
+        Returns:
+            Document dictionary
+        """
+        return {
+            "content": content,
+            "metadata": {
+                "source": filename,
+                "page_count": len(offsets)
+            },
+            "page_offsets": offsets
+        }
+
+    @staticmethod
+    def _join_pages(filename: str, pages: List[str]) -> Dict[str, Any]:
+        """
+        Build a document from extracted page texts.
+
+        Args:
+            filename: PDF file name
+            pages: Page texts in page order
+
+        Returns:
+            Document dictionary
+        """
+        return PDFProcessor._make_document(filename, "".join(f"{text}\n" for text in pages), page_offsets(pages))
+
+    def _iter_extracted(self, pdf_files: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Parse PDF files, in worker processes when configured.
+
+        Args:
+            pdf_files: Sorted list of PDF file names
+
+        Yields:
+            Documents in the same order as pdf_files
+        """
+        if self.num_workers > 1 and pdf_files:
+            yield from self._iter_parallel(pdf_files)
+            return
+
         for filename in pdf_files:
             try:
                 pdf_path = os.path.join(self.pdf_dir, filename)
-                content, metadata = self._extract_from_pdf(pdf_path)
-                
-                documents.append({
-                    "content": content,
-                    "metadata": {
-                        "source": filename,
-                        **metadata
-                    }
-                })
-                
-                logger.info(f"Processed PDF: {filename}")
-                
+                pages = self._extract_from_pdf(pdf_path)
             except Exception as e:
                 logger.error(f"Error processing PDF {filename}: {str(e)}")
-                
-        return documents
-    
-    def _extract_from_pdf(self, pdf_path: str) -> tuple:
+                continue
+
+            logger.info(f"Processed PDF: {filename}")
+
+            yield self._join_pages(filename, pages)
+
+    def _iter_tasks(self, pdf_files: List[str]) -> Iterator[tuple]:
         """
-        Extract text and metadata from a single PDF file.
-        
+        Split PDF files into page range tasks.
+
+        Args:
+            pdf_files: PDF file names
+
+        Yields:
+            Tuples of (filename, pdf_path, start, end, page_count)
+        """
+        for filename in pdf_files:
+            pdf_path = os.path.join(self.pdf_dir, filename)
+            try:
+                doc = fitz.open(pdf_path)
+                page_count = len(doc)
+                doc.close()
+            except Exception as e:
+                logger.error(f"Error processing PDF {filename}: {str(e)}")
+                continue
+
+            for start in range(0, max(page_count, 1), self.pages_per_task):
+                yield filename, pdf_path, start, start + self.pages_per_task, page_count
+
+    def _iter_parallel(self, pdf_files: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Extract PDFs with a process pool, split per file and per page range.
+
+        At most two tasks per worker are in flight at any time and results
+        are consumed in submission order, which keeps memory bounded and the
+        output order deterministic.
+
+        Args:
+            pdf_files: Sorted list of PDF file names
+
+        Yields:
+            Documents in the same order as pdf_files
+        """
+        logger.info(f"Extracting PDFs with {self.num_workers} workers")
+
+        tasks = self._iter_tasks(pdf_files)
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+
+            def submit_next() -> bool:
+                task = next(tasks, None)
+                if task is None:
+                    return False
+                _, pdf_path, start, end, _ = task
+                pending.append((task, executor.submit(_extract_page_range, pdf_path, start, end)))
+                return True
+
+            while len(pending) < self.num_workers * 2 and submit_next():
+                pass
+
+            pages = []
+            failed = None
+
+            while pending:
+                (filename, _, _, end, page_count), future = pending.popleft()
+                submit_next()
+
+                try:
+                    texts = future.result()
+                except Exception as e:
+                    if failed != filename:
+                        logger.error(f"Error processing PDF {filename}: {str(e)}")
+                    failed = filename
+                    texts = []
+
+                if failed != filename:
+                    pages.extend(texts)
+
+                if end < page_count:
+                    continue
+
+                if failed != filename:
+                    logger.info(f"Processed PDF: {filename}")
+                    yield self._join_pages(filename, pages)
+                pages = []
+
+    def _extract_from_pdf(self, pdf_path: str) -> List[str]:
+        """
+        Extract the text of every page of a single PDF file.
+
         Args:
             pdf_path: Path to the PDF file
-            
+
         Returns:
-            Tuple of (content, metadata)
+            List of page texts in page order
         """
-        
-        print("::: show pdf path " , pdf_path)
+        logger.debug(f"Extracting text from {pdf_path}")
         doc = fitz.open(pdf_path)
-        
 
-        
-        full_text = ""
+        pages = []
         for page_num in range(len(doc)):
             page = doc.load_page(page_num)
-            
-            try:
-                text = page.get_text()
-                print("::: full text ", full_text)
-            except AttributeError:
-                try:
-                    text = page.getText()
-                except AttributeError:
-                    # Last resort for very old versions
-                    text = page.extractText()
-                    
-            full_text += f"{text}\n"
-
-        
-        return full_text 
\ No newline at end of file
+            pages.append(_get_page_text(page))
+
+        doc.close()
+
+        return pages
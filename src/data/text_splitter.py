@@ -1,11 +1,16 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
+from src.data.page_cache import page_at
 
 class DocumentSplitter:
     """
     Split documents into smaller chunks for more effective retrieval.
     """
     
+    # Bumped whenever chunk metadata gains fields, so indexes are rebuilt with them
+    # (2: page and page_end)
+    metadata_version = 2
+    
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
         """
         Initialize the document splitter.
@@ -14,6 +19,8 @@ class DocumentSplitter:
             chunk_size: Maximum size of each chunk
             chunk_overlap: Overlap between chunks
         """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -30,16 +37,29 @@ class DocumentSplitter:
         Returns:
             List of document chunks with preserved metadata
         """
-        chunks = []
+        return list(self.iter_split_documents(documents))
+    
+    def iter_split_documents(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split documents into chunks, one document at a time.
         
+        Args:
+            documents: Iterable of document dictionaries with 'content' and 'metadata'
+            
+        Yields:
+            Document chunks with preserved metadata, plus the 1-based 'page'
+            and 'page_end' they span when the document has 'page_offsets'
+        """
         for doc in documents:
             content = doc["content"]
             metadata = doc["metadata"]
+            offsets = doc.get("page_offsets")
             
             # Split the text into chunks
             text_chunks = self.text_splitter.split_text(content)
             
             # Create document objects for each chunk with metadata
+            search_from = 0
             for i, chunk in enumerate(text_chunks):
                 # Add chunk index to metadata
                 chunk_metadata = {
@@ -48,9 +68,15 @@ class DocumentSplitter:
                     "chunk_count": len(text_chunks)
                 }
                 
-                chunks.append({
+                if offsets:
+                    # Chunks come in order and may overlap the previous one
+                    start = content.find(chunk, search_from)
+                    if start >= 0:
+                        search_from = max(search_from, start + len(chunk) - self.chunk_overlap, start + 1)
+                        chunk_metadata["page"] = page_at(offsets, start)
+                        chunk_metadata["page_end"] = page_at(offsets, start + len(chunk) - 1)
+                
+                yield {
                     "content": chunk,
                     "metadata": chunk_metadata
-                })
-                
-        return chunks
\ No newline at end of file
+                }
@@ -0,0 +1,133 @@
+import json
+import mmap
+import os
+import threading
+from typing import List, Dict, Any, Iterable
+import numpy as np
+
+
+class DocStore:
+    """
+    Append-only record file with random access by row number.
+
+    Records are JSON lines in a data file and their byte offsets are kept in
+    a NumPy side file, so a record can be read without parsing the rest of
+    the file. Reads go through a memory map and are safe across threads.
+    """
+
+    def __init__(self, directory: str, name: str = "docs"):
+        """
+        Open or create a record store.
+
+        Args:
+            directory: Directory holding the files
+            name: Base name of the data and offsets files
+        """
+        self.directory = directory
+        self.data_path = os.path.join(directory, f"{name}.jsonl")
+        self.offsets_path = os.path.join(directory, f"{name}.offsets.npy")
+
+        self._lock = threading.Lock()
+        self._map = None
+        self._offsets = [0]
+
+        if os.path.exists(self.offsets_path) and os.path.exists(self.data_path):
+            offsets = np.load(self.offsets_path)
+            data_size = os.path.getsize(self.data_path)
+            # Drop records written after the last flush
+            self._offsets = [int(o) for o in offsets if o <= data_size]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, records: Iterable[Dict[str, Any]]):
+        """
+        Append records to the store.
+
+        Args:
+            records: JSON-serializable dictionaries
+        """
+        lines = [(json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records]
+        if not lines:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            with open(self.data_path, "ab") as f:
+                f.seek(self._offsets[-1])
+                f.truncate()
+                f.write(b"".join(lines))
+
+            for line in lines:
+                self._offsets.append(self._offsets[-1] + len(line))
+            self._map = None
+
+    def truncate(self, rows: int):
+        """
+        Drop the records after the first rows, the next append overwrites them.
+
+        Args:
+            rows: Number of records to keep
+        """
+        with self._lock:
+            self._offsets = self._offsets[:rows + 1]
+            self._map = None
+
+    def _get_map(self):
+        """Get a read-only memory map of the data file."""
+        with self._lock:
+            if self._map is None or len(self._map) < self._offsets[-1]:
+                with open(self.data_path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """
+        Read a single record.
+
+        Args:
+            row: Record number
+
+        Returns:
+            Record dictionary
+        """
+        data = self._get_map()
+        return json.loads(data[self._offsets[row]:self._offsets[row + 1]].decode("utf-8"))
+
+    def get_many(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        Read several records.
+
+        Args:
+            rows: Record numbers
+
+        Returns:
+            List of record dictionaries in the same order
+        """
+        return [self.get(int(row)) for row in rows]
+
+    def flush(self):
+        """Write the offsets side file."""
+        os.makedirs(self.directory, exist_ok=True)
+        np.save(self.offsets_path, np.asarray(self._offsets, dtype=np.int64))
+
+    def rewrite(self, rows: Iterable[int]):
+        """
+        Keep only the given records, in the given order.
+
+        Args:
+            rows: Record numbers to keep
+        """
+        records = self.get_many(rows)
+        self.clear()
+        self.append(records)
+        self.flush()
+
+    def clear(self):
+        """Remove all records."""
+        with self._lock:
+            self._map = None
+            self._offsets = [0]
+            for path in (self.data_path, self.offsets_path):
+                if os.path.exists(path):
+                    os.remove(path)
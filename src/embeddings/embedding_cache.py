@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+KEY_BYTES = 16
+
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of embedding vectors keyed by model and chunk text.
+
+    Vectors are appended as float16 rows to a memory-mapped file and the
+    16-byte text hash of every row is appended to a parallel key file, so
+    the row number doubles as the offset index. Later rows for the same key
+    supersede earlier ones. When the cache grows past max_bytes the most
+    recently used entries are compacted into new files.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str, max_bytes: int):
+        """
+        Initialize the cache and load its index.
+
+        Args:
+            cache_dir: Root cache directory
+            model_name: Embedding model name, each model gets its own subdirectory
+            max_bytes: Size limit of the cache files in bytes
+        """
+        model_hash = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:16]
+        self.directory = os.path.join(cache_dir, model_hash)
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+
+        self.keys_path = os.path.join(self.directory, "keys.bin")
+        self.vectors_path = os.path.join(self.directory, "vectors.f16")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._vectors = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """
+        Hash the whitespace-normalized text of a chunk.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            16-byte key
+        """
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).digest()[:KEY_BYTES]
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the key and vector files in bytes."""
+        if self._dim is None:
+            return 0
+        return self._rows * (KEY_BYTES + self._dim * 2)
+
+    def _load(self):
+        """Load the key index from disk, dropping any partially written rows."""
+        if not os.path.exists(self.meta_path):
+            return
+
+        if not (os.path.exists(self.keys_path) and os.path.exists(self.vectors_path)):
+            self._reset_files()
+            return
+
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+
+        if meta.get("model_name") != self.model_name:
+            logger.warning(f"Embedding cache in {self.directory} belongs to another model, resetting it")
+            self._reset_files()
+            return
+
+        self._dim = meta["dim"]
+
+        with open(self.keys_path, "rb") as f:
+            keys = f.read()
+
+        vector_rows = os.path.getsize(self.vectors_path) // (self._dim * 2)
+        self._rows = min(len(keys) // KEY_BYTES, vector_rows)
+
+        for row in range(self._rows):
+            key = keys[row * KEY_BYTES:(row + 1) * KEY_BYTES]
+            self._index[key] = row
+            self._index.move_to_end(key)
+
+        logger.info(f"Loaded embedding cache with {len(self._index)} vectors from {self.directory}")
+
+    def _reset_files(self):
+        """Remove all cache files."""
+        for path in (self.keys_path, self.vectors_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._index.clear()
+        self._dim = None
+        self._rows = 0
+        self._vectors = None
+
+    def _view(self) -> np.ndarray:
+        """Get a memory-mapped view of all vector rows."""
+        if self._vectors is None or self._vectors.shape[0] != self._rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(self._rows, self._dim))
+        return self._vectors
+
+    def get(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            List with a float32 vector for every hit and None for every miss
+        """
+        with self._lock:
+            if not self._index:
+                self.misses += len(texts)
+                return [None] * len(texts)
+
+            view = self._view()
+            results = []
+
+            for text in texts:
+                key = self.key(text)
+                row = self._index.get(key)
+
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    self._index.move_to_end(key)
+                    results.append(np.asarray(view[row], dtype=np.float32))
+
+            return results
+
+    def put(self, texts: List[str], vectors: List[List[float]]):
+        """
+        Store vectors for chunk texts.
+
+        Args:
+            texts: Chunk texts
+            vectors: Embedding vectors in the same order as texts
+        """
+        if not texts:
+            return
+
+        array = np.asarray(vectors, dtype=np.float16)
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = array.shape[1]
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model_name": self.model_name, "dim": self._dim}, f)
+
+            keys = [self.key(text) for text in texts]
+
+            # Vectors first: rows without a key are dropped on load
+            with open(self.vectors_path, "ab") as f:
+                f.write(array.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(keys))
+
+            for offset, key in enumerate(keys):
+                self._index[key] = self._rows + offset
+                self._index.move_to_end(key)
+
+            self._rows += len(keys)
+            self._vectors = None
+
+            if self.size_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Compact the cache down to its most recently used entries."""
+        row_bytes = KEY_BYTES + self._dim * 2
+        keep = max(0, int(self.max_bytes * 0.8) // row_bytes)
+        entries = list(self._index.items())[-keep:] if keep else []
+
+        logger.info(f"Evicting {len(self._index) - len(entries)} vectors from embedding cache")
+
+        view = self._view()
+        rows = np.asarray([row for _, row in entries], dtype=np.int64)
+        vectors = np.asarray(view[rows]) if len(rows) else np.empty((0, self._dim), dtype=np.float16)
+        self._vectors = None
+
+        with open(f"{self.vectors_path}.tmp", "wb") as f:
+            f.write(vectors.tobytes())
+        with open(f"{self.keys_path}.tmp", "wb") as f:
+            f.write(b"".join(key for key, _ in entries))
+
+        os.replace(f"{self.vectors_path}.tmp", self.vectors_path)
+        os.replace(f"{self.keys_path}.tmp", self.keys_path)
+
+        self._index = OrderedDict((key, row) for row, (key, _) in enumerate(entries))
+        self._rows = len(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, entries and size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._index),
+            "size_mb": self.size_bytes / (1024 * 1024),
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper that serves vectors from an EmbeddingCache.
+
+    Only chunk vectors go to the disk cache. Query vectors are kept in a
+    small in-memory LRU, so user questions neither write to disk on the
+    query path nor evict chunk vectors.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, query_cache_size: int = 256):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings: Underlying embeddings model
+            cache: EmbeddingCache instance
+            query_cache_size: Number of query vectors kept in memory, 0 disables it
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed document chunks, computing only the ones not cached yet.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            List of embedding vectors
+        """
+        cached = self.cache.get(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        results: List[Optional[List[float]]] = [
+            vector.tolist() if vector is not None else None for vector in cached
+        ]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            vectors = self.embeddings.embed_documents(missing_texts)
+            self.cache.put(missing_texts, vectors)
+
+            for i, vector in zip(missing, vectors):
+                results[i] = list(vector)
+
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, served from the cache when it was seen before.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        with self._query_lock:
+            vector = self._queries.get(text)
+            if vector is not None:
+                self._queries.move_to_end(text)
+                return vector
+
+        vector = list(self.embeddings.embed_query(text))
+
+        if self.query_cache_size > 0:
+            with self._query_lock:
+                self._queries[text] = vector
+                while len(self._queries) > self.query_cache_size:
+                    self._queries.popitem(last=False)
+        return vector
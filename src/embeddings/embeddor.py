@@ -1,12 +1,64 @@
 import langchain_huggingface
+from langchain_core.embeddings import Embeddings
 
 
 langchain_huggingface.HuggingFaceEmbeddings
 from src.config.config import get_config
 from src.config.logging import get_logger
+from src.embeddings.embedding_cache import EmbeddingCache, CachedEmbeddings
+from src.embeddings.engine import EmbeddingEngine
+from src.monitoring.metrics import get_metrics
+from src.llm.prepared import prepared_model_dir, load_prepared_info, save_prepared, save_torch_model, load_torch_model
 
 logger = get_logger(__name__)
 
+EMBEDDING_DTYPES = ("float32", "bfloat16", "int8")
+
+# Prepared weights are stored in the target dtype; without "auto"
+# transformers would upcast them to float32 on every load
+PREPARED_MODEL_KWARGS = {"torch_dtype": "auto"}
+
+
+def convert_embedding_model(model, dtype: str):
+    """
+    Bring a SentenceTransformer into the configured dtype.
+    
+    Args:
+        model: SentenceTransformer loaded in float32
+        dtype: One of EMBEDDING_DTYPES
+        
+    Returns:
+        Converted model
+    """
+    import torch
+    
+    if dtype == "bfloat16":
+        return model.to(torch.bfloat16)
+    if dtype == "int8":
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+class TimedEmbeddings(Embeddings):
+    """
+    Record an embedding span per document batch and a query_embedding
+    span for every embedded query.
+    """
+    
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.metrics = get_metrics()
+        
+    def embed_documents(self, texts):
+        with self.metrics.span("embedding") as span:
+            span.set(texts=len(texts))
+            return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text):
+        with self.metrics.span("query_embedding"):
+            return self.embeddings.embed_query(text)
+
+
 class Embedder:
     """
     Create text embeddings for document chunks.
@@ -20,13 +72,138 @@ class Embedder:
             "sentence-transformers/all-MiniLM-L6-v2"
         )
         
+        self.dtype = config.get("embedding_dtype", "float32")
+        if self.dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unknown embedding dtype {self.dtype}, expected one of {list(EMBEDDING_DTYPES)}")
+        
         logger.info(f"Initializing embedder with model: {self.model_name}")
         
-        self.embeddings = langchain_huggingface.HuggingFaceEmbeddings(
-            model_name=self.model_name,
-            model_kwargs={"device": "cuda" if config.get("use_gpu", False) else "cpu"}
-        )
+        device = "cuda" if config.get("use_gpu", False) else "cpu"
+        self.engine = None
+        
+        directory = self.prepared_dir(device)
+        info = load_prepared_info(directory) if config.get("use_prepared_models", True) else None
+        if info is not None:
+            logger.info(f"Using prepared embedding model from {directory}")
+        
+        if config.get("embedding_engine", "bucketed") == "bucketed":
+            model = None
+            if info is not None and info["format"] == "torch":
+                model = load_torch_model(directory)
+            elif info is None and self.dtype != "float32":
+                from sentence_transformers import SentenceTransformer
+                model = convert_embedding_model(SentenceTransformer(self.model_name, device=device), self.dtype)
+            
+            self.engine = EmbeddingEngine(
+                model_name=directory if info is not None else self.model_name,
+                device=device,
+                batch_size=config.get("embedding_engine_batch_size", 32),
+                num_threads=config.get("embedding_threads"),
+                replicas=config.get("embedding_replicas", 1),
+                model=model,
+                model_kwargs=PREPARED_MODEL_KWARGS if info is not None else None
+            )
+            self.embeddings = self.engine
+        else:
+            if self.dtype != "float32" and (info is None or info["format"] != "pretrained"):
+                logger.warning(f"Embedding dtype {self.dtype} needs the bucketed engine or a prepared model, using float32")
+            prepared = info is not None and info["format"] == "pretrained"
+            model_kwargs = {"device": device}
+            if prepared:
+                model_kwargs["model_kwargs"] = PREPARED_MODEL_KWARGS
+            self.embeddings = langchain_huggingface.HuggingFaceEmbeddings(
+                model_name=directory if prepared else self.model_name,
+                model_kwargs=model_kwargs
+            )
+        
+        self.cache = None
+        if config.get("embedding_cache", True):
+            # Vectors of a converted model differ slightly from float32 ones
+            cache_model_name = self.model_name if self.dtype == "float32" else f"{self.model_name}@{self.dtype}"
+            self.cache = EmbeddingCache(
+                cache_dir=config.get("embedding_cache_dir", "./data/embedding_cache"),
+                model_name=cache_model_name,
+                max_bytes=int(config.get("embedding_cache_max_mb", 1024) * 1024 * 1024)
+            )
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                self.cache,
+                query_cache_size=config.get("query_embedding_cache_size", 256)
+            )
+        
+        # Only wrapped while metrics are on, keeping the query path unchanged otherwise
+        if get_metrics().enabled:
+            self.embeddings = TimedEmbeddings(self.embeddings)
+    
+    def prepared_dir(self, device: str) -> str:
+        """
+        Directory of the prepared artifact for the configured model and dtype.
+        
+        Args:
+            device: Torch device
+            
+        Returns:
+            Artifact directory
+        """
+        config = get_config()
+        settings = {"device": device, "dtype": self.dtype}
+        return prepared_model_dir(config.get("model_cache_dir", "./models"), self.model_name, settings)
+    
+    @staticmethod
+    def prepare(source=None) -> str:
+        """
+        Convert the configured embedding model into a ready-to-load artifact.
+        
+        Args:
+            source: Local model directory to read the weights from, defaults to
+                the model name (resolved from the Hugging Face cache)
+                
+        Returns:
+            Artifact directory
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        config = get_config()
+        model_name = config.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
+        dtype = config.get("embedding_dtype", "float32")
+        device = "cuda" if config.get("use_gpu", False) else "cpu"
+        settings = {"device": device, "dtype": dtype}
+        directory = prepared_model_dir(config.get("model_cache_dir", "./models"), model_name, settings)
+        
+        logger.info(f"Preparing embedding model {model_name} from {source or model_name} with {settings}")
+        
+        model = convert_embedding_model(SentenceTransformer(source or model_name, device=device), dtype)
+        fmt = "torch" if dtype == "int8" else "pretrained"
+        
+        def save(target):
+            if fmt == "torch":
+                save_torch_model(model, target)
+            else:
+                model.save(target, safe_serialization=True)
+                
+        save_prepared(directory, save, model_name, settings, fmt, source or model_name)
+        
+        return directory
     
     def get_embedder(self):
         """Get the embeddings model instance."""
-        return self.embeddings
\ No newline at end of file
+        return self.embeddings
+    
+    def stats(self):
+        """
+        Get embedding throughput and cache counters.
+        
+        Returns:
+            Dictionary with 'engine' and 'cache' statistics where enabled
+        """
+        stats = {}
+        if self.engine is not None:
+            stats["engine"] = self.engine.stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+    
+    def close(self):
+        """Release embedding worker processes, if any."""
+        if self.engine is not None:
+            self.engine.close()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import os
+import time
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Throughput-oriented sentence-transformers embedder for CPU inference.
+
+    Inputs are sorted by token length and encoded in fixed-size batches, so
+    every batch pads to a similar length, and the results are put back into
+    the original order. Optionally the sorted batches are spread across
+    several model replicas running in worker processes.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        batch_size: int = 32,
+        num_threads: Optional[int] = None,
+        replicas: int = 1,
+        model=None,
+        model_kwargs: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Load the embedding model.
+
+        Args:
+            model_name: sentence-transformers model name or path
+            device: Torch device
+            batch_size: Number of texts encoded per forward pass
+            num_threads: Intra-op thread count per replica, None keeps the torch default
+            replicas: Number of worker processes with their own model copy
+            model: Already loaded SentenceTransformer, e.g. a prepared artifact
+            model_kwargs: Extra transformers arguments for loading model_name,
+                e.g. {"torch_dtype": "auto"} to keep a stored dtype
+        """
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.replicas = max(1, replicas)
+        if model is None:
+            model = SentenceTransformer(model_name, device=device, model_kwargs=model_kwargs)
+        self.model = model
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """
+        Measure the token length of every text, capped at the model limit.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Array of token counts
+        """
+        encoded = self.model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.model.max_seq_length
+        )
+        return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+    def _get_pool(self):
+        """Start the replica worker processes on first use."""
+        if self._pool is None:
+            if self.num_threads:
+                # Workers read this when torch initializes, avoiding oversubscription
+                os.environ["OMP_NUM_THREADS"] = str(self.num_threads)
+            logger.info(f"Starting {self.replicas} embedding replicas")
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.replicas)
+        return self._pool
+
+    def _encode_sorted(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts that are already sorted by length.
+
+        Args:
+            texts: Length-sorted texts
+
+        Returns:
+            Embedding matrix in the same order
+        """
+        if self.replicas > 1 and len(texts) > self.batch_size:
+            return self.model.encode_multi_process(
+                texts,
+                self._get_pool(),
+                batch_size=self.batch_size,
+                chunk_size=self.batch_size * 4
+            )
+
+        batches = [
+            self.model.encode(
+                texts[start:start + self.batch_size],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in length-bucketed batches.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of embedding vectors in input order
+        """
+        if not texts:
+            return []
+
+        start = time.perf_counter()
+
+        order = np.argsort(self._token_lengths(texts), kind="stable")
+        with self._lock:
+            sorted_vectors = self._encode_sorted([texts[i] for i in order])
+
+        vectors = np.empty_like(sorted_vectors)
+        vectors[order] = sorted_vectors
+
+        elapsed = time.perf_counter() - start
+        self.chunks += len(texts)
+        self.seconds += elapsed
+        logger.debug(f"Embedded {len(texts)} chunks in {elapsed:.2f}s ({len(texts) / elapsed:.1f} chunks/s)")
+
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        with self._lock:
+            return self.model.encode(text, convert_to_numpy=True, show_progress_bar=False).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get throughput counters.
+
+        Returns:
+            Dictionary with chunks embedded, seconds spent and chunks per second
+        """
+        return {
+            "chunks": self.chunks,
+            "seconds": self.seconds,
+            "chunks_per_second": self.chunks / self.seconds if self.seconds else 0.0,
+        }
+
+    def close(self):
+        """Stop the replica worker processes."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
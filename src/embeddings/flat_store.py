@@ -0,0 +1,592 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as LangChainVectorStore
+from src.config.logging import get_logger
+from src.embeddings.doc_store import DocStore
+from src.embeddings.ivf_index import IVFIndex
+from src.embeddings.quantization import QuantizedCodes
+from src.embeddings.search_eval import sample_queries, run_queries, recall_at_k
+
+logger = get_logger(__name__)
+
+# Rows scored per matrix product, bounds the float32 working set for float16 stores
+SEARCH_BLOCK_ROWS = 65536
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale vectors to unit length so a dot product is the cosine similarity.
+
+    Args:
+        vectors: 2D array of vectors
+
+    Returns:
+        float32 array of normalized vectors
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the indices of the k highest scores, best first.
+
+    Args:
+        scores: 1D array of scores
+        k: Number of results
+
+    Returns:
+        Array of indices
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class FlatVectorStore(LangChainVectorStore):
+    """
+    Exact cosine search over a memory-mapped NumPy matrix.
+
+    Normalized vectors are stored as one contiguous float32 or float16 file
+    and chunk text and metadata live in a DocStore side file. Search is a
+    vectorized matrix product followed by argpartition. Deleted rows are
+    masked until the store is compacted.
+
+    With ann_index="ivf" an IVFIndex is built on persist and searches only
+    score the rows of the nprobe closest clusters.
+
+    With quantization="int8" or "pq" candidates are first ranked from
+    compact codes and only the best k * rescore_factor are re-scored
+    against the full precision vectors, which are read lazily from the
+    memory-mapped file.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding_function: Embeddings,
+        dtype: str = "float32",
+        ann_index: str = "none",
+        ann_params: Optional[Dict[str, Any]] = None,
+        quantization: str = "none",
+        quantization_params: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Open or create a flat vector store.
+
+        Args:
+            persist_directory: Directory holding the index files
+            embedding_function: Embeddings used for documents and queries
+            dtype: Storage dtype for vectors, "float32" or "float16"
+            ann_index: Approximate index type, "none" or "ivf"
+            ann_params: IVF settings: nlist, nprobe, train_size, iterations,
+                min_rows (exact search below this size) and rebuild_ratio
+                (share of unindexed rows that triggers a rebuild)
+            quantization: Vector quantization, "none", "int8" or "pq"
+            quantization_params: Quantization settings: train_size, pq_m,
+                pq_iterations, rescore_factor, max_rescore_factor,
+                recall_tolerance, min_rows and rebuild_ratio
+        """
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.dtype = np.dtype(dtype)
+        self.ann_index = ann_index
+        self.ann_params = {
+            "nlist": 0,
+            "nprobe": 8,
+            "train_size": 50000,
+            "iterations": 10,
+            "min_rows": 10000,
+            "rebuild_ratio": 0.1,
+            **(ann_params or {})
+        }
+        self.ivf: Optional[IVFIndex] = None
+        self.quantization = quantization
+        self.quantization_params = {
+            "train_size": 50000,
+            "pq_m": 0,
+            "pq_iterations": 10,
+            "rescore_factor": 4,
+            "max_rescore_factor": 64,
+            "recall_tolerance": 0.01,
+            "min_rows": 10000,
+            "rebuild_ratio": 0.1,
+            **(quantization_params or {})
+        }
+        self.quantized: Optional[QuantizedCodes] = None
+
+        self.meta_path = os.path.join(persist_directory, "flat_meta.json")
+        self.vectors_path = os.path.join(persist_directory, "vectors.bin")
+        self.deleted_path = os.path.join(persist_directory, "deleted.npy")
+
+        self.docs = DocStore(persist_directory, name="flat_docs")
+
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._vectors = None
+        self._deleted = np.zeros(0, dtype=bool)
+        self._id_rows: Optional[Dict[str, int]] = None
+
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def __len__(self) -> int:
+        return int(self._rows - self._deleted[:self._rows].sum())
+
+    def _load(self):
+        """Load index metadata from disk."""
+        if not os.path.exists(self.meta_path):
+            return
+
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+
+        if np.dtype(meta["dtype"]) != self.dtype:
+            logger.warning(f"Flat store uses {meta['dtype']}, ignoring configured {self.dtype}")
+            self.dtype = np.dtype(meta["dtype"])
+
+        self._dim = meta["dim"]
+        vector_rows = os.path.getsize(self.vectors_path) // (self._dim * self.dtype.itemsize)
+        self._rows = min(vector_rows, len(self.docs))
+        # Records written after the last persist are dropped, add_vectors()
+        # truncates the vectors file the same way
+        if len(self.docs) > self._rows:
+            self.docs.truncate(self._rows)
+
+        self._deleted = np.zeros(self._rows, dtype=bool)
+        if os.path.exists(self.deleted_path):
+            deleted = np.load(self.deleted_path)
+            self._deleted[:min(len(deleted), self._rows)] = deleted[:self._rows]
+
+        if self.ann_index == "ivf":
+            self.ivf = IVFIndex.load(self.persist_directory)
+            if self.ivf is not None and self.ivf.indexed_rows > self._rows:
+                logger.warning("IVF index does not match the vector store, using exact search until rebuilt")
+                self.ivf = None
+
+        if self.quantization != "none":
+            self.quantized = QuantizedCodes.load(self.persist_directory, self.quantization)
+            if self.quantized is not None and self.quantized.quantized_rows > self._rows:
+                logger.warning("Quantized codes do not match the vector store, using full precision until rebuilt")
+                self.quantized = None
+
+        logger.info(f"Loaded flat vector store with {len(self)} vectors from {self.persist_directory}")
+
+    def matrix(self) -> np.ndarray:
+        """
+        Get the memory-mapped vector matrix.
+
+        Returns:
+            Array of shape (rows, dim), including deleted rows
+        """
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[0] != self._rows:
+                if self._rows == 0:
+                    return np.empty((0, self._dim or 0), dtype=self.dtype)
+                self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self._rows, self._dim))
+            return self._vectors
+
+    def deleted_mask(self) -> np.ndarray:
+        """
+        Get the deleted flag of every matrix row.
+
+        Returns:
+            Boolean array of length rows
+        """
+        return self._deleted[:self._rows]
+
+    def _get_id_rows(self) -> Dict[str, int]:
+        """Build the chunk ID to row mapping on first use."""
+        if self._id_rows is None:
+            self._id_rows = {}
+            for row in range(self._rows):
+                if not self._deleted[row]:
+                    self._id_rows[self.docs.get(row)["id"]] = row
+        return self._id_rows
+
+    def add_vectors(
+        self,
+        vectors: np.ndarray,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> List[str]:
+        """
+        Append precomputed vectors with their texts and metadata.
+
+        Existing rows with the same IDs are replaced.
+
+        Args:
+            vectors: Embedding matrix
+            texts: Chunk texts
+            metadatas: Chunk metadata
+            ids: Chunk IDs
+
+        Returns:
+            List of IDs
+        """
+        vectors = normalize_rows(vectors)
+
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self._write_meta()
+
+        self.delete(ids)
+        id_rows = self._get_id_rows()
+
+        with open(self.vectors_path, "ab") as f:
+            # Drop vectors written after the last persist, which have no records
+            f.seek(self._rows * self._dim * self.dtype.itemsize)
+            f.truncate()
+            f.write(vectors.astype(self.dtype).tobytes())
+
+        self.docs.append(
+            {"id": chunk_id, "text": text, "metadata": metadata}
+            for chunk_id, text, metadata in zip(ids, texts, metadatas)
+        )
+
+        for offset, chunk_id in enumerate(ids):
+            id_rows[chunk_id] = self._rows + offset
+
+        with self._lock:
+            self._rows += len(ids)
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+            self._vectors = None
+
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed and add texts to the store.
+
+        Args:
+            texts: Chunk texts
+            metadatas: Optional chunk metadata
+            ids: Optional chunk IDs, generated from the row number when missing
+
+        Returns:
+            List of IDs
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [f"row:{self._rows + i}" for i in range(len(texts))]
+        vectors = np.asarray(self.embedding_function.embed_documents(texts), dtype=np.float32)
+
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        Mark chunks as deleted.
+
+        Args:
+            ids: Chunk IDs to delete
+
+        Returns:
+            True
+        """
+        if not ids or self._rows == 0:
+            return True
+
+        id_rows = self._get_id_rows()
+        for chunk_id in ids:
+            row = id_rows.pop(chunk_id, None)
+            if row is not None:
+                self._deleted[row] = True
+
+        return True
+
+    def search_vector(self, query: np.ndarray, k: int, exact: bool = False, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k cosine search.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            exact: Score every row even when an approximate index exists
+            nprobe: Number of IVF clusters to scan, defaults to ann_params["nprobe"]
+
+        Returns:
+            List of (row, score) tuples, best first
+        """
+        matrix = self.matrix()
+        if matrix.shape[0] == 0:
+            return []
+
+        query = normalize_rows(np.asarray(query).reshape(1, -1))[0]
+
+        rows = None
+        if not exact and self.ivf is not None:
+            rows = self.ivf.candidates(query, nprobe or self.ann_params["nprobe"], matrix.shape[0])
+            rows = np.sort(rows[~self._deleted[rows]])
+
+        if not exact and self.quantized is not None:
+            return self._search_quantized(matrix, rows, query, k)
+
+        if rows is not None:
+            scores = self._score_rows(matrix, rows, query)
+            best = top_k(scores, k)
+            return [(int(rows[i]), float(scores[i])) for i in best]
+
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+
+        for start in range(0, matrix.shape[0], SEARCH_BLOCK_ROWS):
+            block = matrix[start:start + SEARCH_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ query
+
+        scores[self._deleted[:len(scores)]] = -np.inf
+        rows = top_k(scores, k)
+
+        return [(int(row), float(scores[row])) for row in rows if np.isfinite(scores[row])]
+
+    def _search_quantized(self, matrix: np.ndarray, rows: Optional[np.ndarray], query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Rank candidates from quantized codes, then re-score the shortlist exactly.
+
+        Args:
+            matrix: Full precision vector matrix
+            rows: Sorted live candidate rows, or None for every row
+            query: Normalized query vector
+            k: Number of results
+
+        Returns:
+            List of (row, score) tuples, best first
+        """
+        quantized_rows = self.quantized.quantized_rows
+
+        if rows is None:
+            approximate = self.quantized.scores(query)
+            approximate[self._deleted[:quantized_rows]] = -np.inf
+            coded_rows = np.arange(quantized_rows)
+            tail = np.arange(quantized_rows, matrix.shape[0])
+            tail = tail[~self._deleted[tail]]
+        else:
+            split = np.searchsorted(rows, quantized_rows)
+            coded_rows, tail = rows[:split], rows[split:]
+            approximate = self.quantized.scores(query, coded_rows)
+
+        shortlist = coded_rows[top_k(approximate, k * self.quantized.rescore_factor)]
+        shortlist = shortlist[np.isfinite(approximate[shortlist])] if rows is None else shortlist
+
+        # Rows added after quantization have no codes and are always re-scored
+        candidates = np.sort(np.concatenate([shortlist, tail]))
+        scores = self._score_rows(matrix, candidates, query)
+        best = top_k(scores, k)
+
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    @staticmethod
+    def _score_rows(matrix: np.ndarray, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Score a subset of matrix rows against a query.
+
+        Args:
+            matrix: Vector matrix
+            rows: Sorted row numbers
+            query: Normalized query vector
+
+        Returns:
+            Scores in the order of rows
+        """
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+            block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+            scores[start:start + len(block_rows)] = matrix[block_rows].astype(np.float32, copy=False) @ query
+        return scores
+
+    def _to_documents(self, results: List[Tuple[int, float]]) -> List[Tuple[Document, float]]:
+        """Load the documents of search results."""
+        documents = []
+        for row, score in results:
+            record = self.docs.get(row)
+            documents.append((Document(page_content=record["text"], metadata=record["metadata"]), score))
+        return documents
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return self._to_documents(self.search_vector(np.asarray(embedding, dtype=np.float32), k))
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding_function.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities
+        return lambda score: score
+
+    def _write_meta(self):
+        """Write the index metadata file."""
+        with open(self.meta_path, "w") as f:
+            json.dump({"dim": self._dim, "dtype": self.dtype.name}, f)
+
+    def persist(self):
+        """Flush side files, compacting first when many rows are deleted."""
+        if self._rows and self._deleted.sum() > self._rows // 4:
+            self.compact()
+
+        self.docs.flush()
+        np.save(self.deleted_path, self._deleted)
+
+        if self.ann_index == "ivf":
+            self._update_ivf()
+
+        if self.quantization != "none":
+            self._update_quantized()
+
+    def _update_quantized(self):
+        """Quantize the vectors when codes are missing or too many rows are uncoded."""
+        params = self.quantization_params
+        if self._rows < params["min_rows"]:
+            return
+
+        if self.quantized is not None:
+            uncoded = self._rows - self.quantized.quantized_rows
+            if uncoded <= self._rows * params["rebuild_ratio"]:
+                return
+
+        self.quantized = QuantizedCodes.build(self.matrix(), self.quantization, params)
+        self._tune_rescore_factor()
+        self.quantized.save(self.persist_directory)
+
+    def _tune_rescore_factor(self, k: int = 10):
+        """
+        Grow the re-scoring shortlist until recall@k is within the tolerance.
+
+        Args:
+            k: Number of results used for the recall check
+        """
+        params = self.quantization_params
+        queries = sample_queries(self, num_queries=100)
+
+        # Compare against the same search without codes, so IVF misses do not count
+        quantized, self.quantized = self.quantized, None
+        baseline, _ = run_queries(self, queries, k)
+        self.quantized = quantized
+
+        while True:
+            approximate, _ = run_queries(self, queries, k)
+            recall = recall_at_k(approximate, baseline)
+
+            if recall >= 1.0 - params["recall_tolerance"] or self.quantized.rescore_factor >= params["max_rescore_factor"]:
+                break
+            self.quantized.rescore_factor *= 2
+
+        logger.info(f"Quantized search recall@{k} {recall:.3f} with rescore factor {self.quantized.rescore_factor}")
+
+    def memory_footprint(self) -> Dict[str, float]:
+        """
+        Size of the search structures in megabytes.
+
+        Returns:
+            Dictionary with full precision vectors and, where built, codes and IVF lists
+        """
+        mb = 1024 * 1024
+        footprint = {"vectors_mb": self._rows * (self._dim or 0) * self.dtype.itemsize / mb}
+        if self.quantized is not None:
+            footprint["codes_mb"] = self.quantized.codes.nbytes / mb
+        if self.ivf is not None:
+            footprint["ivf_mb"] = (self.ivf.rows.nbytes + self.ivf.centroids.nbytes) / mb
+        return footprint
+
+    def _update_ivf(self):
+        """Build the IVF index when it is missing or too many rows are unindexed."""
+        if self._rows < self.ann_params["min_rows"]:
+            return
+
+        if self.ivf is not None:
+            unindexed = self._rows - self.ivf.indexed_rows
+            if unindexed <= self._rows * self.ann_params["rebuild_ratio"]:
+                return
+
+        self.ivf = IVFIndex.build(
+            self.matrix(),
+            nlist=self.ann_params["nlist"],
+            train_size=self.ann_params["train_size"],
+            iterations=self.ann_params["iterations"]
+        )
+        self.ivf.save(self.persist_directory)
+
+    def compact(self):
+        """Rewrite the store without deleted rows."""
+        keep = np.flatnonzero(~self._deleted)
+        logger.info(f"Compacting flat vector store from {self._rows} to {len(keep)} rows")
+
+        vectors = np.asarray(self.matrix()[keep])
+        with self._lock:
+            self._vectors = None
+
+        with open(f"{self.vectors_path}.tmp", "wb") as f:
+            f.write(vectors.tobytes())
+        os.replace(f"{self.vectors_path}.tmp", self.vectors_path)
+
+        self.docs.rewrite(keep)
+
+        with self._lock:
+            self._rows = len(keep)
+            self._deleted = np.zeros(self._rows, dtype=bool)
+            self._id_rows = None
+
+        # Row numbers changed, the IVF index and codes have to be rebuilt
+        self.ivf = None
+        IVFIndex.remove(self.persist_directory)
+        self.quantized = None
+        QuantizedCodes.remove(self.persist_directory)
+
+    def delete_collection(self):
+        """Remove every file of the store."""
+        with self._lock:
+            self._vectors = None
+            for path in (self.meta_path, self.vectors_path, self.deleted_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._dim = None
+            self._rows = 0
+            self._deleted = np.zeros(0, dtype=bool)
+            self._id_rows = None
+        self.ivf = None
+        IVFIndex.remove(self.persist_directory)
+        self.quantized = None
+        QuantizedCodes.remove(self.persist_directory)
+        self.docs.clear()
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        persist_directory: str = "./vector_store",
+        dtype: str = "float32",
+        **kwargs: Any
+    ) -> "FlatVectorStore":
+        store = cls(persist_directory, embedding, dtype=dtype, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.persist()
+        return store
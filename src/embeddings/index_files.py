@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Any
+import numpy as np
+
+
+def save_array(path: str, array: np.ndarray):
+    """
+    Write a .npy file through a temporary file and an atomic rename.
+
+    Readers memory-mapping the previous file keep seeing its old content
+    instead of a file rewritten underneath them.
+
+    Args:
+        path: Target path, including the .npy suffix
+        array: Array to write
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def save_arrays(path: str, **arrays: np.ndarray):
+    """
+    Write a .npz file through a temporary file and an atomic rename.
+
+    Args:
+        path: Target path, including the .npz suffix
+        **arrays: Arrays to write by name
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def save_json(path: str, data: Any):
+    """
+    Write a JSON file through a temporary file and an atomic rename.
+
+    Args:
+        path: Target path
+        data: JSON-serializable data
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def remove_file(path: str):
+    """
+    Delete a file if it exists.
+
+    Args:
+        path: File path
+    """
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,257 @@
+import json
+import os
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+from src.config.logging import get_logger
+from src.embeddings.index_files import save_array, save_json, remove_file
+from src.embeddings.search_eval import sample_queries, run_queries, recall_at_k
+
+logger = get_logger(__name__)
+
+# Rows assigned to centroids per matrix product
+ASSIGN_BLOCK_ROWS = 65536
+
+
+def _as_float32(block: np.ndarray) -> np.ndarray:
+    return np.asarray(block, dtype=np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Assign each vector to its most similar centroid.
+
+    Args:
+        vectors: Normalized vectors, may be memory-mapped
+        centroids: Normalized centroid matrix
+
+    Returns:
+        Array of centroid numbers
+    """
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = _as_float32(vectors[start:start + ASSIGN_BLOCK_ROWS])
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(sample: np.ndarray, nlist: int, iterations: int, seed: int) -> np.ndarray:
+    """
+    Train coarse centroids with spherical k-means.
+
+    Args:
+        sample: Normalized float32 training vectors
+        nlist: Number of centroids
+        iterations: Number of k-means iterations
+        seed: Random seed
+
+    Returns:
+        Normalized centroid matrix of shape (nlist, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _assign(sample, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=nlist)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        sums = np.zeros_like(centroids)
+        non_empty = counts > 0
+        sums[non_empty] = np.add.reduceat(sample[order], starts[non_empty], axis=0)
+
+        # Re-seed empty clusters with random training vectors
+        empty = np.flatnonzero(~non_empty)
+        if len(empty):
+            sums[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted file index for approximate cosine search.
+
+    Vectors are clustered around nlist centroids and a query only scores
+    the vectors of its nprobe closest clusters. The index only stores row
+    numbers into the flat vector matrix, grouped by cluster, and is loaded
+    with memory mapping so opening it does not rebuild anything. Rows added
+    after the index was built are scanned exactly until the next rebuild.
+    """
+
+    FILES = ("ivf_meta.json", "ivf_centroids.npy", "ivf_rows.npy", "ivf_offsets.npy")
+
+    def __init__(self, centroids: np.ndarray, rows: np.ndarray, offsets: np.ndarray, indexed_rows: int):
+        """
+        Initialize from index arrays.
+
+        Args:
+            centroids: Centroid matrix of shape (nlist, dim)
+            rows: Matrix row numbers sorted by cluster
+            offsets: Start of every cluster in rows, length nlist + 1
+            indexed_rows: Number of matrix rows covered by the index
+        """
+        self.centroids = centroids
+        self.rows = rows
+        self.offsets = offsets
+        self.indexed_rows = indexed_rows
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: int = 0,
+        train_size: int = 50000,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        Build an index over a vector matrix.
+
+        Args:
+            vectors: Normalized vectors, may be memory-mapped
+            nlist: Number of clusters, 0 picks 4 * sqrt(rows)
+            train_size: Number of vectors sampled for k-means
+            iterations: Number of k-means iterations
+            seed: Random seed
+
+        Returns:
+            IVFIndex instance
+        """
+        start = time.perf_counter()
+        num_rows = len(vectors)
+
+        if not nlist:
+            nlist = int(4 * np.sqrt(num_rows))
+        nlist = max(1, min(nlist, num_rows))
+
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(num_rows, size=min(num_rows, max(train_size, nlist)), replace=False))
+        sample = _as_float32(vectors[sample_rows])
+
+        centroids = train_centroids(sample, nlist, iterations, seed)
+        assignments = _assign(vectors, centroids)
+
+        rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=nlist))]).astype(np.int64)
+
+        logger.info(f"Built IVF index with {nlist} lists over {num_rows} vectors in {time.perf_counter() - start:.1f}s")
+
+        return cls(centroids, rows, offsets, num_rows)
+
+    def save(self, directory: str):
+        """
+        Write the index files.
+
+        Args:
+            directory: Target directory
+        """
+        meta_name, centroids_name, rows_name, offsets_name = self.FILES
+        meta_path = os.path.join(directory, meta_name)
+
+        # load() needs the meta file, so an interrupted save leaves no index
+        # instead of lists from two builds; loaded indexes keep their old files
+        remove_file(meta_path)
+        save_array(os.path.join(directory, centroids_name), self.centroids)
+        save_array(os.path.join(directory, rows_name), self.rows)
+        save_array(os.path.join(directory, offsets_name), self.offsets)
+        save_json(meta_path, {"indexed_rows": self.indexed_rows, "nlist": self.nlist})
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IVFIndex"]:
+        """
+        Memory-map the index files.
+
+        Args:
+            directory: Index directory
+
+        Returns:
+            IVFIndex instance, or None when no index was built
+        """
+        paths = [os.path.join(directory, name) for name in cls.FILES]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+
+        with open(paths[0], "r") as f:
+            meta = json.load(f)
+
+        return cls(
+            centroids=np.load(paths[1]),
+            rows=np.load(paths[2], mmap_mode="r"),
+            offsets=np.load(paths[3]),
+            indexed_rows=meta["indexed_rows"]
+        )
+
+    @classmethod
+    def remove(cls, directory: str):
+        """
+        Delete the index files.
+
+        Args:
+            directory: Index directory
+        """
+        for name in cls.FILES:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def candidates(self, query: np.ndarray, nprobe: int, total_rows: int) -> np.ndarray:
+        """
+        Get the rows to score for a query.
+
+        Args:
+            query: Normalized query vector
+            nprobe: Number of clusters to scan
+            total_rows: Current number of matrix rows
+
+        Returns:
+            Array of row numbers
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        parts = [self.rows[self.offsets[probe]:self.offsets[probe + 1]] for probe in probes]
+        if total_rows > self.indexed_rows:
+            parts.append(np.arange(self.indexed_rows, total_rows, dtype=np.int64))
+
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def evaluate_recall(store, num_queries: int = 200, k: int = 10, nprobe_values: List[int] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k and latency of approximate search against exact search.
+
+    Stored vectors sampled from the index are used as queries.
+
+    Args:
+        store: FlatVectorStore with an approximate index
+        num_queries: Number of sampled queries
+        k: Number of results per query
+        nprobe_values: nprobe settings to evaluate
+        seed: Random seed
+
+    Returns:
+        List of dicts with nprobe, recall and mean latency in milliseconds,
+        plus an exact search entry with nprobe None
+    """
+    queries = sample_queries(store, num_queries, seed)
+    if len(queries) == 0:
+        return []
+
+    exact, latency_ms = run_queries(store, queries, k, exact=True)
+    results = [{"nprobe": None, "recall": 1.0, "latency_ms": latency_ms}]
+
+    for nprobe in nprobe_values or [1, 2, 4, 8, 16, 32]:
+        approximate, latency_ms = run_queries(store, queries, k, nprobe=nprobe)
+        results.append({"nprobe": nprobe, "recall": recall_at_k(approximate, exact), "latency_ms": latency_ms})
+
+    return results
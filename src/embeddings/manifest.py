@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+from typing import Dict, Any, List, Tuple
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 hash of a file without reading it into memory at once.
+
+    Args:
+        path: Path to the file
+        block_size: Read size in bytes
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexManifest:
+    """
+    Record what the vector store was built from.
+
+    The manifest stores the build parameters (chunking and embedding model)
+    and, for every indexed PDF, its content hash and number of chunks. It is
+    what lets a rebuild only re-embed new or changed files.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize an empty manifest.
+
+        Args:
+            directory: Vector store directory the manifest lives in
+        """
+        self.path = os.path.join(directory, MANIFEST_FILENAME)
+        self.params: Dict[str, Any] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, directory: str) -> "IndexManifest":
+        """
+        Load the manifest from a vector store directory.
+
+        A missing or unreadable manifest loads as empty, which forces a full build.
+
+        Args:
+            directory: Vector store directory
+
+        Returns:
+            IndexManifest instance
+        """
+        manifest = cls(directory)
+
+        if not os.path.exists(manifest.path):
+            return manifest
+
+        try:
+            with open(manifest.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {manifest.path}: {str(e)}")
+            return manifest
+
+        if data.get("format") == MANIFEST_FORMAT:
+            manifest.params = data.get("params", {})
+            manifest.files = data.get("files", {})
+
+        return manifest
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"format": MANIFEST_FORMAT, "params": self.params, "files": self.files},
+                f,
+                indent=2,
+                sort_keys=True
+            )
+
+        os.replace(tmp_path, self.path)
+
+    @property
+    def version(self) -> str:
+        """Short hash identifying the indexed content and build parameters."""
+        payload = json.dumps(
+            {
+                "params": self.params,
+                "files": {name: entry["hash"] for name, entry in self.files.items()}
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def hash_files(self, pdf_dir: str, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fingerprint PDF files, reusing recorded hashes for untouched files.
+
+        A file whose size and modification time match the manifest is not
+        read again, so an unchanged corpus is checked without hashing it.
+
+        Args:
+            pdf_dir: Directory containing the PDFs
+            filenames: PDF file names
+
+        Returns:
+            Dictionary mapping file name to {"hash", "size", "mtime"}
+        """
+        fingerprints = {}
+
+        for filename in filenames:
+            path = os.path.join(pdf_dir, filename)
+            stat = os.stat(path)
+            entry = self.files.get(filename)
+
+            if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+                file_hash = entry["hash"]
+            else:
+                file_hash = file_sha256(path)
+
+            fingerprints[filename] = {
+                "hash": file_hash,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime
+            }
+
+        return fingerprints
+
+    def diff(self, fingerprints: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Compare current file fingerprints with the manifest.
+
+        Args:
+            fingerprints: Output of hash_files()
+
+        Returns:
+            Tuple of sorted (added, changed, removed) file names
+        """
+        added = sorted(name for name in fingerprints if name not in self.files)
+        changed = sorted(
+            name for name in fingerprints
+            if name in self.files and self.files[name]["hash"] != fingerprints[name]["hash"]
+        )
+        removed = sorted(name for name in self.files if name not in fingerprints)
+
+        return added, changed, removed
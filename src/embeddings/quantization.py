@@ -0,0 +1,315 @@
+import json
+import os
+from typing import Dict, Any, Optional
+import numpy as np
+from src.config.logging import get_logger
+from src.embeddings.index_files import save_array, save_arrays, save_json, remove_file
+
+logger = get_logger(__name__)
+
+# Rows scored or encoded per step, bounds the float32 working set
+QUANT_BLOCK_ROWS = 65536
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Train Euclidean k-means centroids.
+
+    Args:
+        vectors: float32 training vectors
+        k: Number of centroids
+        iterations: Number of iterations
+        rng: Random generator
+
+    Returns:
+        Centroid matrix of shape (k, dim)
+    """
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+        assignments = np.argmax(vectors @ centroids.T - 0.5 * (centroids ** 2).sum(axis=1), axis=1)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=k)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        non_empty = counts > 0
+        sums = np.add.reduceat(vectors[order], starts[non_empty], axis=0)
+        centroids[non_empty] = sums / counts[non_empty, None]
+
+        empty = np.flatnonzero(~non_empty)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+
+    return centroids.astype(np.float32)
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension 8-bit scalar quantization.
+
+    Every dimension is mapped linearly from its trained [min, max] range to
+    0..255, a 4x reduction from float32. Scores are computed directly on the
+    codes: q.x ~= q.offset + (q * scale).code.
+    """
+
+    kind = "int8"
+
+    def __init__(self, offset: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.offset = offset
+        self.scale = scale
+
+    @property
+    def code_size(self) -> int:
+        return len(self.offset)
+
+    def train(self, sample: np.ndarray, params: Dict[str, Any]):
+        """
+        Learn the value range of every dimension.
+
+        Args:
+            sample: float32 training vectors
+            params: Quantization settings (unused)
+        """
+        low = sample.min(axis=0)
+        high = sample.max(axis=0)
+        self.offset = low.astype(np.float32)
+        self.scale = np.maximum((high - low) / 255.0, 1e-12).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def prepare_query(self, query: np.ndarray):
+        return query * self.scale, float(query @ self.offset)
+
+    def score(self, codes: np.ndarray, prepared) -> np.ndarray:
+        weights, bias = prepared
+        return codes.astype(np.float32) @ weights + bias
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"offset": self.offset, "scale": self.scale}
+
+
+class ProductQuantizer:
+    """
+    Product quantization with 256 centroids per subspace.
+
+    Vectors are cut into m subvectors and each is replaced by the byte ID of
+    its nearest subspace centroid, so a 384-dimensional float32 vector with
+    m=48 shrinks from 1536 to 48 bytes. Scores use asymmetric distance
+    computation: a per-query lookup table of subvector dot products.
+    """
+
+    kind = "pq"
+
+    def __init__(self, centroids: Optional[np.ndarray] = None):
+        # Shape (m, 256, dim / m)
+        self.centroids = centroids
+
+    @property
+    def code_size(self) -> int:
+        return self.centroids.shape[0]
+
+    @staticmethod
+    def _subspaces(dim: int, requested: int) -> int:
+        """Largest number of subspaces <= requested that divides dim."""
+        m = max(1, min(requested or dim // 8, dim))
+        while dim % m:
+            m -= 1
+        return m
+
+    def train(self, sample: np.ndarray, params: Dict[str, Any]):
+        """
+        Train the subspace codebooks.
+
+        Args:
+            sample: float32 training vectors
+            params: Quantization settings with pq_m and pq_iterations
+        """
+        dim = sample.shape[1]
+        m = self._subspaces(dim, params.get("pq_m", 0))
+        sub_dim = dim // m
+        rng = np.random.default_rng(params.get("seed", 0))
+
+        # 64 points per centroid are plenty for 256-entry codebooks
+        if len(sample) > 256 * 64:
+            sample = sample[rng.choice(len(sample), size=256 * 64, replace=False)]
+
+        codebooks = np.zeros((m, 256, sub_dim), dtype=np.float32)
+        for j in range(m):
+            sub = np.ascontiguousarray(sample[:, j * sub_dim:(j + 1) * sub_dim])
+            trained = _kmeans(sub, 256, params.get("pq_iterations", 10), rng)
+            codebooks[j, :len(trained)] = trained
+
+        self.centroids = codebooks
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        m, _, sub_dim = self.centroids.shape
+        codes = np.empty((len(vectors), m), dtype=np.uint8)
+
+        for j in range(m):
+            sub = np.ascontiguousarray(vectors[:, j * sub_dim:(j + 1) * sub_dim])
+            centroids = self.centroids[j]
+            codes[:, j] = np.argmax(sub @ centroids.T - 0.5 * (centroids ** 2).sum(axis=1), axis=1)
+
+        return codes
+
+    def prepare_query(self, query: np.ndarray) -> np.ndarray:
+        m, _, sub_dim = self.centroids.shape
+        # Lookup table of shape (m, 256)
+        return np.einsum("jcd,jd->jc", self.centroids, query.reshape(m, sub_dim))
+
+    def score(self, codes: np.ndarray, table: np.ndarray) -> np.ndarray:
+        return table[np.arange(table.shape[0]), codes].sum(axis=1)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids}
+
+
+QUANTIZERS = {quantizer.kind: quantizer for quantizer in (ScalarQuantizer, ProductQuantizer)}
+
+
+class QuantizedCodes:
+    """
+    Quantizer plus the codes of the first quantized_rows matrix rows.
+
+    Codes are memory-mapped from quant_codes.npy, the quantizer state lives
+    in quant_params.npz and settings in quant_meta.json.
+    """
+
+    FILES = ("quant_meta.json", "quant_params.npz", "quant_codes.npy")
+
+    def __init__(self, quantizer, codes: np.ndarray, rescore_factor: int):
+        """
+        Initialize from a trained quantizer.
+
+        Args:
+            quantizer: ScalarQuantizer or ProductQuantizer
+            codes: Code matrix of shape (quantized_rows, code_size)
+            rescore_factor: Candidates re-scored at full precision per result
+        """
+        self.quantizer = quantizer
+        self.codes = codes
+        self.rescore_factor = rescore_factor
+
+    @property
+    def kind(self) -> str:
+        return self.quantizer.kind
+
+    @property
+    def quantized_rows(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, kind: str, params: Dict[str, Any]) -> "QuantizedCodes":
+        """
+        Train a quantizer on a sample of vectors and encode all of them.
+
+        Args:
+            vectors: Normalized vectors, may be memory-mapped
+            kind: "int8" or "pq"
+            params: Quantization settings
+
+        Returns:
+            QuantizedCodes instance
+        """
+        if kind not in QUANTIZERS:
+            raise ValueError(f"Unknown vector quantization: {kind}")
+
+        rng = np.random.default_rng(params.get("seed", 0))
+        sample_rows = np.sort(rng.choice(len(vectors), size=min(len(vectors), params.get("train_size", 50000)), replace=False))
+
+        quantizer = QUANTIZERS[kind]()
+        quantizer.train(np.asarray(vectors[sample_rows], dtype=np.float32), params)
+
+        codes = np.empty((len(vectors), quantizer.code_size), dtype=np.uint8)
+        for start in range(0, len(vectors), QUANT_BLOCK_ROWS):
+            codes[start:start + QUANT_BLOCK_ROWS] = quantizer.encode(vectors[start:start + QUANT_BLOCK_ROWS])
+
+        logger.info(f"Quantized {len(vectors)} vectors with {kind} into {codes.nbytes / (1024 * 1024):.1f} MB of codes")
+
+        return cls(quantizer, codes, params.get("rescore_factor", 4))
+
+    def scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Approximate scores from the codes.
+
+        Args:
+            query: Normalized query vector
+            rows: Sorted rows to score, all quantized rows when None
+
+        Returns:
+            Approximate scores in the order of rows
+        """
+        prepared = self.quantizer.prepare_query(query)
+        total = self.quantized_rows if rows is None else len(rows)
+        scores = np.empty(total, dtype=np.float32)
+
+        for start in range(0, total, QUANT_BLOCK_ROWS):
+            if rows is None:
+                block = self.codes[start:start + QUANT_BLOCK_ROWS]
+            else:
+                block = self.codes[rows[start:start + QUANT_BLOCK_ROWS]]
+            scores[start:start + len(block)] = self.quantizer.score(np.asarray(block), prepared)
+
+        return scores
+
+    def save(self, directory: str):
+        """
+        Write the quantizer files.
+
+        Args:
+            directory: Target directory
+        """
+        meta_name, params_name, codes_name = self.FILES
+        meta_path = os.path.join(directory, meta_name)
+
+        # As for the IVF index, load() needs the meta file written last and
+        # loaded codes keep their old file
+        remove_file(meta_path)
+        save_arrays(os.path.join(directory, params_name), **self.quantizer.state())
+        save_array(os.path.join(directory, codes_name), self.codes)
+        save_json(meta_path, {"kind": self.kind, "rescore_factor": self.rescore_factor})
+
+    @classmethod
+    def load(cls, directory: str, kind: str) -> Optional["QuantizedCodes"]:
+        """
+        Load a quantizer and memory-map its codes.
+
+        Args:
+            directory: Index directory
+            kind: Expected quantization kind
+
+        Returns:
+            QuantizedCodes instance, or None when missing or of another kind
+        """
+        paths = [os.path.join(directory, name) for name in cls.FILES]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+
+        with open(paths[0], "r") as f:
+            meta = json.load(f)
+
+        if meta["kind"] != kind:
+            return None
+
+        with np.load(paths[1]) as state:
+            quantizer = QUANTIZERS[kind](**{name: state[name] for name in state.files})
+
+        return cls(quantizer, np.load(paths[2], mmap_mode="r"), meta["rescore_factor"])
+
+    @classmethod
+    def remove(cls, directory: str):
+        """
+        Delete the quantizer files.
+
+        Args:
+            directory: Index directory
+        """
+        for name in cls.FILES:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,59 @@
+import time
+from typing import List, Set, Tuple
+import numpy as np
+
+
+def sample_queries(store, num_queries: int = 200, seed: int = 0) -> np.ndarray:
+    """
+    Sample stored vectors of a flat vector store to use as queries.
+
+    Args:
+        store: FlatVectorStore instance
+        num_queries: Number of queries
+        seed: Random seed
+
+    Returns:
+        float32 query matrix, empty when the store is empty
+    """
+    live_rows = np.flatnonzero(~store.deleted_mask())
+    if len(live_rows) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    query_rows = np.sort(rng.choice(live_rows, size=min(num_queries, len(live_rows)), replace=False))
+    return np.asarray(store.matrix()[query_rows], dtype=np.float32)
+
+
+def run_queries(store, queries: np.ndarray, k: int, **search_kwargs) -> Tuple[List[Set[int]], float]:
+    """
+    Run queries through FlatVectorStore.search_vector.
+
+    Args:
+        store: FlatVectorStore instance
+        queries: Query matrix
+        k: Number of results per query
+        search_kwargs: Extra arguments for search_vector
+
+    Returns:
+        Tuple of (result row sets, mean latency in milliseconds)
+    """
+    start = time.perf_counter()
+    results = [set(row for row, _ in store.search_vector(query, k, **search_kwargs)) for query in queries]
+    latency_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+    return results, latency_ms
+
+
+def recall_at_k(approximate: List[Set[int]], exact: List[Set[int]]) -> float:
+    """
+    Mean share of exact results found by approximate search.
+
+    Args:
+        approximate: Result row sets of the approximate search
+        exact: Result row sets of exact search
+
+    Returns:
+        Recall between 0 and 1
+    """
+    if not exact:
+        return 1.0
+    return float(np.mean([len(a & e) / max(len(e), 1) for a, e in zip(approximate, exact)]))
@@ -1,4 +1,3 @@
-from langchain.vectorstores import Chroma
 from typing import List, Dict, Any
 from src.config.config import get_config
 from src.config.logging import get_logger
@@ -20,6 +19,7 @@ class VectorStore:
         self.embedding_model = embedding_model
         self.config = get_config()
         self.persist_directory = self.config.get("vector_store_dir", "./vector_store")
+        self.backend = self.config.get("vector_backend", "chroma")
         
     def create_from_documents(self, documents: List[Dict[str, Any]]):
         """
@@ -29,23 +29,13 @@ class VectorStore:
             documents: List of document dictionaries with 'content' and 'metadata'
             
         Returns:
-            Chroma vector store instance
+            Vector store instance of the configured backend
         """
         logger.info(f"Creating vector store from {len(documents)} documents")
         
-        # Convert our document format to langchain document format
-        from langchain.schema import Document
-        langchain_docs = [
-            Document(page_content=doc["content"], metadata=doc["metadata"])
-            for doc in documents
-        ]
-        
         # Create and persist the vector store
-        vector_store = Chroma.from_documents(
-            documents=langchain_docs,
-            embedding=self.embedding_model,
-            persist_directory=self.persist_directory
-        )
+        vector_store = self.create_empty()
+        self.add_documents(vector_store, documents)
         
         vector_store.persist()
         logger.info(f"Vector store created and persisted to {self.persist_directory}")
@@ -57,13 +47,99 @@ class VectorStore:
         Load an existing vector store.
         
         Returns:
-            Chroma vector store instance
+            Vector store instance of the configured backend
         """
-        logger.info(f"Loading vector store from {self.persist_directory}")
+        logger.info(f"Loading {self.backend} vector store from {self.persist_directory}")
+        
+        if self.backend == "flat":
+            from src.embeddings.flat_store import FlatVectorStore
+            return FlatVectorStore(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embedding_model,
+                dtype=self.config.get("flat_dtype", "float32"),
+                ann_index=self.config.get("ann_index", "none"),
+                ann_params=self.config.get("ivf_params"),
+                quantization=self.config.get("vector_quantization", "none"),
+                quantization_params=self.config.get("quantization_params")
+            )
+        
+        if self.backend != "chroma":
+            raise ValueError(f"Unknown vector backend: {self.backend}")
         
+        from langchain.vectorstores import Chroma
         vector_store = Chroma(
             persist_directory=self.persist_directory,
             embedding_function=self.embedding_model
         )
         
-        return vector_store
\ No newline at end of file
+        return vector_store
+    
+    def create_empty(self):
+        """
+        Create an empty vector store, dropping any previously persisted data.
+        
+        Returns:
+            Vector store instance of the configured backend
+        """
+        logger.info(f"Creating empty vector store in {self.persist_directory}")
+        
+        vector_store = self.load()
+        vector_store.delete_collection()
+        
+        return self.load()
+    
+    def add_documents(self, vector_store, documents: List[Dict[str, Any]]):
+        """
+        Embed a batch of document chunks and add them to a vector store.
+        
+        Args:
+            vector_store: Vector store returned by load() or create_empty()
+            documents: List of document dictionaries with 'content' and 'metadata'
+        """
+        ids = [self.chunk_id(doc["metadata"]) for doc in documents]
+        vector_store.add_documents(self._to_langchain_documents(documents), ids=ids)
+    
+    def delete_source(self, vector_store, source: str, chunk_count: int):
+        """
+        Remove every chunk of a source PDF from a vector store.
+        
+        Args:
+            vector_store: Vector store returned by load()
+            source: Source PDF file name
+            chunk_count: Number of chunks indexed for the source
+        """
+        if chunk_count <= 0:
+            return
+        
+        ids = [self.chunk_id({"source": source, "chunk_index": i}) for i in range(chunk_count)]
+        vector_store.delete(ids=ids)
+    
+    @staticmethod
+    def chunk_id(metadata: Dict[str, Any]) -> str:
+        """
+        Build the deterministic ID of a chunk from its metadata.
+        
+        Args:
+            metadata: Chunk metadata with 'source' and 'chunk_index'
+            
+        Returns:
+            Chunk ID string
+        """
+        return f"{metadata['source']}:{metadata['chunk_index']}"
+    
+    @staticmethod
+    def _to_langchain_documents(documents: List[Dict[str, Any]]):
+        """
+        Convert our document format to langchain document format.
+        
+        Args:
+            documents: List of document dictionaries with 'content' and 'metadata'
+            
+        Returns:
+            List of langchain Document instances
+        """
+        from langchain_core.documents import Document
+        return [
+            Document(page_content=doc["content"], metadata=doc["metadata"])
+            for doc in documents
+        ]
\ No newline at end of file
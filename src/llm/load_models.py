@@ -1,10 +1,20 @@
+import time
+from typing import Dict, Any
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from src.config.config import get_config
 from src.config.logging import get_logger
+from src.monitoring.memory import peak_rss_mb
+from src.llm.prepared import prepared_model_dir, load_prepared_info, save_prepared, save_torch_model, load_torch_model
 
 logger = get_logger(__name__)
 
+CPU_DTYPES = {
+    "float32": torch.float32,
+    "bfloat16": torch.bfloat16,
+    "int8": torch.float32,
+}
+
 class LlamaLoader:
     """
     Load and configure Llama models.
@@ -14,57 +24,292 @@ class LlamaLoader:
         """Initialize with configuration."""
         self.config = get_config()
         
-    def load_model_and_tokenizer(self):
+    def get_device(self) -> str:
         """
-        Load the Llama model and tokenizer.
+        Pick the device to run the model on.
         
         Returns:
-            Tuple of (model, tokenizer)
+            "cuda", "mps" or "cpu"
         """
+        device = self.config.get("device", "auto")
+        if device != "auto":
+            return device
+            
+        if self.config.get("use_gpu", True) and torch.cuda.is_available():
+            return "cuda"
+            
+        mps = getattr(torch.backends, "mps", None)
+        if self.config.get("use_gpu", True) and mps is not None and mps.is_available():
+            return "mps"
+            
+        return "cpu"
         
+    def prepare_settings(self, device: str, quantize: bool = True) -> Dict[str, Any]:
+        """
+        Describe how a model is loaded on a device.
         
-        if torch.backend.mps.is_available():
-            device - torch.device("mps")
-        else:
-            device = torch.device("cpu")
+        Prepared artifacts are keyed by these settings, so changing the
+        device, dtype or quantization never picks up a stale artifact.
+        
+        Args:
+            device: "cuda", "mps" or "cpu"
+            quantize: Whether the configured quantization applies
+            
+        Returns:
+            Dictionary with device and dtype or quantization
+        """
+        if device == "cpu":
+            dtype = self.config.get("cpu_params", {}).get("dtype", "bfloat16")
+            if dtype == "int8" and not quantize:
+                dtype = "float32"
+            return {"device": "cpu", "dtype": dtype}
+        
+        if device == "cuda":
+            quantization = None
+            if quantize and self.config.get("use_4bit", False):
+                quantization = "4bit"
+            elif quantize and self.config.get("load_in_8bit", True):
+                quantization = "8bit"
+            return {"device": "cuda", "dtype": "float16", "quantization": quantization}
+        
+        return {"device": device, "dtype": "float16"}
+        
+    def find_prepared(self, model_name: str, quantize: bool = True):
+        """
+        Find the prepared artifact of a model for the current settings.
+        
+        Args:
+            model_name: Configured model name
+            quantize: Whether the configured quantization applies
             
-        print("MPS not available, using CPU")
-        model_name = self.config.get("model_name", "meta-llama/Llama-2-7b-chat-hf")
-        load_in_8bit = self.config.get("load_in_8bit", True)
-        use_4bit = self.config.get("use_4bit", False)
+        Returns:
+            Tuple of (directory, artifact description), or (None, None)
+        """
+        if not self.config.get("use_prepared_models", True):
+            return None, None
         
-        logger.info(f"Loading Llama model: {model_name}")
+        settings = self.prepare_settings(self.get_device(), quantize=quantize)
+        directory = prepared_model_dir(self.config.get("model_cache_dir", "./models"), model_name, settings)
+        info = load_prepared_info(directory)
+        return (directory, info) if info is not None else (None, None)
         
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    def _load_gpu_model(self, model_name: str, device: str, quantize: bool = True):
+        """
+        Load a model on CUDA or MPS in half precision.
         
-        device_map = "auto"
+        Args:
+            model_name: Model to load
+            device: "cuda" or "mps"
+            quantize: Whether the configured bitsandbytes quantization applies
+            
+        Returns:
+            Loaded model
+        """
+        quantization_config = None
+        quantization = self.prepare_settings(device, quantize=quantize).get("quantization")
         
-        if use_4bit:
+        # bitsandbytes only runs on CUDA
+        if quantization is not None:
             try:
                 from transformers import BitsAndBytesConfig
-                quantization_config = BitsAndBytesConfig(
-                    load_in_4bit=True,
-                    bnb_4bit_compute_dtype=torch.float16,
-                    bnb_4bit_quant_type="nf4",
-                    bnb_4bit_use_double_quant=True
-                )
-                logger.info("Using 4-bit quantization")
+                if quantization == "4bit":
+                    quantization_config = BitsAndBytesConfig(
+                        load_in_4bit=True,
+                        bnb_4bit_compute_dtype=torch.float16,
+                        bnb_4bit_quant_type="nf4",
+                        bnb_4bit_use_double_quant=True
+                    )
+                else:
+                    quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+                logger.info(f"Using {quantization} quantization")
             except ImportError:
-                logger.warning("BitsAndBytes not available, falling back to 8-bit")
-                load_in_8bit = True
-                quantization_config = None
-        else:
-            quantization_config = None
-        
-        # Load model
+                logger.warning("BitsAndBytes not available, loading without quantization")
+                
+        if device == "cuda":
+            return AutoModelForCausalLM.from_pretrained(
+                model_name,
+                torch_dtype=torch.float16,
+                device_map="auto",
+                low_cpu_mem_usage=True,
+                quantization_config=quantization_config
+            )
+            
         model = AutoModelForCausalLM.from_pretrained(
             model_name,
             torch_dtype=torch.float16,
-            device_map=device_map,
-            load_in_8bit=load_in_8bit if not use_4bit else False,
-            quantization_config=quantization_config
+            low_cpu_mem_usage=True
+        )
+        return model.to(device)
+        
+    def _load_cpu_model(self, model_name: str, quantize: bool = True):
+        """
+        Load a model for CPU inference.
+        
+        Weights are read from memory-mapped safetensors files when the
+        checkpoint has them, and low_cpu_mem_usage avoids building a randomly
+        initialised copy of the model first, keeping startup time and peak
+        RSS down.
+        
+        Args:
+            model_name: Model to load
+            quantize: Whether dynamic int8 quantization applies
+            
+        Returns:
+            Loaded model
+        """
+        cpu_params = self.config.get("cpu_params", {})
+        dtype = cpu_params.get("dtype", "bfloat16")
+        if dtype not in CPU_DTYPES:
+            raise ValueError(f"Unknown CPU dtype {dtype}, expected one of {list(CPU_DTYPES)}")
+            
+        num_threads = cpu_params.get("num_threads")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        logger.info(f"CPU inference with {dtype} weights, {torch.get_num_threads()} threads")
+        
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=CPU_DTYPES[dtype],
+            low_cpu_mem_usage=True
         )
         
-        logger.info(f"Successfully loaded {model_name}")
+        if dtype == "int8" and quantize:
+            # Linear layers hold almost all weights; activations stay float
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("Using dynamic int8 quantization")
+            
+        return model
+        
+    def _load_model(self, model_name: str, quantize: bool = True):
+        """
+        Load a model on the configured device and log startup cost.
         
-        return model, tokenizer
\ No newline at end of file
+        Args:
+            model_name: Model to load
+            quantize: Whether the configured quantization applies
+            
+        Returns:
+            Loaded model in eval mode
+        """
+        device = self.get_device()
+        start = time.perf_counter()
+        
+        directory, info = self.find_prepared(model_name, quantize=quantize)
+        
+        if info is not None:
+            logger.info(f"Loading prepared {model_name} from {directory}")
+            if info["format"] == "torch":
+                model = load_torch_model(directory)
+            elif device == "cpu":
+                # Already stored in the target dtype
+                model = self._load_cpu_model(directory, quantize=False)
+            else:
+                # Quantized checkpoints carry their quantization config
+                model = self._load_gpu_model(directory, device, quantize=False)
+        else:
+            logger.info(f"Loading {model_name} on {device}")
+            if device == "cpu":
+                model = self._load_cpu_model(model_name, quantize=quantize)
+            else:
+                model = self._load_gpu_model(model_name, device, quantize=quantize)
+            
+        model.eval()
+        
+        logger.info(
+            f"Successfully loaded {model_name} in {time.perf_counter() - start:.1f}s, "
+            f"peak RSS {peak_rss_mb():.0f} MB"
+        )
+        
+        return model
+        
+    def load_model_and_tokenizer(self, model_name=None):
+        """
+        Load the Llama model and tokenizer.
+        
+        Args:
+            model_name: Model to load instead of the configured model_name
+            
+        Returns:
+            Tuple of (model, tokenizer)
+        """
+        model_name = model_name or self.config.get("model_name", "meta-llama/Llama-2-7b-chat-hf")
+        
+        logger.info(f"Loading Llama model: {model_name}")
+        
+        directory, _ = self.find_prepared(model_name)
+        tokenizer = AutoTokenizer.from_pretrained(directory or model_name)
+        model = self._load_model(model_name)
+        
+        return model, tokenizer
+        
+    def prepare(self, model_name=None, source=None, quantize: bool = True) -> str:
+        """
+        Convert a model into a ready-to-load artifact under model_cache_dir.
+        
+        The model is loaded and quantized once for the current device and
+        settings and stored in its target dtype, as memory-mappable
+        safetensors, or as a pickled module for dynamic int8 quantization.
+        
+        Args:
+            model_name: Model the artifact is keyed by, defaults to model_name
+            source: Local model directory to read the weights from, defaults to
+                the model name (resolved from the Hugging Face cache)
+            quantize: Whether the configured quantization applies
+            
+        Returns:
+            Artifact directory
+        """
+        model_name = model_name or self.config.get("model_name", "meta-llama/Llama-2-7b-chat-hf")
+        source = source or model_name
+        device = self.get_device()
+        settings = self.prepare_settings(device, quantize=quantize)
+        directory = prepared_model_dir(self.config.get("model_cache_dir", "./models"), model_name, settings)
+        
+        logger.info(f"Preparing {model_name} from {source} with {settings}")
+        
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        if device == "cpu":
+            model = self._load_cpu_model(source, quantize=quantize)
+        else:
+            model = self._load_gpu_model(source, device, quantize=quantize)
+            
+        fmt = "torch" if settings.get("dtype") == "int8" else "pretrained"
+        
+        def save(target):
+            tokenizer.save_pretrained(target)
+            if fmt == "torch":
+                save_torch_model(model, target)
+            else:
+                model.save_pretrained(target, safe_serialization=True)
+                
+        save_prepared(directory, save, model_name, settings, fmt, source)
+        
+        return directory
+        
+    def load_draft_model(self, tokenizer):
+        """
+        Load the small draft model used for assisted generation.
+        
+        The draft model has to share the tokenizer of the main model, since
+        its proposed token ids are verified by the main model as they are.
+        
+        Args:
+            tokenizer: Tokenizer of the main model
+            
+        Returns:
+            Draft model, or None when no usable draft model is configured
+        """
+        draft_model_name = self.config.get("draft_model")
+        if not draft_model_name:
+            return None
+            
+        logger.info(f"Loading draft model: {draft_model_name}")
+        
+        directory, _ = self.find_prepared(draft_model_name, quantize=False)
+        draft_tokenizer = AutoTokenizer.from_pretrained(directory or draft_model_name)
+        if draft_tokenizer.get_vocab() != tokenizer.get_vocab():
+            logger.warning(f"Draft model {draft_model_name} does not share the tokenizer, assisted generation disabled")
+            return None
+            
+        # Quantizing the small draft saves little and costs acceptance
+        return self._load_model(draft_model_name, quantize=False)
@@ -1,7 +1,11 @@
-from transformers import pipeline
+import time
+from threading import Thread, Lock, local
+from typing import Dict, Any, Iterator
+from transformers import pipeline, TextIteratorStreamer
 from langchain.llms import HuggingFacePipeline
 from src.config.config import get_config
 from src.config.logging import get_logger
+from src.llm.prefix_cache import PrefixCache
 
 logger = get_logger(__name__)
 
@@ -10,17 +14,193 @@ class LlamaPipeline:
     Create inference pipeline for Llama models.
     """
     
-    def __init__(self, model, tokenizer):
+    def __init__(self, model, tokenizer, assistant_model=None):
         """
         Initialize with model and tokenizer.
         
         Args:
             model: Loaded model
             tokenizer: Loaded tokenizer
+            assistant_model: Small draft model sharing the tokenizer, enables
+                assisted (speculative) generation
         """
         self.model = model
         self.tokenizer = tokenizer
+        self.assistant_model = assistant_model
         self.config = get_config()
+        self.prefix_cache = self._create_prefix_cache()
+        
+        self._stats_lock = Lock()
+        # Forward counts of the assisted generate() running on this thread
+        self._forward_counts = local()
+        self.decode_stats = {
+            "generations": 0,
+            "new_tokens": 0,
+            "seconds": 0.0,
+            "target_forwards": 0,
+            "draft_tokens": 0,
+        }
+        
+        if self.assistant_model is not None:
+            # Every draft forward proposes one token, every target forward
+            # verifies a block of them and adds one token of its own
+            self.model.register_forward_hook(lambda *args: self._count_forward("target_forwards"))
+            self.assistant_model.register_forward_hook(lambda *args: self._count_forward("draft_tokens"))
+            logger.info("Assisted generation enabled with a draft model")
+        
+    def _count(self, name: str, value=1):
+        with self._stats_lock:
+            self.decode_stats[name] += value
+        
+    def _count_forward(self, name: str):
+        # Forwards outside assisted stream() calls (LangChain pipeline, plain
+        # generate) would skew the acceptance rate, they are not counted
+        counts = getattr(self._forward_counts, "counts", None)
+        if counts is not None:
+            counts[name] += 1
+        
+    def _create_prefix_cache(self):
+        """
+        Create the prompt prefix cache from config.
+        
+        Returns:
+            PrefixCache instance, or None when disabled
+        """
+        params = self.config.get("prefix_cache", {})
+        if not params.get("enabled", True):
+            return None
+        
+        return PrefixCache(
+            max_entries=params.get("max_entries", 16),
+            max_bytes=int(params.get("max_mb", 512) * 1024 * 1024),
+            min_tokens=params.get("min_tokens", 32)
+        )
+        
+    def generation_kwargs(self) -> Dict[str, Any]:
+        """
+        Get generation parameters from config.
+        
+        Returns:
+            Keyword arguments for generate() and the transformers pipeline
+        """
+        kwargs = {
+            # New tokens only, the RAG prompt alone can exceed max_length
+            "max_new_tokens": self.config.get("max_new_tokens", self.config.get("max_length", 512)),
+            "do_sample": self.config.get("do_sample", False),
+            "repetition_penalty": self.config.get("repetition_penalty", 1.15),
+            "pad_token_id": self.tokenizer.eos_token_id
+        }
+        
+        if kwargs["do_sample"]:
+            kwargs["temperature"] = self.config.get("temperature", 0.7)
+            kwargs["top_p"] = self.config.get("top_p", 0.95)
+        
+        return kwargs
+        
+    def stream(self, prompt: str, **overrides) -> Iterator[str]:
+        """
+        Generate a completion and yield text as it is produced.
+        
+        Generation runs in a background thread and decoded text is handed
+        over through a TextIteratorStreamer. Key/values of a cached prompt
+        prefix are reused, and the prompt's own key/values are cached for
+        later prompts extending it.
+        
+        Args:
+            prompt: Full prompt text
+            **overrides: Generation parameters replacing the configured ones
+            
+        Yields:
+            Pieces of generated text
+        """
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        kwargs = {**inputs, "streamer": streamer, **self.generation_kwargs(), **overrides}
+        
+        kwargs["return_dict_in_generate"] = True
+        
+        input_ids = None
+        if self.assistant_model is not None:
+            # Assisted generation manages the caches of both models itself
+            kwargs["assistant_model"] = self.assistant_model
+            kwargs["num_assistant_tokens"] = self.config.get("draft_num_tokens", 5)
+        elif self.prefix_cache is not None:
+            input_ids = inputs["input_ids"][0].tolist()
+            past_key_values = self.prefix_cache.lookup(input_ids)
+            if past_key_values is not None:
+                kwargs["past_key_values"] = past_key_values
+        
+        result = {}
+        forward_counts = {"target_forwards": 0, "draft_tokens": 0}
+        
+        def run():
+            if self.assistant_model is not None:
+                self._forward_counts.counts = forward_counts
+            try:
+                result["output"] = self.model.generate(**kwargs)
+            except Exception as e:
+                result["error"] = e
+                # Unblock the consumer
+                streamer.end()
+            finally:
+                self._forward_counts.counts = None
+        
+        start = time.perf_counter()
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            thread.join()
+        
+        if "error" in result:
+            raise result["error"]
+        
+        output = result["output"]
+        self._count("generations")
+        self._count("seconds", time.perf_counter() - start)
+        self._count("new_tokens", output.sequences.shape[1] - inputs["input_ids"].shape[1])
+        for name, value in forward_counts.items():
+            self._count(name, value)
+        
+        if input_ids is not None and getattr(result["output"], "past_key_values", None) is not None:
+            self.prefix_cache.store(input_ids, result["output"].past_key_values)
+        
+    def generate(self, prompt: str, **overrides) -> str:
+        """
+        Generate a completion without streaming.
+        
+        Args:
+            prompt: Full prompt text
+            **overrides: Generation parameters replacing the configured ones
+            
+        Returns:
+            Generated text
+        """
+        return "".join(self.stream(prompt, **overrides))
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get decoding counters.
+        
+        Returns:
+            Dictionary with counters, tokens per second and, with a draft
+            model, the share of draft tokens accepted by the target model
+        """
+        with self._stats_lock:
+            stats = dict(self.decode_stats)
+        
+        stats["tokens_per_second"] = stats["new_tokens"] / stats["seconds"] if stats["seconds"] else 0.0
+        
+        if self.assistant_model is not None:
+            # Each target forward yields its accepted draft tokens plus one
+            accepted = max(0, stats["new_tokens"] - stats["target_forwards"])
+            stats["acceptance_rate"] = accepted / stats["draft_tokens"] if stats["draft_tokens"] else 0.0
+        
+        return stats
         
     def create_langchain_pipeline(self):
         """
@@ -29,12 +209,6 @@ class LlamaPipeline:
         Returns:
             HuggingFacePipeline instance
         """
-        # Get generation parameters from config
-        max_length = self.config.get("max_length", 512)
-        temperature = self.config.get("temperature", 0.7)
-        top_p = self.config.get("top_p", 0.95)
-        repetition_penalty = self.config.get("repetition_penalty", 1.15)
-        
         logger.info("Creating LLM pipeline")
         
         # Create text generation pipeline
@@ -42,11 +216,7 @@ class LlamaPipeline:
             "text-generation",
             model=self.model,
             tokenizer=self.tokenizer,
-            max_length=max_length,
-            temperature=temperature,
-            top_p=top_p,
-            repetition_penalty=repetition_penalty,
-            pad_token_id=self.tokenizer.eos_token_id
+            **self.generation_kwargs()
         )
         
         # Create LangChain wrapper
@@ -0,0 +1,188 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any
+import numpy as np
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _as_dynamic_cache(past_key_values):
+    """Convert legacy tuple caches of older transformers versions."""
+    if isinstance(past_key_values, tuple):
+        from transformers import DynamicCache
+        return DynamicCache.from_legacy_cache(past_key_values)
+    return past_key_values
+
+
+def cache_nbytes(past_key_values) -> int:
+    """
+    Size of the key/value tensors of a cache.
+
+    Args:
+        past_key_values: transformers DynamicCache
+
+    Returns:
+        Size in bytes
+    """
+    if hasattr(past_key_values, "layers"):
+        tensors = [(layer.keys, layer.values) for layer in past_key_values.layers]
+    else:
+        tensors = zip(past_key_values.key_cache, past_key_values.value_cache)
+
+    total = 0
+    for keys, values in tensors:
+        for tensor in (keys, values):
+            if tensor is not None:
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def common_prefix_length(first: np.ndarray, second: np.ndarray) -> int:
+    """
+    Number of leading tokens two sequences share.
+
+    Args:
+        first: Token ids
+        second: Token ids
+
+    Returns:
+        Length of the common prefix
+    """
+    n = min(len(first), len(second))
+    if n == 0:
+        return 0
+    mismatch = np.flatnonzero(first[:n] != second[:n])
+    return int(mismatch[0]) if len(mismatch) else n
+
+
+class PrefixCache:
+    """
+    Bounded cache of prompt key/values for prefix reuse.
+
+    After a prompt is generated its key/values are kept. A later prompt
+    starting with the same tokens (the QA template, the chat history of
+    the session) copies the cached key/values of the longest shared prefix,
+    so only the new tail of the prompt is prefilled. Entries are evicted
+    least recently used first when the entry count or byte budget is
+    exceeded.
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 512 * 1024 * 1024, min_tokens: int = 32):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached prompts
+            max_bytes: Maximum total size of cached key/values
+            min_tokens: Shortest shared prefix worth reusing
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_tokens = min_tokens
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._bytes = 0
+
+        self.counters = {"lookups": 0, "hits": 0, "prompt_tokens": 0, "reused_tokens": 0, "evictions": 0}
+
+    def lookup(self, input_ids: List[int]):
+        """
+        Get key/values for the longest cached prefix of a prompt.
+
+        At least the last prompt token is left uncached, since generation
+        needs it as input.
+
+        Args:
+            input_ids: Prompt token ids
+
+        Returns:
+            A private copy of the cache cropped to the shared prefix, or None
+        """
+        ids = np.asarray(input_ids)
+
+        with self._lock:
+            self.counters["lookups"] += 1
+            self.counters["prompt_tokens"] += len(ids)
+
+            best_id, best_length = None, 0
+            for entry_id, entry in self._entries.items():
+                length = min(common_prefix_length(entry["ids"], ids), len(ids) - 1)
+                if length > best_length:
+                    best_id, best_length = entry_id, length
+
+            if best_id is None or best_length < self.min_tokens:
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.counters["hits"] += 1
+            self.counters["reused_tokens"] += best_length
+
+            past = copy.deepcopy(self._entries[best_id]["past"])
+
+        past.crop(best_length)
+        return past
+
+    def store(self, input_ids: List[int], past_key_values):
+        """
+        Keep the key/values of a prompt.
+
+        Args:
+            input_ids: Prompt token ids
+            past_key_values: Cache returned by generate(), may extend past the prompt
+        """
+        if len(input_ids) < self.min_tokens:
+            return
+
+        past = _as_dynamic_cache(past_key_values)
+        past.crop(len(input_ids))
+        nbytes = cache_nbytes(past)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            ids = np.asarray(input_ids)
+
+            # A prompt extending a cached one supersedes it
+            for entry_id, entry in list(self._entries.items()):
+                if common_prefix_length(entry["ids"], ids) == len(entry["ids"]):
+                    self._remove(entry_id)
+
+            self._entries[self._next_id] = {"ids": ids, "past": past, "bytes": nbytes}
+            self._next_id += 1
+            self._bytes += nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._bytes -= entry["bytes"]
+
+    def clear(self):
+        """Drop every cached prefix."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with counters, hit rate, share of reused prompt tokens and size
+        """
+        with self._lock:
+            lookups = self.counters["lookups"]
+            prompt_tokens = self.counters["prompt_tokens"]
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "reuse_rate": self.counters["reused_tokens"] / prompt_tokens if prompt_tokens else 0.0,
+                "entries": len(self._entries),
+                "mb": self._bytes / (1024 * 1024),
+            }
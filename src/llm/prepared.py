@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, Any, Optional
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+PREPARED_FILENAME = "prepared.json"
+TORCH_FILENAME = "model.pt"
+PREPARED_FORMAT = 1
+
+# Artifact formats: "pretrained" is a save_pretrained/save directory with
+# safetensors weights, "torch" a pickled module for dynamically quantized
+# models, which safetensors cannot hold
+FORMATS = ("pretrained", "torch")
+
+
+def prepared_model_dir(cache_dir: str, model_name: str, settings: Dict[str, Any]) -> str:
+    """
+    Directory of the prepared artifact of a model.
+
+    Args:
+        cache_dir: The model_cache_dir
+        model_name: Configured model name
+        settings: Device, dtype and quantization the artifact is prepared for
+
+    Returns:
+        Path keyed by model name and settings
+    """
+    key = json.dumps({"model_name": model_name, **settings}, sort_keys=True)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "--", model_name.strip("/"))[-80:]
+    return os.path.join(cache_dir, "prepared", f"{slug}-{digest}")
+
+
+def load_prepared_info(directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the description of a prepared artifact.
+
+    Args:
+        directory: Artifact directory
+
+    Returns:
+        Artifact description, or None when there is no complete artifact
+    """
+    path = os.path.join(directory, PREPARED_FILENAME)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable prepared model {directory}: {str(e)}")
+        return None
+
+    if info.get("format_version") != PREPARED_FORMAT or info.get("format") not in FORMATS:
+        logger.warning(f"Ignoring prepared model {directory} of an unknown format")
+        return None
+
+    return info
+
+
+def save_prepared(directory: str, save, model_name: str, settings: Dict[str, Any], fmt: str, source: str):
+    """
+    Write an artifact into a temporary directory and move it into place.
+
+    Loaders only ever see complete artifacts, since prepared.json is written
+    last and the directory is renamed in one step.
+
+    Args:
+        directory: Final artifact directory
+        save: Callable writing the model files into a given directory
+        model_name: Configured model name
+        settings: Settings the artifact is keyed by
+        fmt: One of FORMATS
+        source: Where the weights were read from
+    """
+    tmp_dir = directory + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    start = time.perf_counter()
+    save(tmp_dir)
+
+    info = {
+        "format_version": PREPARED_FORMAT,
+        "format": fmt,
+        "model_name": model_name,
+        "settings": settings,
+        "source": source,
+        "created": time.time(),
+    }
+    with open(os.path.join(tmp_dir, PREPARED_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+    logger.info(f"Prepared {model_name} in {directory} ({time.perf_counter() - start:.1f}s to write)")
+
+
+def save_torch_model(model, directory: str):
+    """
+    Save a whole module, e.g. one with dynamically quantized layers.
+
+    Args:
+        model: Torch module
+        directory: Artifact directory
+    """
+    import torch
+    torch.save(model, os.path.join(directory, TORCH_FILENAME))
+
+
+def load_torch_model(directory: str):
+    """
+    Load a module saved by save_torch_model with memory-mapped storages.
+
+    Args:
+        directory: Artifact directory
+
+    Returns:
+        Torch module
+    """
+    import torch
+    return torch.load(os.path.join(directory, TORCH_FILENAME), mmap=True, weights_only=False)
@@ -0,0 +1,339 @@
+import copy
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Iterator
+from transformers.generation.streamers import BaseStreamer
+from src.config.config import get_config
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of a request's token stream
+_END = object()
+
+
+class GenerationRequest:
+    """
+    A prompt waiting for generation and the queue its text is delivered to.
+    """
+
+    def __init__(self, prompt: str, overrides: Dict[str, Any]):
+        self.prompt = prompt
+        # Measured by the worker with the scheduler's own tokenizer copy
+        self.input_length = None
+        self.overrides = overrides
+        self.group_key = tuple(sorted(overrides.items()))
+        self.output: "queue.Queue" = queue.Queue()
+        self.created = time.perf_counter()
+
+
+class BatchStreamer(BaseStreamer):
+    """
+    Stream generated text of every row of a batch to its own request.
+
+    Rows are decoded incrementally and a row stops receiving text once it
+    produced the end-of-sequence token, while the rest of the batch goes on.
+    """
+
+    def __init__(self, tokenizer, requests: List[GenerationRequest]):
+        self.tokenizer = tokenizer
+        self.requests = requests
+        self.tokens: List[List[int]] = [[] for _ in requests]
+        self.sent = ["" for _ in requests]
+        self.finished = [False for _ in requests]
+        self._prompt_seen = False
+
+    def _emit(self, row: int, final: bool = False):
+        text = self.tokenizer.decode(self.tokens[row], skip_special_tokens=True)
+        # Wait for the rest of a multi-byte character
+        if not final and text.endswith("\ufffd"):
+            return
+        if len(text) > len(self.sent[row]):
+            self.requests[row].output.put(text[len(self.sent[row]):])
+            self.sent[row] = text
+
+    def _finish(self, row: int):
+        if not self.finished[row]:
+            self._emit(row, final=True)
+            self.requests[row].output.put(_END)
+            self.finished[row] = True
+
+    def put(self, value):
+        # The first call carries the prompt ids
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+
+        for row, token in enumerate(value.reshape(len(self.requests), -1)[:, -1].tolist()):
+            if self.finished[row]:
+                continue
+            if token == self.tokenizer.eos_token_id:
+                self._finish(row)
+                continue
+            self.tokens[row].append(token)
+            self._emit(row)
+
+    def end(self):
+        for row in range(len(self.requests)):
+            self._finish(row)
+
+
+class GenerationScheduler:
+    """
+    Dynamic batching in front of a LlamaPipeline.
+
+    Concurrent callers submit prompts; a worker thread waits up to
+    max_wait_ms for more requests, groups requests with the same generation
+    settings and similar prompt lengths (to limit padding) into batches of at
+    most max_batch_size, runs each batch as one generate() call and streams
+    every row back to its caller. Exposes the same stream()/generate()
+    interface as LlamaPipeline.
+    """
+
+    def __init__(self, generator, max_batch_size: int = 4, max_wait_ms: float = 20, max_padding_ratio: float = 0.5):
+        """
+        Initialize and start the scheduler.
+
+        Args:
+            generator: LlamaPipeline providing the model, tokenizer and settings
+            max_batch_size: Maximum number of requests generated together
+            max_wait_ms: How long the first request waits for others to join
+            max_padding_ratio: Largest share of padding tokens allowed in a batch
+        """
+        self.generator = generator
+        self.model = generator.model
+        # Request threads keep counting tokens with the shared tokenizer; a fast
+        # tokenizer raises "Already borrowed" when another thread changes its
+        # padding mid-call, so the worker pads batches with a copy of its own
+        self.tokenizer = copy.deepcopy(generator.tokenizer)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_padding_ratio = max_padding_ratio
+
+        # Decoder-only models need left padding for batched generation,
+        # set on the copy so the pipeline and condenser keep their settings
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        self._pending: List[GenerationRequest] = []
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.stats = {"requests": 0, "batches": 0, "batched_requests": 0, "padding_tokens": 0, "prompt_tokens": 0}
+
+        self._worker = threading.Thread(target=self._run, name="generation-scheduler", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_config(cls, generator):
+        """
+        Wrap a LlamaPipeline when batching is enabled in config.
+
+        Args:
+            generator: LlamaPipeline instance
+
+        Returns:
+            GenerationScheduler, or the pipeline itself when disabled
+        """
+        params = get_config().get("generation_batching", {})
+        if not params.get("enabled", False):
+            return generator
+
+        if getattr(generator, "assistant_model", None) is not None:
+            # Assisted generation only runs one sequence at a time
+            logger.info("Draft model configured, dynamic batching disabled")
+            return generator
+
+        return cls(
+            generator,
+            max_batch_size=params.get("max_batch_size", 4),
+            max_wait_ms=params.get("max_wait_ms", 20),
+            max_padding_ratio=params.get("max_padding_ratio", 0.5)
+        )
+
+    def stream(self, prompt: str, **overrides) -> Iterator[str]:
+        """
+        Queue a prompt and yield its text as it is generated.
+
+        Args:
+            prompt: Full prompt text
+            **overrides: Generation parameters replacing the configured ones
+
+        Yields:
+            Pieces of generated text
+        """
+        request = GenerationRequest(prompt, overrides)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Generation scheduler is closed")
+            self._pending.append(request)
+            self.stats["requests"] += 1
+            self._condition.notify()
+
+        while True:
+            item = request.output.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def generate(self, prompt: str, **overrides) -> str:
+        """
+        Generate a completion without streaming.
+
+        Args:
+            prompt: Full prompt text
+            **overrides: Generation parameters replacing the configured ones
+
+        Returns:
+            Generated text
+        """
+        return "".join(self.stream(prompt, **overrides))
+
+    def _select_batch(self) -> List[GenerationRequest]:
+        """
+        Take the oldest request and the compatible requests closest in length.
+
+        Called with the condition lock held.
+        """
+        first = self._pending[0]
+        candidates = sorted(
+            (request for request in self._pending[1:] if request.group_key == first.group_key),
+            key=lambda request: abs(request.input_length - first.input_length)
+        )
+
+        batch = [first]
+        for request in candidates:
+            if len(batch) >= self.max_batch_size:
+                break
+            lengths = [r.input_length for r in batch] + [request.input_length]
+            padding = len(lengths) * max(lengths) - sum(lengths)
+            if padding <= self.max_padding_ratio * len(lengths) * max(lengths):
+                batch.append(request)
+
+        for request in batch:
+            self._pending.remove(request)
+        return batch
+
+    def _measure_pending(self):
+        """
+        Count the prompt tokens of new requests, failing those that cannot be tokenized.
+
+        Called with the condition lock held. A failing request gets the error
+        on its queue and leaves the queue, so the worker keeps running.
+        """
+        for request in list(self._pending):
+            if request.input_length is not None:
+                continue
+            try:
+                request.input_length = len(self.tokenizer(request.prompt)["input_ids"])
+            except Exception as e:
+                logger.error(f"Tokenizing a queued prompt failed: {str(e)}")
+                self._pending.remove(request)
+                request.output.put(e)
+
+    def _run(self):
+        """Worker loop collecting and running batches."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+
+                # Give concurrent callers a moment to join the batch
+                deadline = self._pending[0].created + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                self._measure_pending()
+                if not self._pending:
+                    continue
+
+                batch = self._select_batch()
+
+            self._generate_batch(batch)
+
+    def _generate_batch(self, batch: List[GenerationRequest]):
+        """
+        Run one padded generate() call for a batch.
+
+        A batch of one goes through the pipeline's own stream() instead, which
+        reuses cached prompt prefixes; padded batches cannot.
+
+        Args:
+            batch: Requests with identical generation settings
+        """
+        if len(batch) == 1:
+            self._generate_single(batch[0])
+            return
+
+        try:
+            inputs = self.tokenizer(
+                [request.prompt for request in batch],
+                return_tensors="pt",
+                padding=True
+            ).to(self.model.device)
+
+            lengths = [request.input_length for request in batch]
+            self.stats["batches"] += 1
+            self.stats["batched_requests"] += len(batch)
+            self.stats["prompt_tokens"] += sum(lengths)
+            self.stats["padding_tokens"] += len(batch) * max(lengths) - sum(lengths)
+
+            streamer = BatchStreamer(self.tokenizer, batch)
+            kwargs = {**self.generator.generation_kwargs(), **batch[0].overrides}
+            self.model.generate(**inputs, streamer=streamer, **kwargs)
+            streamer.end()
+
+        except Exception as e:
+            logger.error(f"Batched generation failed: {str(e)}")
+            for request in batch:
+                request.output.put(e)
+
+    def _generate_single(self, request: GenerationRequest):
+        """
+        Stream one request through the wrapped pipeline and its prefix cache.
+
+        Args:
+            request: Request to generate
+        """
+        self.stats["batches"] += 1
+        self.stats["batched_requests"] += 1
+        self.stats["prompt_tokens"] += request.input_length
+        try:
+            for text in self.generator.stream(request.prompt, **request.overrides):
+                request.output.put(text)
+            request.output.put(_END)
+        except Exception as e:
+            logger.error(f"Generation failed: {str(e)}")
+            request.output.put(e)
+
+    def close(self):
+        """Finish queued requests and stop the worker thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join()
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters.
+
+        Returns:
+            Dictionary with counters, mean batch size and padding share
+        """
+        batches = self.stats["batches"]
+        total = self.stats["prompt_tokens"] + self.stats["padding_tokens"]
+        return {
+            **self.stats,
+            "mean_batch_size": self.stats["batched_requests"] / batches if batches else 0.0,
+            "padding_share": self.stats["padding_tokens"] / total if total else 0.0,
+        }
@@ -0,0 +1,17 @@
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        Peak RSS in megabytes, or 0.0 where it cannot be measured
+    """
+    if resource is None:
+        return 0.0
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,360 @@
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+from src.config.config import get_config
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+_metrics = None
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> List[float]:
+    """
+    Upper bounds of histogram buckets growing by a constant factor.
+
+    Args:
+        start: First upper bound
+        factor: Ratio between neighbouring bounds
+        count: Number of buckets
+
+    Returns:
+        Sorted bucket bounds
+    """
+    return [start * factor ** i for i in range(count)]
+
+
+# 0.1 ms to ~100 s for durations, 1 to ~1M for token counts
+SECONDS_BUCKETS = exponential_buckets(0.0001, 2.0, 21)
+COUNT_BUCKETS = exponential_buckets(1.0, 2.0, 21)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum, min and max.
+
+    Observations cost one binary search; quantiles are estimated by linear
+    interpolation within the bucket they fall into.
+    """
+
+    def __init__(self, buckets: List[float]):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds, an overflow bucket is added
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        """Add one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value, 0.0 for an empty histogram
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else self.min
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dictionary with count, sum, mean, min, p50, p90, p99 and max
+        """
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count,
+            "min": self.min,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class Span:
+    """
+    Timing of one stage execution, recorded when the with-block exits.
+
+    Attributes set on the span (token counts, document counts) are recorded
+    in histograms named after the span.
+    """
+
+    enabled = True
+
+    def __init__(self, registry: "MetricsRegistry", name: str):
+        self.registry = registry
+        self.name = name
+        self.attributes: Dict[str, float] = {}
+        self.start = 0.0
+        self.seconds = 0.0
+
+    def set(self, **attributes):
+        """
+        Attach numeric attributes to the span.
+
+        Args:
+            **attributes: Values such as tokens_in=512
+        """
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.seconds = time.perf_counter() - self.start
+        # A consumer closing a streaming generator early is not a failure
+        failed = exc_type is not None and not issubclass(exc_type, GeneratorExit)
+        self.registry.record(self.name, self.seconds, self.attributes, failed=failed)
+        return False
+
+
+class _NoopSpan:
+    """Span used while metrics are disabled, every call does nothing."""
+
+    enabled = False
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class MetricsRegistry:
+    """
+    Collect stage spans into histograms.
+
+    Every span name gets a '<name>.seconds' histogram, a '<name>.errors'
+    counter and one histogram per attribute, e.g. 'generation.tokens_out'.
+    While disabled, span() returns a shared no-op span, so instrumented code
+    pays for one attribute check and an empty with-block.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: Whether spans are recorded
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def span(self, name: str):
+        """
+        Time a stage.
+
+        Args:
+            name: Stage name, e.g. "retrieval"
+
+        Returns:
+            Context manager yielding a span
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name)
+
+    def _histogram(self, name: str, buckets: List[float]) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram(buckets)
+        return histogram
+
+    def record(self, name: str, seconds: float, attributes: Optional[Dict[str, float]] = None, failed: bool = False):
+        """
+        Record a finished span.
+
+        Args:
+            name: Stage name
+            seconds: Duration
+            attributes: Numeric attributes of the span
+            failed: Whether the stage raised
+        """
+        with self._lock:
+            self._histogram(f"{name}.seconds", SECONDS_BUCKETS).observe(seconds)
+            for key, value in (attributes or {}).items():
+                buckets = SECONDS_BUCKETS if key.endswith("seconds") else COUNT_BUCKETS
+                self._histogram(f"{name}.{key}", buckets).observe(float(value))
+            if failed:
+                self._counters[f"{name}.errors"] = self._counters.get(f"{name}.errors", 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the summaries of every histogram and counter.
+
+        Returns:
+            Dictionary with 'histograms' and 'counters'
+        """
+        with self._lock:
+            return {
+                "histograms": {name: histogram.summary() for name, histogram in sorted(self._histograms.items())},
+                "counters": dict(self._counters),
+            }
+
+    def render_prometheus(self) -> str:
+        """
+        Render the histograms in the Prometheus text format.
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                metric = "rag_" + name.replace(".", "_")
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, value in sorted(self._counters.items()):
+                metric = "rag_" + name.replace(".", "_") + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop every recorded observation."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _make_handler(registry: MetricsRegistry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.render_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(registry.snapshot()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            # Scrapes would flood the application log
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics (Prometheus text) and /metrics.json on a daemon thread.
+
+    Args:
+        registry: Registry to expose
+        port: TCP port, 0 picks a free one
+        host: Interface to bind, local only by default
+
+    Returns:
+        The running server
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(registry))
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_metrics_logger(registry: MetricsRegistry, interval_seconds: float) -> threading.Thread:
+    """
+    Log a structured metrics line periodically on a daemon thread.
+
+    Args:
+        registry: Registry to report
+        interval_seconds: Seconds between log lines
+
+    Returns:
+        The reporting thread
+    """
+    def report():
+        while True:
+            time.sleep(interval_seconds)
+            snapshot = registry.snapshot()
+            if snapshot["histograms"]:
+                logger.info(f"metrics {json.dumps(snapshot, sort_keys=True)}")
+
+    thread = threading.Thread(target=report, name="metrics-logger", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry, configured from config "metrics".
+
+    Returns:
+        MetricsRegistry instance
+    """
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry(enabled=get_config().get("metrics", {}).get("enabled", False))
+    return _metrics
+
+
+def start_exporters():
+    """Start the configured metrics endpoint and periodic log line, if any."""
+    registry = get_metrics()
+    if not registry.enabled:
+        return
+
+    params = get_config().get("metrics", {})
+    if params.get("port") is not None:
+        start_metrics_server(registry, params["port"], host=params.get("host", "127.0.0.1"))
+    if params.get("log_interval_seconds"):
+        start_metrics_logger(registry, params["log_interval_seconds"])
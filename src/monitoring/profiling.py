@@ -0,0 +1,218 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+from src.config.config import get_config
+from src.config.logging import get_logger
+from src.monitoring.metrics import get_metrics
+
+logger = get_logger(__name__)
+
+
+class StackSampler:
+    """
+    Sample the stacks of every thread at a fixed interval.
+
+    cProfile only sees the thread that enabled it, while model loading,
+    generation and Gradio requests run on other threads. The sampler covers
+    them all and writes collapsed stacks ("frame;frame;frame count" lines),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._frame_name(frame))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(frames))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Start sampling on a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path: str):
+        """
+        Write the sampled stacks in the collapsed format.
+
+        Args:
+            path: Output file
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Profile a whole run: CPU, allocations and per-stage wall time.
+
+    Everything is written to a timestamped directory:
+    - cpu.pstats: cProfile of the main thread, for pstats or snakeviz
+    - stacks.collapsed: sampled stacks of all threads, for flame graphs
+    - allocations-<label>.tracemalloc: tracemalloc snapshots, loadable with
+      tracemalloc.Snapshot.load, and a top-allocations text summary
+    - stages.json: histograms of the stage spans recorded meanwhile
+    - summary.txt: the hottest functions by cumulative time
+    """
+
+    def __init__(self, name: str, output_root: str = "./profiles", sample_interval: float = 0.005,
+                 tracemalloc_frames: int = 10):
+        """
+        Initialize the profiler.
+
+        Args:
+            name: Run name, the prefix of the output directory
+            output_root: Directory the run directories are created in
+            sample_interval: Seconds between stack samples
+            tracemalloc_frames: Frames stored per allocation traceback
+        """
+        self.name = name
+        self.directory = os.path.join(output_root, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.tracemalloc_frames = tracemalloc_frames
+        self.sampler = StackSampler(sample_interval)
+        self.cpu = cProfile.Profile()
+        self.start_time: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, name: str) -> "Profiler":
+        """
+        Create a profiler from config "profiling".
+
+        Args:
+            name: Run name, the prefix of the output directory
+
+        Returns:
+            Profiler instance
+        """
+        params = get_config().get("profiling", {})
+        return cls(
+            name,
+            output_root=params.get("output_dir", "./profiles"),
+            sample_interval=params.get("sample_interval_seconds", 0.005),
+            tracemalloc_frames=params.get("tracemalloc_frames", 10)
+        )
+
+    def start(self):
+        """
+        Start profiling.
+
+        Stage spans are switched on as well, so components created after
+        this point record their stage timings.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        get_metrics().enabled = True
+        tracemalloc.start(self.tracemalloc_frames)
+        self.sampler.start()
+        self.start_time = time.perf_counter()
+        self.cpu.enable()
+
+        logger.info(f"Profiling {self.name} into {self.directory}")
+
+    def snapshot(self, label: str):
+        """
+        Write a tracemalloc snapshot and its top allocation sites.
+
+        Args:
+            label: Snapshot name, e.g. "setup"
+        """
+        if not tracemalloc.is_tracing():
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        snapshot.dump(os.path.join(self.directory, f"allocations-{label}.tracemalloc"))
+
+        current, peak = tracemalloc.get_traced_memory()
+        with open(os.path.join(self.directory, f"allocations-{label}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+            for stat in snapshot.statistics("lineno")[:50]:
+                f.write(f"{stat}\n")
+
+    def stop(self) -> str:
+        """
+        Stop profiling and write every output.
+
+        Returns:
+            The output directory
+        """
+        self.cpu.disable()
+        elapsed = time.perf_counter() - self.start_time
+        self.sampler.stop()
+
+        self.snapshot("final")
+        tracemalloc.stop()
+
+        self.cpu.dump_stats(os.path.join(self.directory, "cpu.pstats"))
+        self.sampler.write_collapsed(os.path.join(self.directory, "stacks.collapsed"))
+
+        stages = get_metrics().snapshot()
+        histograms = stages["histograms"]
+        # Indexing covers embedding plus the store write of each batch
+        if "indexing.seconds" in histograms and "embedding.seconds" in histograms:
+            store_write = histograms["indexing.seconds"]["sum"] - histograms["embedding.seconds"]["sum"]
+            store_write += histograms.get("persist.seconds", {}).get("sum", 0.0)
+            stages["derived"] = {"store_write_seconds": store_write}
+        stages["wall_seconds"] = elapsed
+        with open(os.path.join(self.directory, "stages.json"), "w", encoding="utf-8") as f:
+            json.dump(stages, f, indent=2)
+
+        text = io.StringIO()
+        pstats.Stats(self.cpu, stream=text).sort_stats("cumulative").print_stats(40)
+        with open(os.path.join(self.directory, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Wall time {elapsed:.2f}s, {self.sampler.samples} stack samples\n\n")
+            f.write("Stage totals (seconds):\n")
+            for name, summary in histograms.items():
+                if name.endswith(".seconds") and summary.get("count"):
+                    f.write(f"  {name[:-len('.seconds')]:<20} {summary['sum']:>10.3f}  ({summary['count']} calls)\n")
+            f.write("\n")
+            f.write(text.getvalue())
+
+        logger.info(f"Profile written to {self.directory}")
+        return self.directory
@@ -0,0 +1,93 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Close enough to interpreter start, the entry points import this first
+PROCESS_START = time.perf_counter()
+
+_startup_timer = None
+
+
+class StartupTimer:
+    """
+    Record how long each startup phase takes.
+
+    Phases may run concurrently on different threads, so every phase keeps
+    its own duration and the offset at which it finished. Marks record
+    points in time, e.g. when the prompt became available or the first
+    answer was produced.
+    """
+
+    def __init__(self, start: float = PROCESS_START):
+        """
+        Initialize the timer.
+
+        Args:
+            start: perf_counter() value offsets are measured from
+        """
+        self.start = start
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.marks: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a startup phase.
+
+        Args:
+            name: Phase name
+        """
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases[name] = {"seconds": end - begin, "finished_at": end - self.start}
+            logger.info(f"Startup phase {name} took {end - begin:.2f}s")
+
+    def mark(self, name: str):
+        """
+        Record the time since start, only the first time a mark is reached.
+
+        Args:
+            name: Mark name
+        """
+        with self._lock:
+            if name not in self.marks:
+                self.marks[name] = time.perf_counter() - self.start
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the recorded phases and marks.
+
+        Returns:
+            Dictionary with 'phases' (seconds per phase) and 'marks' (seconds since start)
+        """
+        with self._lock:
+            return {
+                "phases": {name: round(phase["seconds"], 3) for name, phase in self.phases.items()},
+                "marks": {name: round(offset, 3) for name, offset in self.marks.items()},
+            }
+
+    def log(self):
+        """Log the startup summary."""
+        logger.info(f"Startup: {self.summary()}")
+
+
+def get_startup_timer() -> StartupTimer:
+    """
+    Get the process-wide startup timer.
+
+    Returns:
+        StartupTimer instance
+    """
+    global _startup_timer
+    if _startup_timer is None:
+        _startup_timer = StartupTimer()
+    return _startup_timer
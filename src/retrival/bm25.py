@@ -0,0 +1,367 @@
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from src.config.logging import get_logger
+from src.embeddings.doc_store import DocStore
+from src.embeddings.index_files import save_json, remove_file
+
+logger = get_logger(__name__)
+
+# Identifiers such as REG_CTRL0, 4.2.1 or PN-1234-A are kept whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+SUB_TOKEN_PATTERN = re.compile(r"[._\-/]")
+
+META_FILENAME = "bm25_meta.json"
+GENERATION_PATTERN = re.compile(r"index-(\d+)")
+# Index files written next to the segments before builds were versioned
+LEGACY_FILES = (
+    "bm25_postings_docs.npy", "bm25_postings_tf.npy", "bm25_term_offsets.npy", "bm25_doc_lens.npy",
+    "bm25_vocab.json", "bm25_docs.jsonl", "bm25_docs.offsets.npy"
+)
+
+
+def lexical_index_dir(config: Dict[str, Any]) -> str:
+    """
+    Get the lexical index directory, next to the vector store by default.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Directory path
+    """
+    return config.get("lexical_index_dir") or os.path.join(config.get("vector_store_dir", "./vector_store"), "lexical")
+
+
+def generation_dir(directory: str, generation: int) -> str:
+    """
+    Get the directory holding one generation of the index files.
+
+    Args:
+        directory: Lexical index directory
+        generation: Generation number, 0 for the unversioned layout
+
+    Returns:
+        Directory path
+    """
+    return os.path.join(directory, f"index-{generation}") if generation else directory
+
+
+def read_meta(directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the index metadata naming the current generation.
+
+    Args:
+        directory: Lexical index directory
+
+    Returns:
+        Metadata dictionary, or None when no index was built
+    """
+    path = os.path.join(directory, META_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms for lexical search.
+
+    Compound identifiers are indexed whole and as their parts, so both
+    "reg_ctrl0" and "ctrl0" match REG_CTRL0.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of terms
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = SUB_TOKEN_PATTERN.split(token)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part)
+    return terms
+
+
+class BM25Builder:
+    """
+    Build the on-disk BM25 index incrementally.
+
+    Term counts of every source PDF are kept in a segment file, so an
+    incremental build only tokenizes new or changed PDFs. build() merges all
+    segments into the array-based index read by BM25Index.
+
+    Every build writes a new generation directory and then points
+    bm25_meta.json at it, so indexes serving queries keep their own files
+    and an interrupted build leaves the previous index in place.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the builder.
+
+        Args:
+            directory: Lexical index directory
+        """
+        self.directory = directory
+        self.segments_dir = os.path.join(directory, "segments")
+        self._source = None
+        self._chunks: List[Dict[str, Any]] = []
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+    def _segment_path(self, source: str) -> str:
+        name = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        return os.path.join(self.segments_dir, f"{name}.json")
+
+    def add_chunks(self, chunks: Iterable[Dict[str, Any]]):
+        """
+        Add chunks, which must arrive grouped by source.
+
+        Args:
+            chunks: Chunk dictionaries with 'content' and 'metadata'
+        """
+        for chunk in chunks:
+            source = chunk["metadata"]["source"]
+            if source != self._source:
+                self._flush()
+                self._source = source
+
+            self._chunks.append({
+                "text": chunk["content"],
+                "metadata": chunk["metadata"],
+                "tf": Counter(tokenize(chunk["content"]))
+            })
+
+    def _flush(self):
+        """Write the segment of the current source."""
+        if self._source is None:
+            return
+
+        with open(self._segment_path(self._source), "w") as f:
+            json.dump({"source": self._source, "chunks": self._chunks}, f, ensure_ascii=False)
+
+        self._source = None
+        self._chunks = []
+
+    def remove_source(self, source: str):
+        """
+        Drop the segment of a source PDF.
+
+        Args:
+            source: Source PDF file name
+        """
+        path = self._segment_path(source)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def clear(self):
+        """Drop every segment."""
+        shutil.rmtree(self.segments_dir, ignore_errors=True)
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+    def is_built(self) -> bool:
+        """Check whether the index files exist."""
+        return os.path.exists(os.path.join(self.directory, META_FILENAME))
+
+    def build(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Merge all segments into the index files.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self._flush()
+
+        previous = read_meta(self.directory)
+        generation = previous.get("generation", 0) + 1 if previous else 1
+        index_dir = generation_dir(self.directory, generation)
+        # Left over by an interrupted build
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.makedirs(index_dir)
+
+        docs = DocStore(index_dir, name="bm25_docs")
+
+        vocabulary: Dict[str, int] = {}
+        term_parts, doc_parts, tf_parts, len_parts = [], [], [], []
+        num_docs = 0
+
+        # One segment in memory at a time, postings kept as arrays
+        for name in sorted(os.listdir(self.segments_dir)):
+            with open(os.path.join(self.segments_dir, name), "r") as f:
+                chunks = json.load(f)["chunks"]
+
+            docs.append({"text": chunk["text"], "metadata": chunk["metadata"]} for chunk in chunks)
+
+            terms, doc_ids, tfs = [], [], []
+            for i, chunk in enumerate(chunks):
+                for term, count in chunk["tf"].items():
+                    terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                    doc_ids.append(num_docs + i)
+                    tfs.append(count)
+
+            term_parts.append(np.asarray(terms, dtype=np.int32))
+            doc_parts.append(np.asarray(doc_ids, dtype=np.int32))
+            tf_parts.append(np.minimum(np.asarray(tfs, dtype=np.int64), 65535).astype(np.uint16))
+            len_parts.append(np.asarray([sum(chunk["tf"].values()) for chunk in chunks], dtype=np.int32))
+            num_docs += len(chunks)
+
+        docs.flush()
+
+        term_ids = np.concatenate(term_parts) if term_parts else np.empty(0, dtype=np.int32)
+        doc_ids = np.concatenate(doc_parts) if doc_parts else np.empty(0, dtype=np.int32)
+        tfs = np.concatenate(tf_parts) if tf_parts else np.empty(0, dtype=np.uint16)
+        doc_lens = np.concatenate(len_parts) if len_parts else np.empty(0, dtype=np.int32)
+
+        # Documents are already ascending, so a stable sort by term keeps
+        # every posting list sorted by document
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)))])
+
+        np.save(os.path.join(index_dir, "bm25_postings_docs.npy"), doc_ids[order])
+        np.save(os.path.join(index_dir, "bm25_postings_tf.npy"), tfs[order])
+        np.save(os.path.join(index_dir, "bm25_term_offsets.npy"), offsets.astype(np.int64))
+        np.save(os.path.join(index_dir, "bm25_doc_lens.npy"), doc_lens)
+
+        with open(os.path.join(index_dir, "bm25_vocab.json"), "w") as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+
+        # Switch readers to the new generation
+        avgdl = float(doc_lens.mean()) if num_docs else 0.0
+        save_json(
+            os.path.join(self.directory, META_FILENAME),
+            {"generation": generation, "num_docs": num_docs, "avgdl": avgdl, "k1": k1, "b": b}
+        )
+
+        self._remove_old_generations(keep={generation, previous.get("generation", 0) if previous else 0})
+
+        logger.info(f"Built BM25 index with {num_docs} chunks and {len(vocabulary)} terms")
+
+    def _remove_old_generations(self, keep: Set[int]):
+        """
+        Delete index generations no longer needed.
+
+        The previous generation is kept for indexes still serving queries
+        from it; they are replaced when the retriever is recreated.
+
+        Args:
+            keep: Generations to keep, 0 being files of the unversioned layout
+        """
+        for name in os.listdir(self.directory):
+            match = GENERATION_PATTERN.fullmatch(name)
+            if match and int(match.group(1)) not in keep:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+        if 0 not in keep:
+            for name in LEGACY_FILES:
+                remove_file(os.path.join(self.directory, name))
+
+
+class BM25Index:
+    """
+    Memory-mapped BM25 index over document chunks.
+
+    Postings are stored as two flat arrays (chunk numbers and term
+    frequencies) sliced per term through an offsets array.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Load the index files.
+
+        Args:
+            directory: Lexical index directory
+        """
+        meta = read_meta(directory)
+        # Indexes built before generations keep their files in directory itself
+        directory = generation_dir(directory, meta.get("generation", 0))
+
+        with open(os.path.join(directory, "bm25_vocab.json"), "r") as f:
+            self.vocabulary: Dict[str, int] = json.load(f)
+
+        self.num_docs = meta["num_docs"]
+        self.avgdl = meta["avgdl"] or 1.0
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+
+        self.postings_docs = np.load(os.path.join(directory, "bm25_postings_docs.npy"), mmap_mode="r")
+        self.postings_tf = np.load(os.path.join(directory, "bm25_postings_tf.npy"), mmap_mode="r")
+        self.term_offsets = np.load(os.path.join(directory, "bm25_term_offsets.npy"), mmap_mode="r")
+        self.doc_lens = np.load(os.path.join(directory, "bm25_doc_lens.npy"), mmap_mode="r")
+        self.docs = DocStore(directory, name="bm25_docs")
+
+        logger.info(f"Loaded BM25 index with {self.num_docs} chunks from {directory}")
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """
+        Load the index if it was built.
+
+        Args:
+            directory: Lexical index directory
+
+        Returns:
+            BM25Index instance or None
+        """
+        if not os.path.exists(os.path.join(directory, META_FILENAME)):
+            return None
+        return cls(directory)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Score chunks against a query with BM25.
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            List of (chunk number, score) tuples, best first
+        """
+        term_ids = {self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary}
+        if not term_ids or self.num_docs == 0:
+            return []
+
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+
+        for term_id in term_ids:
+            start, end = int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1])
+            docs = np.asarray(self.postings_docs[start:end])
+            tf = np.asarray(self.postings_tf[start:end], dtype=np.float32)
+
+            idf = math.log(1.0 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * np.asarray(self.doc_lens[docs]) / self.avgdl)
+            # Chunk numbers are unique within a posting list
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(row), float(scores[row])) for row in best]
+
+    def get_document(self, row: int) -> Document:
+        """
+        Load a chunk as a LangChain document.
+
+        Args:
+            row: Chunk number
+
+        Returns:
+            Document instance
+        """
+        record = self.docs.get(row)
+        return Document(page_content=record["text"], metadata=record["metadata"])
@@ -0,0 +1,219 @@
+from typing import List, Dict, Any, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rough characters per token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str, tokenizer=None) -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text: Input text
+        tokenizer: LLM tokenizer, the count is estimated when None
+
+    Returns:
+        Number of tokens
+    """
+    if tokenizer is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def merge_overlapping(first: str, second: str, max_overlap: int, min_overlap: int = 20) -> Optional[str]:
+    """
+    Join two texts when the end of the first repeats at the start of the second.
+
+    Args:
+        first: Earlier text
+        second: Later text
+        max_overlap: Longest overlap to look for, in characters
+        min_overlap: Shortest overlap accepted as a real repeat
+
+    Returns:
+        Merged text, or None when the texts do not overlap
+    """
+    if second in first:
+        return first
+
+    probe = second[:min_overlap]
+    if len(probe) < min_overlap:
+        return None
+
+    window_start = max(0, len(first) - max_overlap - len(probe))
+    position = first.find(probe, window_start)
+    while position != -1:
+        tail = first[position:]
+        if second.startswith(tail):
+            return first + second[len(tail):]
+        position = first.find(probe, position + 1)
+
+    return None
+
+
+class ContextPacker:
+    """
+    Turn retrieved chunks into a compact, token-budgeted context.
+
+    Chunks of the same PDF with neighbouring chunk_index values are merged
+    into one passage with the repeated chunk_overlap text removed, exact and
+    contained duplicates are dropped, and passages are added in retrieval
+    order until the token budget is used up.
+    """
+
+    def __init__(self, tokenizer=None, max_tokens: int = 1500, max_overlap: int = 400):
+        """
+        Initialize the packer.
+
+        Args:
+            tokenizer: LLM tokenizer used to count tokens, estimated when None
+            max_tokens: Token budget of the packed context
+            max_overlap: Longest text overlap between neighbouring chunks
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.max_overlap = max_overlap
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens
+        """
+        return count_tokens(text, self.tokenizer)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut a text down to a number of tokens.
+
+        Args:
+            text: Input text
+            max_tokens: Maximum number of tokens
+
+        Returns:
+            Truncated text
+        """
+        if self.tokenizer is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        ids = self.tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return self.tokenizer.decode(ids)
+
+    def _merge_neighbours(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        """
+        Merge adjacent chunks of the same source.
+
+        Args:
+            documents: Retrieved documents, best first
+
+        Returns:
+            Passages with text, metadata, chunk indices and best rank
+        """
+        passages = []
+        by_source: Dict[Any, List[tuple]] = {}
+
+        for rank, doc in enumerate(documents):
+            metadata = doc.metadata or {}
+            if "source" in metadata and "chunk_index" in metadata:
+                by_source.setdefault(metadata["source"], []).append((metadata["chunk_index"], rank, doc))
+            else:
+                passages.append({"text": doc.page_content, "metadata": metadata, "chunks": [], "rank": rank})
+
+        for source, chunks in by_source.items():
+            chunks.sort(key=lambda chunk: chunk[0])
+            current = None
+
+            for chunk_index, rank, doc in chunks:
+                if current is not None and chunk_index == current["chunks"][-1]:
+                    current["rank"] = min(current["rank"], rank)
+                    continue
+
+                if current is not None and chunk_index == current["chunks"][-1] + 1:
+                    merged = merge_overlapping(current["text"], doc.page_content, self.max_overlap)
+                    if merged is not None:
+                        current["text"] = merged
+                        current["chunks"].append(chunk_index)
+                        current["rank"] = min(current["rank"], rank)
+                        continue
+
+                current = {"text": doc.page_content, "metadata": doc.metadata, "chunks": [chunk_index], "rank": rank}
+                passages.append(current)
+
+        return passages
+
+    def pack(self, documents: List[Document]) -> List[Document]:
+        """
+        Pack retrieved documents into the token budget.
+
+        Args:
+            documents: Retrieved documents, best first
+
+        Returns:
+            Packed documents in retrieval order
+        """
+        passages = sorted(self._merge_neighbours(documents), key=lambda passage: passage["rank"])
+
+        packed = []
+        kept_texts = []
+        used = 0
+
+        for passage in passages:
+            text = passage["text"]
+            # Drop passages repeated inside one already kept
+            if any(text in kept for kept in kept_texts):
+                continue
+
+            tokens = self.count_tokens(text)
+            remaining = self.max_tokens - used
+
+            if tokens > remaining:
+                if packed:
+                    continue
+                # Always keep part of the best passage
+                text = self.truncate(text, remaining)
+                tokens = remaining
+
+            metadata = dict(passage["metadata"])
+            if passage["chunks"]:
+                metadata["chunk_index"] = passage["chunks"][0]
+                metadata["merged_chunks"] = list(passage["chunks"])
+
+            packed.append(Document(page_content=text, metadata=metadata))
+            kept_texts.append(text)
+            used += tokens
+
+        logger.debug(f"Packed {len(documents)} chunks into {len(packed)} passages, {used} tokens")
+
+        return packed
+
+
+class PackedRetriever(BaseRetriever):
+    """
+    Retriever that packs the results of another retriever with a ContextPacker.
+    """
+
+    retriever: Any
+    packer: Any
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        """
+        Retrieve and pack documents.
+
+        Args:
+            query: Search query
+            run_manager: Callback manager
+
+        Returns:
+            Packed documents
+        """
+        documents = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self.packer.pack(documents)
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from src.config.logging import get_logger
+from src.monitoring.metrics import get_metrics
+
+logger = get_logger(__name__)
+
+# Lexical lookups run here while the calling thread does the dense search;
+# the embedding model and NumPy release the GIL, so both overlap
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+
+def document_key(doc: Document) -> str:
+    """
+    Identify a chunk independently of the index it came from.
+
+    Args:
+        doc: Retrieved document
+
+    Returns:
+        "source:chunk_index" when known, the page content otherwise
+    """
+    metadata = doc.metadata or {}
+    if "source" in metadata and "chunk_index" in metadata:
+        return f"{metadata['source']}:{metadata['chunk_index']}"
+    return doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion.
+
+    Every list contributes 1 / (rrf_k + rank) to a document's score, so
+    documents ranked well by both retrievers come first without having to
+    calibrate BM25 scores against cosine similarities.
+
+    Args:
+        rankings: Result lists, best first
+        k: Number of fused results
+        rrf_k: Rank smoothing constant
+
+    Returns:
+        Top k fused documents
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = document_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[key] for key in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Combine BM25 and vector search with reciprocal rank fusion.
+
+    Exact identifiers such as register names or part numbers are found by
+    the lexical index, paraphrased questions by the vector store.
+    """
+
+    vector_store: Any
+    lexical_index: Any
+    k: int = 3
+    candidate_k: int = 20
+    rrf_k: int = 60
+
+    def _dense_search(self, query: str) -> List[Document]:
+        with get_metrics().span("vector_search"):
+            return self.vector_store.similarity_search(query, k=self.candidate_k)
+
+    def _lexical_search(self, query: str) -> List[Document]:
+        with get_metrics().span("lexical_search"):
+            hits = self.lexical_index.search(query, self.candidate_k)
+            return [self.lexical_index.get_document(row) for row, _ in hits]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        """
+        Run both lookups concurrently and fuse their rankings.
+
+        Args:
+            query: Search query
+            run_manager: Callback manager
+
+        Returns:
+            Top k documents
+        """
+        lexical = _executor.submit(self._lexical_search, query)
+        dense = self._dense_search(query)
+        return reciprocal_rank_fusion([dense, lexical.result()], self.k, self.rrf_k)
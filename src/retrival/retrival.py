@@ -1,8 +1,32 @@
+from typing import List, Any
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 from src.config.config import get_config
 from src.config.logging import get_logger
+from src.monitoring.metrics import get_metrics
+from src.retrival.bm25 import BM25Index, lexical_index_dir
+from src.retrival.context_packer import ContextPacker, PackedRetriever
+from src.retrival.hybrid import HybridRetriever
 
 logger = get_logger(__name__)
 
+class TimedRetriever(BaseRetriever):
+    """
+    Record a vector_search span around another retriever, whatever the backend.
+    
+    The span includes embedding the query, which the query_embedding span
+    reports on its own.
+    """
+    
+    retriever: Any
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        with get_metrics().span("vector_search") as span:
+            documents = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+            span.set(documents=len(documents))
+        return documents
+
 class Retriever:
     """
     Manage document retrieval from vector store.
@@ -13,15 +37,18 @@ class Retriever:
         Initialize with vector store.
         
         Args:
-            vector_store: Chroma vector store instance
+            vector_store: Vector store instance (Chroma or FlatVectorStore)
         """
         self.vector_store = vector_store
         self.config = get_config()
         
-    def get_retriever(self):
+    def get_retriever(self, tokenizer=None):
         """
         Create a configured retriever.
         
+        Args:
+            tokenizer: LLM tokenizer used to measure the context budget
+            
         Returns:
             Retriever instance
         """
@@ -30,11 +57,50 @@ class Retriever:
         search_type = self.config.get("search_type", "similarity")
         
         logger.info(f"Creating retriever with k={search_k}, type={search_type}")
+
+        if search_type == "hybrid":
+            retriever = self._get_hybrid_retriever(search_k)
+        else:
+            # Configure retriever
+            retriever = self.vector_store.as_retriever(
+                search_kwargs={"k": search_k},
+                search_type=search_type
+            )
+            # Only wrapped while metrics are on, keeping the query path unchanged otherwise
+            if get_metrics().enabled:
+                retriever = TimedRetriever(retriever=retriever)
         
-        # Configure retriever
-        retriever = self.vector_store.as_retriever(
-            search_kwargs={"k": search_k},
-            search_type=search_type
-        )
+        if self.config.get("context_packing", True):
+            packer = ContextPacker(
+                tokenizer=tokenizer,
+                max_tokens=self.config.get("context_max_tokens", 1500),
+                max_overlap=self.config.get("chunk_overlap", 200) * 2
+            )
+            retriever = PackedRetriever(retriever=retriever, packer=packer)
         
-        return retriever
\ No newline at end of file
+        return retriever
+
+    def _get_hybrid_retriever(self, search_k: int):
+        """
+        Create a retriever fusing BM25 and vector search.
+
+        Args:
+            search_k: Number of documents to return
+
+        Returns:
+            HybridRetriever instance
+        """
+        lexical_dir = lexical_index_dir(self.config)
+        lexical_index = BM25Index.load(lexical_dir)
+        if lexical_index is None:
+            raise ValueError(f"No lexical index in {lexical_dir}, rebuild the vector store with lexical_index enabled")
+
+        hybrid_params = self.config.get("hybrid_params", {})
+
+        return HybridRetriever(
+            vector_store=self.vector_store,
+            lexical_index=lexical_index,
+            k=search_k,
+            candidate_k=max(search_k, hybrid_params.get("candidate_k", 20)),
+            rrf_k=hybrid_params.get("rrf_k", 60)
+        )
\ No newline at end of file
@@ -0,0 +1,35 @@
+import os
+import re
+import sys
+import zlib
+from typing import List
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+# Tests import the project the same way the scripts do, from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class WordHashEmbeddings(Embeddings):
+    """Offline embedder hashing words into a small vector, texts sharing words score high."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+@pytest.fixture
+def embeddings():
+    return WordHashEmbeddings()
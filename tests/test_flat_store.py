@@ -0,0 +1,96 @@
+from src.embeddings.flat_store import FlatVectorStore
+
+TEXTS = [
+    "clock tree and PLL configuration",
+    "reset sequence of the bus controller",
+    "DMA engine descriptor rings",
+    "voltage rails and power domains",
+    "interrupt controller priorities",
+    "thermal limits and throttling",
+]
+
+
+def open_store(directory, embeddings):
+    return FlatVectorStore(persist_directory=str(directory), embedding_function=embeddings)
+
+
+def add(store, texts, start=0):
+    rows = range(start, start + len(texts))
+    store.add_texts(texts, metadatas=[{"source": f"{i}.pdf"} for i in rows], ids=[f"{i}.pdf:0" for i in rows])
+
+
+def build_store(directory, embeddings):
+    store = open_store(directory, embeddings)
+    add(store, TEXTS)
+    store.persist()
+    return store
+
+
+def sources(documents):
+    return [doc.metadata["source"] for doc in documents]
+
+
+def test_search_finds_the_matching_text(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+
+    assert sources(store.similarity_search("DMA descriptor rings", k=1)) == ["2.pdf"]
+
+
+def test_deletes_survive_persist_and_reload(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+    store.delete(ids=["2.pdf:0"])
+    store.persist()
+
+    reloaded = open_store(tmp_path, embeddings)
+    assert len(reloaded) == len(TEXTS) - 1
+    assert "2.pdf" not in sources(reloaded.similarity_search("DMA descriptor rings", k=len(TEXTS)))
+
+
+def test_rows_added_after_a_crash_line_up_with_their_text(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+    # Added but never persisted, as when the process dies mid-build
+    add(store, ["stale row one", "stale row two"], start=len(TEXTS))
+
+    reopened = open_store(tmp_path, embeddings)
+    assert len(reopened) == len(TEXTS)
+    add(reopened, ["watchdog timer"], start=len(TEXTS))
+    reopened.persist()
+
+    for store in (reopened, open_store(tmp_path, embeddings)):
+        document, score = store.similarity_search_with_score("watchdog timer", k=1)[0]
+        assert document.page_content == "watchdog timer"
+        assert score > 0.99
+
+
+def test_add_with_existing_id_replaces_the_row(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+    store.add_texts(["thermal sensors calibration"], metadatas=[{"source": "5.pdf", "version": 2}], ids=["5.pdf:0"])
+
+    assert len(store) == len(TEXTS)
+    assert store.similarity_search("thermal sensors calibration", k=1)[0].metadata["version"] == 2
+
+
+def test_compact_drops_deleted_rows(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+    store.delete(ids=[f"{i}.pdf:0" for i in range(3)])
+    store.compact()
+    store.persist()
+
+    assert store.matrix().shape[0] == len(TEXTS) - 3
+    assert not store.deleted_mask().any()
+
+    reloaded = open_store(tmp_path, embeddings)
+    assert len(reloaded) == len(TEXTS) - 3
+    assert sources(reloaded.similarity_search("voltage rails and power domains", k=1)) == ["3.pdf"]
+
+    # Row numbers changed, IDs must still resolve to the right rows
+    reloaded.delete(ids=["3.pdf:0"])
+    assert "3.pdf" not in sources(reloaded.similarity_search("voltage rails", k=len(TEXTS)))
+
+
+def test_persist_compacts_when_many_rows_are_deleted(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings)
+    store.delete(ids=[f"{i}.pdf:0" for i in range(2)])
+    store.persist()
+
+    assert store.matrix().shape[0] == len(TEXTS) - 2
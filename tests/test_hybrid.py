@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from src.retrival.bm25 import BM25Builder, BM25Index, tokenize
+from src.retrival.hybrid import document_key, reciprocal_rank_fusion
+
+
+def chunk(source, index, text):
+    return {"content": text, "metadata": {"source": source, "chunk_index": index}}
+
+
+def doc(source, index, text=""):
+    return Document(page_content=text, metadata={"source": source, "chunk_index": index})
+
+
+def build_index(directory, chunks):
+    builder = BM25Builder(directory)
+    builder.add_chunks(chunks)
+    builder.build()
+    return builder
+
+
+def test_bm25_ranks_matching_chunks_first(tmp_path):
+    build_index(str(tmp_path), [
+        chunk("a.pdf", 0, "The bus clock runs at 100 MHz."),
+        chunk("a.pdf", 1, "Reset holds the bus idle."),
+        chunk("b.pdf", 0, "Power domains and voltage rails."),
+    ])
+    index = BM25Index.load(str(tmp_path))
+
+    results = index.search("bus clock frequency", k=3)
+    assert [index.get_document(row).metadata["chunk_index"] for row, _ in results] == [0, 1]
+    assert results[0][1] > results[1][1]
+    assert index.search("unrelated words", k=3) == []
+
+
+def test_bm25_remove_source_drops_its_chunks(tmp_path):
+    builder = build_index(str(tmp_path), [
+        chunk("a.pdf", 0, "voltage rails"),
+        chunk("b.pdf", 0, "voltage regulator"),
+    ])
+    builder.remove_source("a.pdf")
+    builder.build()
+
+    index = BM25Index.load(str(tmp_path))
+    sources = [index.get_document(row).metadata["source"] for row, _ in index.search("voltage", k=5)]
+    assert sources == ["b.pdf"]
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("Set REG_CTRL0 to 1") == ["set", "reg_ctrl0", "reg", "ctrl0", "to", "1"]
+
+
+def test_rebuild_leaves_a_loaded_index_intact(tmp_path):
+    builder = build_index(str(tmp_path), [chunk("a.pdf", 0, "voltage rails")])
+    live = BM25Index.load(str(tmp_path))
+
+    builder.remove_source("a.pdf")
+    builder.add_chunks([chunk("b.pdf", 0, "clock tree"), chunk("b.pdf", 1, "voltage regulator")])
+    builder.build()
+
+    assert [live.get_document(row).page_content for row, _ in live.search("voltage", k=5)] == ["voltage rails"]
+    current = BM25Index.load(str(tmp_path))
+    assert [current.get_document(row).page_content for row, _ in current.search("voltage", k=5)] == ["voltage regulator"]
+
+
+def test_interrupted_build_keeps_the_previous_index(tmp_path, monkeypatch):
+    builder = build_index(str(tmp_path), [chunk("a.pdf", 0, "voltage rails")])
+    builder.add_chunks([chunk("b.pdf", 0, "voltage regulator")])
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "save", crash)
+    with pytest.raises(OSError):
+        builder.build()
+    monkeypatch.undo()
+
+    index = BM25Index.load(str(tmp_path))
+    assert index.num_docs == 1
+    assert index.get_document(index.search("voltage", k=5)[0][0]).page_content == "voltage rails"
+
+
+def test_only_the_last_two_generations_are_kept(tmp_path):
+    builder = build_index(str(tmp_path), [chunk("a.pdf", 0, "voltage rails")])
+    builder.build()
+    builder.build()
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("index-")) == ["index-2", "index-3"]
+
+
+def test_rrf_prefers_documents_ranked_by_both_lists():
+    dense = [doc("a.pdf", 0), doc("a.pdf", 1), doc("b.pdf", 0)]
+    lexical = [doc("a.pdf", 1), doc("c.pdf", 0), doc("b.pdf", 0)]
+
+    fused = reciprocal_rank_fusion([dense, lexical], k=4, rrf_k=60)
+    assert [document_key(d) for d in fused] == ["a.pdf:1", "b.pdf:0", "a.pdf:0", "c.pdf:0"]
+
+
+def test_rrf_deduplicates_and_truncates():
+    ranking = [doc("a.pdf", 0), doc("a.pdf", 1)]
+
+    fused = reciprocal_rank_fusion([ranking, ranking], k=1)
+    assert [document_key(d) for d in fused] == ["a.pdf:0"]
+
+
+def test_document_key_falls_back_to_content():
+    assert document_key(Document(page_content="text")) == "text"
@@ -0,0 +1,50 @@
+import fitz
+from src.config.config import get_config
+from src.data.ingestion import IngestionPipeline
+from src.data.pdf_processor import PDFProcessor
+from src.embeddings.vector_store import VectorStore
+
+
+class WholeDocumentSplitter:
+    """Splitter double returning every document as a single chunk."""
+
+    chunk_size = 1000
+    chunk_overlap = 0
+    metadata_version = 1
+
+    def iter_split_documents(self, documents):
+        for doc in documents:
+            yield {"content": doc["content"], "metadata": {**doc["metadata"], "chunk_index": 0, "chunk_count": 1}}
+
+
+def write_pdf(path, text):
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), text)
+    pdf.save(str(path))
+    pdf.close()
+
+
+def test_incremental_rebuild_persists_deletion_only_changes(tmp_path, monkeypatch, embeddings):
+    config = get_config()
+    monkeypatch.setitem(config, "vector_backend", "flat")
+    monkeypatch.setitem(config, "vector_store_dir", str(tmp_path / "store"))
+    monkeypatch.setitem(config, "lexical_index", False)
+
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    write_pdf(pdf_dir / "clock.pdf", "clock tree and PLL configuration")
+    write_pdf(pdf_dir / "dma.pdf", "DMA engine descriptor rings")
+
+    def rebuild():
+        manager = VectorStore(embeddings)
+        IngestionPipeline(PDFProcessor(str(pdf_dir)), WholeDocumentSplitter(), manager).run()
+        return manager
+
+    rebuild()
+    (pdf_dir / "dma.pdf").unlink()
+    manager = rebuild()
+
+    # A fresh process only sees what was persisted
+    store = manager.load()
+    assert len(store) == 1
+    assert [doc.metadata["source"] for doc in store.similarity_search("DMA descriptor rings", k=5)] == ["clock.pdf"]
@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pytest
+from src.embeddings.flat_store import FlatVectorStore
+from src.embeddings.ivf_index import IVFIndex, evaluate_recall
+
+ROWS = 3000
+DIM = 32
+
+
+def clustered_vectors(rows=ROWS, dim=DIM, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=rows)] + 0.3 * rng.normal(size=(rows, dim))).astype(np.float32)
+
+
+def build_store(directory, embeddings, **kwargs):
+    store = FlatVectorStore(persist_directory=str(directory), embedding_function=embeddings, **kwargs)
+    vectors = clustered_vectors()
+    ids = [f"doc.pdf:{i}" for i in range(len(vectors))]
+    store.add_vectors(vectors, [str(i) for i in range(len(vectors))], [{} for _ in ids], ids)
+    store.persist()
+    return store
+
+
+def test_recall_grows_with_nprobe(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings, ann_index="ivf", ann_params={"nlist": 16, "min_rows": 0})
+    assert store.ivf is not None
+
+    results = {entry["nprobe"]: entry["recall"] for entry in evaluate_recall(store, num_queries=50, k=10, nprobe_values=[1, 4, 16])}
+    assert results[1] <= results[4] <= results[16]
+    assert results[4] >= 0.8
+    # Scanning every cluster is exact search
+    assert results[16] == pytest.approx(1.0)
+
+
+def test_index_is_reloaded(tmp_path, embeddings):
+    build_store(tmp_path, embeddings, ann_index="ivf", ann_params={"nlist": 16, "min_rows": 0})
+
+    reloaded = FlatVectorStore(persist_directory=str(tmp_path), embedding_function=embeddings, ann_index="ivf", ann_params={"min_rows": 0})
+    assert reloaded.ivf is not None and reloaded.ivf.indexed_rows == ROWS
+
+
+def test_search_skips_deleted_rows(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings, ann_index="ivf", ann_params={"nlist": 16, "min_rows": 0})
+    query = np.asarray(store.matrix()[0], dtype=np.float32)
+    store.delete(ids=["doc.pdf:0"])
+
+    assert 0 not in [row for row, _ in store.search_vector(query, k=10, nprobe=16)]
+
+
+def test_saving_a_rebuild_leaves_loaded_indexes_intact(tmp_path):
+    IVFIndex.build(clustered_vectors(seed=0), nlist=16, train_size=ROWS, iterations=5).save(str(tmp_path))
+    live = IVFIndex.load(str(tmp_path))
+    rows = np.array(live.rows)
+
+    IVFIndex.build(clustered_vectors(seed=1), nlist=16, train_size=ROWS, iterations=5).save(str(tmp_path))
+
+    np.testing.assert_array_equal(live.rows, rows)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_interrupted_save_loads_as_missing(tmp_path):
+    IVFIndex.build(clustered_vectors(), nlist=16, train_size=ROWS, iterations=5).save(str(tmp_path))
+    # The meta file is written last, a crash before it leaves none
+    os.remove(tmp_path / "ivf_meta.json")
+
+    assert IVFIndex.load(str(tmp_path)) is None
@@ -0,0 +1,67 @@
+import os
+from src.embeddings.manifest import IndexManifest, file_sha256
+
+
+def write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_diff_reports_added_changed_and_removed(tmp_path):
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    write(pdf_dir / "a.pdf", b"first")
+    write(pdf_dir / "b.pdf", b"second")
+
+    manifest = IndexManifest(str(tmp_path / "store"))
+    manifest.files = {
+        name: {**entry, "chunks": 1}
+        for name, entry in manifest.hash_files(str(pdf_dir), ["a.pdf", "b.pdf"]).items()
+    }
+
+    write(pdf_dir / "b.pdf", b"second, edited")
+    os.remove(pdf_dir / "a.pdf")
+    write(pdf_dir / "c.pdf", b"third")
+
+    fingerprints = manifest.hash_files(str(pdf_dir), ["b.pdf", "c.pdf"])
+    assert manifest.diff(fingerprints) == (["c.pdf"], ["b.pdf"], ["a.pdf"])
+
+
+def test_unchanged_files_diff_empty(tmp_path):
+    write(tmp_path / "a.pdf", b"content")
+    manifest = IndexManifest(str(tmp_path))
+    manifest.files = manifest.hash_files(str(tmp_path), ["a.pdf"])
+
+    assert manifest.diff(manifest.hash_files(str(tmp_path), ["a.pdf"])) == ([], [], [])
+
+
+def test_hash_files_reuses_hash_of_untouched_file(tmp_path):
+    write(tmp_path / "a.pdf", b"content")
+    manifest = IndexManifest(str(tmp_path))
+    stat = os.stat(tmp_path / "a.pdf")
+    manifest.files = {"a.pdf": {"hash": "recorded", "size": stat.st_size, "mtime": stat.st_mtime}}
+
+    assert manifest.hash_files(str(tmp_path), ["a.pdf"])["a.pdf"]["hash"] == "recorded"
+
+    os.utime(tmp_path / "a.pdf", (stat.st_atime, stat.st_mtime + 10))
+    assert manifest.hash_files(str(tmp_path), ["a.pdf"])["a.pdf"]["hash"] == file_sha256(str(tmp_path / "a.pdf"))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    manifest = IndexManifest(str(tmp_path))
+    manifest.params = {"chunk_size": 1000}
+    manifest.files = {"a.pdf": {"hash": "abc", "size": 1, "mtime": 2.0, "chunks": 3}}
+    manifest.save()
+
+    loaded = IndexManifest.load(str(tmp_path))
+    assert loaded.params == manifest.params
+    assert loaded.files == manifest.files
+    assert loaded.version == manifest.version
+
+
+def test_unreadable_manifest_loads_empty(tmp_path):
+    (tmp_path / "manifest.json").write_text("{not json")
+
+    manifest = IndexManifest.load(str(tmp_path))
+    assert manifest.files == {}
+    assert manifest.params == {}
@@ -0,0 +1,54 @@
+import pytest
+from src.data.page_cache import PageCache, page_at, page_offsets
+
+
+def test_page_offsets_account_for_joining_newlines():
+    assert page_offsets(["abc", "", "de"]) == [0, 4, 5]
+
+
+def test_page_at_maps_offsets_to_pages():
+    offsets = page_offsets(["abc", "defg"])
+    content = "abc\ndefg\n"
+
+    assert [page_at(offsets, i) for i in range(len(content))] == [1, 1, 1, 1, 2, 2, 2, 2, 2]
+    assert page_at([], 0) == 1
+
+
+def test_page_cache_round_trip_and_remove(tmp_path):
+    cache = PageCache(str(tmp_path), "v1")
+    pages = ["first page", "second page"]
+    content = "".join(text + "\n" for text in pages)
+    cache.save("ab" * 32, content, page_offsets(pages))
+
+    entry = cache.load("ab" * 32)
+    assert entry == {"content": content, "page_count": 2, "page_offsets": [0, 11]}
+    assert cache.load("cd" * 32) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Entries of older extractor versions are dropped too
+    PageCache(str(tmp_path), "v0").save("ab" * 32, content, page_offsets(pages))
+    cache.remove("ab" * 32)
+    assert cache.load("ab" * 32) is None
+    assert PageCache(str(tmp_path), "v0").load("ab" * 32) is None
+
+
+def test_chunks_carry_the_pages_they_span():
+    pytest.importorskip("langchain")
+    from src.data.text_splitter import DocumentSplitter
+
+    pages = ["alpha " * 20, "beta " * 20, "gamma " * 20]
+    document = {
+        "content": "".join(text + "\n" for text in pages),
+        "metadata": {"source": "doc.pdf"},
+        "page_offsets": page_offsets(pages)
+    }
+
+    chunks = DocumentSplitter(chunk_size=150, chunk_overlap=0).split_documents([document])
+    assert chunks
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        first, last = metadata["page"], metadata["page_end"]
+        assert 1 <= first <= last <= len(pages)
+        words = set(chunk["content"].split())
+        expected = {["alpha", "beta", "gamma"][page - 1] for page in range(first, last + 1)}
+        assert words == expected
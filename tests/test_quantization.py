@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pytest
+from src.embeddings.flat_store import FlatVectorStore, normalize_rows
+from src.embeddings.quantization import QuantizedCodes
+from src.embeddings.search_eval import recall_at_k, run_queries, sample_queries
+
+ROWS = 3000
+DIM = 32
+
+
+def clustered_vectors(rows=ROWS, dim=DIM, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=rows)] + 0.3 * rng.normal(size=(rows, dim))).astype(np.float32)
+
+
+def build_store(directory, embeddings, **kwargs):
+    store = FlatVectorStore(persist_directory=str(directory), embedding_function=embeddings, **kwargs)
+    vectors = clustered_vectors()
+    ids = [f"doc.pdf:{i}" for i in range(len(vectors))]
+    store.add_vectors(vectors, [str(i) for i in range(len(vectors))], [{} for _ in ids], ids)
+    store.persist()
+    return store
+
+
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_quantized_search_recall(tmp_path, embeddings, quantization):
+    store = build_store(
+        tmp_path,
+        embeddings,
+        quantization=quantization,
+        quantization_params={"min_rows": 0, "pq_m": 8, "recall_tolerance": 0.02}
+    )
+    assert store.quantized is not None
+
+    queries = sample_queries(store, num_queries=50, seed=1)
+    exact, _ = run_queries(store, queries, k=10, exact=True)
+    approximate, _ = run_queries(store, queries, k=10)
+    assert recall_at_k(approximate, exact) >= 0.95
+
+
+def test_codes_are_smaller_than_vectors(tmp_path, embeddings):
+    store = build_store(tmp_path, embeddings, quantization="pq", quantization_params={"min_rows": 0, "pq_m": 8})
+
+    footprint = store.memory_footprint()
+    assert footprint["codes_mb"] < footprint["vectors_mb"] / 10
+
+
+def test_saving_a_rebuild_leaves_loaded_codes_intact(tmp_path):
+    params = {"pq_m": 8, "pq_iterations": 5}
+    QuantizedCodes.build(normalize_rows(clustered_vectors(seed=0)), "pq", params).save(str(tmp_path))
+    live = QuantizedCodes.load(str(tmp_path), "pq")
+    codes = np.array(live.codes)
+
+    QuantizedCodes.build(normalize_rows(clustered_vectors(seed=1)), "pq", params).save(str(tmp_path))
+
+    np.testing.assert_array_equal(live.codes, codes)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+
+def test_interrupted_save_loads_as_missing(tmp_path):
+    QuantizedCodes.build(normalize_rows(clustered_vectors()), "int8", {}).save(str(tmp_path))
+    # The meta file is written last, a crash before it leaves none
+    os.remove(tmp_path / "quant_meta.json")
+
+    assert QuantizedCodes.load(str(tmp_path), "int8") is None
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("transformers")
+
+from src.llm.scheduler import GenerationScheduler
+
+
+class FakeTokenizer:
+    padding_side = "right"
+    pad_token = None
+    eos_token = "</s>"
+    eos_token_id = 0
+
+    def __call__(self, text, **kwargs):
+        if "\x00" in text:
+            raise ValueError("unsupported character")
+        return {"input_ids": text.split()}
+
+
+class FakeGenerator:
+    model = None
+
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+
+    def generation_kwargs(self):
+        return {}
+
+    def stream(self, prompt, **overrides):
+        yield f"echo: {prompt}"
+
+
+def test_untokenizable_prompt_fails_only_its_request():
+    scheduler = GenerationScheduler(FakeGenerator(), max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError):
+            scheduler.generate("bad \x00 prompt")
+
+        # The worker survived and serves later requests
+        assert scheduler.generate("hello world") == "echo: hello world"
+    finally:
+        scheduler.close()
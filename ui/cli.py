@@ -1,15 +1,8 @@
 import argparse
-from src.data.pdf_processor import PDFProcessor
-from src.data.text_splitter import DocumentSplitter
-from src.embeddings.embeddor import Embedder
-from src.embeddings.vector_store import VectorStore
-from src.llm.load_models import LlamaLoader
-from src.llm.pipeline import LlamaPipeline
-from src.retrival.retrival import Retriever
-from src.chat.memory import ConversationMemory
-from src.chat.chain import ChatChain
 from src.config.config import get_config
 from src.config.logging import get_logger, setup_logging
+from src.monitoring.startup import get_startup_timer
+from ui.components import BackgroundTask, load_components
 
 logger = get_logger(__name__)
 
@@ -35,80 +28,123 @@ class CliInterface:
         """
         logger.info("Setting up PDF chatbot")
         
-        embedder = Embedder()
-        embedding_model = embedder.get_embedder()
+        embedding_model, vector_store, llm_pipeline, tokenizer = load_components(self.config, rebuild_vector_store)
         
-        vector_store_manager = VectorStore(embedding_model)
+        with get_startup_timer().phase("chain"):
+            return self._create_chain(embedding_model, vector_store, llm_pipeline, tokenizer)
         
-        if rebuild_vector_store:
-            logger.info("Rebuilding vector store")
-            pdf_processor = PDFProcessor(self.config["pdf_dir"])
-            documents = pdf_processor.process_all_pdfs()
-            
-            doc_splitter = DocumentSplitter(
-                chunk_size=self.config["chunk_size"],
-                chunk_overlap=self.config["chunk_overlap"]
-            )
-            chunks = doc_splitter.split_documents(documents)
-            
-            vector_store = vector_store_manager.create_from_documents(chunks)
-        else:
-            vector_store = vector_store_manager.load()
-        
-        model_loader = LlamaLoader()
-        model, tokenizer = model_loader.load_model_and_tokenizer()
+    def _create_chain(self, embedding_model, vector_store, llm_pipeline, tokenizer):
+        """Wire the loaded components into a ChatChain."""
+        from src.retrival.retrival import Retriever
+        from src.chat.memory import ConversationMemory
+        from src.chat.chain import ChatChain
+        from src.chat.condense import QuestionCondenser
         
-        llm_pipeline = LlamaPipeline(model, tokenizer)
         llm = llm_pipeline.create_langchain_pipeline()
         
         retriever_manager = Retriever(vector_store)
-        retriever = retriever_manager.get_retriever()
+        retriever = retriever_manager.get_retriever(tokenizer=tokenizer)
         
         memory_manager = ConversationMemory()
         memory = memory_manager.create_memory()
         
-        chain_manager = ChatChain(llm, retriever, memory)
-        chain = chain_manager.create_chain()
+        condenser = QuestionCondenser.from_config(llm_pipeline)
         
-        return chain
+        chain_manager = ChatChain(
+            llm,
+            retriever,
+            memory,
+            embeddings=embedding_model,
+            generator=llm_pipeline,
+            condenser=condenser
+        )
+        chain_manager.create_chain()
+        
+        return chain_manager
     
-    def run(self):
-        """Run the CLI interface."""
-        parser = argparse.ArgumentParser(description="PDF Specification Chatbot CLI")
-        parser.add_argument("--rebuild", action="store_true", help="Rebuild vector store")
-        args = parser.parse_args()
+    def run(self, rebuild_vector_store=None):
+        """
+        Run the CLI interface.
+        
+        The components load in the background while the prompt is shown, the
+        first question waits for them.
+        
+        Args:
+            rebuild_vector_store: Whether to rebuild the vector store, read
+                from the command line when None
+        """
+        if rebuild_vector_store is None:
+            parser = argparse.ArgumentParser(description="PDF Specification Chatbot CLI")
+            parser.add_argument("--rebuild", action="store_true", help="Rebuild vector store")
+            args, _ = parser.parse_known_args()
+            rebuild_vector_store = args.rebuild
+        
+        timer = get_startup_timer()
         
         # Set up chain
-        chain = self.setup(rebuild_vector_store=args.rebuild)
+        setup_task = BackgroundTask(self.setup, rebuild_vector_store=rebuild_vector_store, name="setup")
+        chain = None
         
         # Run chat loop
         print("\n==== PDF Specification Chatbot ====")
         print("Type 'exit' or 'quit' to end the conversation.")
         print("Type 'clear' to clear conversation history.")
         print("====================================\n")
+        timer.mark("prompt_ready")
         
         while True:
             query = input("\nYou: ")
             
             if query.lower() in ["exit", "quit"]:
+                if chain is None:
+                    print("\nGoodbye!")
+                    break
+                if chain.answer_cache:
+                    logger.info(f"Answer cache: {chain.cache_stats()}")
+                if chain.condenser:
+                    logger.info(f"Question condensing: {chain.condenser.stats}")
+                if getattr(chain.generator, "prefix_cache", None):
+                    logger.info(f"Prefix cache: {chain.generator.prefix_cache.stats()}")
+                if hasattr(chain.generator, "stats"):
+                    logger.info(f"Decoding: {chain.generator.stats()}")
                 print("\nGoodbye!")
                 break
             
+            if chain is None:
+                if not setup_task.done():
+                    print("\n(Loading models...)")
+                chain = setup_task.result()
+                timer.mark("chain_ready")
+            
             if query.lower() == "clear":
                 chain.memory.clear()
                 print("\nConversation history cleared.")
                 continue
             
             try:
-                response = chain({"question": query})
-                formatted = ChatChain.format_response(response)
+                print("\nBot: ", end="", flush=True)
+                
+                formatted = None
+                for event in chain.stream(query):
+                    if event["type"] == "token":
+                        print(event["text"], end="", flush=True)
+                    elif event["type"] == "done":
+                        formatted = event["response"]
+                print()
                 
-                print("\nBot:", formatted["answer"])
+                timings = formatted["timings"]
+                logger.info(f"First token {timings['first_token']:.2f}s, total {timings['total']:.2f}s")
+                if "first_answer" not in timer.marks:
+                    timer.mark("first_answer")
+                    timer.log()
+                if formatted["cached"]:
+                    print("(cached answer)")
                 
                 if formatted["sources"]:
                     print("\nSources:")
                     for i, source in enumerate(formatted["sources"]):
-                        print(f"  {i+1}. {source['source']}")
+                        page = f", page {source['page']}" if source.get("page") else ""
+                        print(f"  {i+1}. {source['source']}{page}")
                 
             except Exception as e:
                 logger.error(f"Error in chat: {str(e)}")
@@ -0,0 +1,153 @@
+import threading
+from src.config.logging import get_logger
+from src.monitoring.startup import get_startup_timer
+
+logger = get_logger(__name__)
+
+class BackgroundTask:
+    """
+    Run a function on a daemon thread and collect its result later.
+    
+    Daemon threads do not hold up interpreter exit, so quitting while the
+    models are still loading returns right away.
+    """
+    
+    def __init__(self, target, *args, name=None, **kwargs):
+        """
+        Start the task.
+        
+        Args:
+            target: Function to run
+            *args: Positional arguments for target
+            name: Thread name
+            **kwargs: Keyword arguments for target
+        """
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(target, args, kwargs), name=name, daemon=True)
+        self._thread.start()
+        
+    def _run(self, target, args, kwargs):
+        try:
+            self._result = target(*args, **kwargs)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+            
+    def done(self) -> bool:
+        """Whether the task has finished."""
+        return self._done.is_set()
+        
+    def result(self):
+        """
+        Wait for the task.
+        
+        Returns:
+            Return value of the target, its exception is re-raised
+        """
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+def load_vector_store(config, rebuild_vector_store=False):
+    """
+    Load the embedding model and the vector store.
+    
+    Args:
+        config: Configuration dictionary
+        rebuild_vector_store: Whether to rebuild the vector store
+        
+    Returns:
+        Tuple of (embedding_model, vector_store)
+    """
+    timer = get_startup_timer()
+    
+    with timer.phase("embedder"):
+        from src.embeddings.embeddor import Embedder
+        
+        embedder = Embedder()
+        embedding_model = embedder.get_embedder()
+        
+    with timer.phase("vector_store"):
+        from src.embeddings.vector_store import VectorStore
+        
+        vector_store_manager = VectorStore(embedding_model)
+        
+        if rebuild_vector_store:
+            from src.data.pdf_processor import PDFProcessor
+            from src.data.page_cache import page_cache_dir
+            from src.data.text_splitter import DocumentSplitter
+            from src.data.ingestion import IngestionPipeline
+            
+            logger.info("Rebuilding vector store")
+            pdf_processor = PDFProcessor(
+                config["pdf_dir"],
+                num_workers=config.get("extraction_workers"),
+                pages_per_task=config.get("extraction_pages_per_task", 100),
+                cache_dir=page_cache_dir(config)
+            )
+            
+            doc_splitter = DocumentSplitter(
+                chunk_size=config["chunk_size"],
+                chunk_overlap=config["chunk_overlap"]
+            )
+            
+            # Stream documents into the vector store
+            pipeline = IngestionPipeline(pdf_processor, doc_splitter, vector_store_manager)
+            vector_store = pipeline.run()
+        else:
+            vector_store = vector_store_manager.load()
+            
+    return embedding_model, vector_store
+
+def load_llm():
+    """
+    Load the LLM, the optional draft model and the generation pipeline.
+    
+    Returns:
+        Tuple of (llm_pipeline, tokenizer)
+    """
+    timer = get_startup_timer()
+    
+    with timer.phase("llm"):
+        from src.llm.load_models import LlamaLoader
+        from src.llm.pipeline import LlamaPipeline
+        
+        model_loader = LlamaLoader()
+        model, tokenizer = model_loader.load_model_and_tokenizer()
+        
+    with timer.phase("draft_model"):
+        assistant_model = model_loader.load_draft_model(tokenizer)
+        
+    llm_pipeline = LlamaPipeline(model, tokenizer, assistant_model=assistant_model)
+    
+    return llm_pipeline, tokenizer
+
+def load_components(config, rebuild_vector_store=False):
+    """
+    Load the vector store and the LLM, concurrently when configured.
+    
+    Both loads are dominated by reading weights and native code that
+    releases the GIL, so running them side by side hides the shorter one.
+    
+    Args:
+        config: Configuration dictionary
+        rebuild_vector_store: Whether to rebuild the vector store
+        
+    Returns:
+        Tuple of (embedding_model, vector_store, llm_pipeline, tokenizer)
+    """
+    if not config.get("parallel_startup", True):
+        embedding_model, vector_store = load_vector_store(config, rebuild_vector_store)
+        llm_pipeline, tokenizer = load_llm()
+        return embedding_model, vector_store, llm_pipeline, tokenizer
+        
+    llm_task = BackgroundTask(load_llm, name="load-llm")
+    embedding_model, vector_store = load_vector_store(config, rebuild_vector_store)
+    llm_pipeline, tokenizer = llm_task.result()
+    
+    return embedding_model, vector_store, llm_pipeline, tokenizer
+
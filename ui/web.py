@@ -1,15 +1,8 @@
 import gradio as gr
-from src.data.pdf_processor import PDFProcessor
-from src.data.text_splitter import DocumentSplitter
-from src.embeddings.embeddor import Embedder
-from src.embeddings.vector_store import VectorStore
-from src.llm.load_models import LlamaLoader
-from src.llm.pipeline import LlamaPipeline
-from src.retrival import Retriever
-from src.chat.memory import ConversationMemory
-from src.chat.chain import ChatChain
 from src.config.config import get_config
-from src.config.config import get_logger, setup_logging
+from src.config.logging import get_logger, setup_logging
+from src.monitoring.startup import get_startup_timer
+from ui.components import load_components, load_vector_store
 import os
 
 logger = get_logger(__name__)
@@ -24,6 +17,10 @@ class WebInterface:
         setup_logging()
         self.config = get_config()
         self.chain = None
+        self.sessions = None
+        self.llm_pipeline = None
+        self.tokenizer = None
+        self.generator = None
         
     def setup(self, rebuild_vector_store=False, pdf_dir=None):
         """
@@ -42,92 +39,117 @@ class WebInterface:
         if pdf_dir:
             self.config["pdf_dir"] = pdf_dir
         
-        # Set up embedding model
-        embedder = Embedder()
-        embedding_model = embedder.get_embedder()
-        
-        # Set up vector store
-        vector_store_manager = VectorStore(embedding_model)
-        
-        # Check if we need to rebuild the vector store
-        if rebuild_vector_store:
-            logger.info("Rebuilding vector store")
-            # Process PDFs
-            pdf_processor = PDFProcessor(self.config["pdf_dir"])
-            documents = pdf_processor.process_all_pdfs()
-            
-            # Split documents
-            doc_splitter = DocumentSplitter(
-                chunk_size=self.config["chunk_size"],
-                chunk_overlap=self.config["chunk_overlap"]
-            )
-            chunks = doc_splitter.split_documents(documents)
-            
-            # Create vector store
-            vector_store = vector_store_manager.create_from_documents(chunks)
+        if self.llm_pipeline is None:
+            # Load the vector store and the LLM concurrently
+            embedding_model, vector_store, self.llm_pipeline, self.tokenizer = load_components(self.config, rebuild_vector_store)
         else:
-            # Load existing vector store
-            vector_store = vector_store_manager.load()
+            # A rebuild from the UI only replaces the vector store, the loaded
+            # model and its generation scheduler are kept
+            embedding_model, vector_store = load_vector_store(self.config, rebuild_vector_store)
+        
+        with get_startup_timer().phase("chain"):
+            self.chain = self._create_chain(embedding_model, vector_store, self.llm_pipeline, self.tokenizer)
         
-        # Set up model
-        model_loader = LlamaLoader()
-        model, tokenizer = model_loader.load_model_and_tokenizer()
+        return self.chain
+    
+    def _create_chain(self, embedding_model, vector_store, llm_pipeline, tokenizer):
+        """Wire the loaded components into a ChatChain."""
+        from src.llm.scheduler import GenerationScheduler
+        from src.retrival.retrival import Retriever
+        from src.chat.memory import ConversationMemory
+        from src.chat.chain import ChatChain
+        from src.chat.condense import QuestionCondenser
         
-        # Set up pipeline
-        llm_pipeline = LlamaPipeline(model, tokenizer)
         llm = llm_pipeline.create_langchain_pipeline()
         
+        # Batch generation of concurrent users, one scheduler for the process
+        if self.generator is None:
+            self.generator = GenerationScheduler.from_config(llm_pipeline)
+        generator = self.generator
+        
         # Set up retriever
         retriever_manager = Retriever(vector_store)
-        retriever = retriever_manager.get_retriever()
+        retriever = retriever_manager.get_retriever(tokenizer=tokenizer)
         
         # Set up memory
         memory_manager = ConversationMemory()
         memory = memory_manager.create_memory()
+        self.sessions = memory_manager.create_session_store(tokenizer=tokenizer)
         
         # Set up chain
-        chain_manager = ChatChain(llm, retriever, memory)
-        chain = chain_manager.create_chain()
-        
-        self.chain = chain
-        return chain
+        condenser = QuestionCondenser.from_config(generator)
+        
+        chain_manager = ChatChain(
+            llm,
+            retriever,
+            memory,
+            embeddings=embedding_model,
+            generator=generator,
+            condenser=condenser
+        )
+        chain_manager.create_chain()
+        
+        return chain_manager
+    
+    @staticmethod
+    def session_id(request: gr.Request) -> str:
+        """Key of the browser session a request belongs to."""
+        return request.session_hash if request is not None and request.session_hash else "default"
     
-    def process_query(self, message, history):
+    def process_query(self, message, history, request: gr.Request = None):
         """
-        Process a query and return the response.
+        Process a query and stream the response into the chat.
+        
+        Every browser session has its own bounded conversation memory.
         
         Args:
             message: User query
-            history: Chat history
+            history: Chat history as [user, bot] pairs
+            request: Gradio request identifying the session
             
-        Returns:
-            Bot response
+        Yields:
+            Chat history with the partial bot response
         """
+        history = list(history or [])
+        
         if not self.chain:
-            return "Error: Chatbot not initialized properly. Please check logs."
+            yield history + [[message, "Error: Chatbot not initialized properly. Please check logs."]]
+            return
         
         try:
-            # Get response from chain
-            response = self.chain({"question": message})
-            
-            # Format response
-            formatted = ChatChain.format_response(response)
-            
-            # Format sources for display
-            source_text = ""
-            if formatted["sources"]:
-                source_text = "\n\n**Sources:**\n"
-                for i, source in enumerate(formatted["sources"]):
-                    source_text += f"- {source['source']}\n"
-            
-            # Combine answer and sources
-            full_response = formatted["answer"] + source_text
-            
-            return full_response
+            answer = ""
+            memory = self.sessions.get(self.session_id(request))
+            for event in self.chain.stream(message, memory=memory):
+                if event["type"] == "token":
+                    answer += event["text"]
+                    yield history + [[message, answer]]
+                    continue
+                
+                formatted = event["response"]
+                
+                # Format sources for display
+                source_text = ""
+                if formatted["sources"]:
+                    source_text = "\n\n**Sources:**\n"
+                    for i, source in enumerate(formatted["sources"]):
+                        page = f", page {source['page']}" if source.get("page") else ""
+                        source_text += f"- {source['source']}{page}\n"
+                
+                timings = formatted["timings"]
+                logger.info(f"First token {timings['first_token']:.2f}s, total {timings['total']:.2f}s")
+                
+                # Combine answer and sources
+                yield history + [[message, formatted["answer"] + source_text]]
             
         except Exception as e:
             logger.error(f"Error in web chat: {str(e)}")
-            return "An error occurred while processing your query. Please try again."
+            yield history + [[message, "An error occurred while processing your query. Please try again."]]
+    
+    def clear_history(self, request: gr.Request = None):
+        """Clear the session's conversation memory and the chat display."""
+        if self.sessions:
+            self.sessions.clear(self.session_id(request))
+        return None
     
     def get_pdf_files(self):
         """Get list of PDF files in the configured directory."""
@@ -166,7 +188,7 @@ class WebInterface:
             # Set up interactions
             submit_btn.click(self.process_query, inputs=[msg, chatbot], outputs=[chatbot])
             msg.submit(self.process_query, inputs=[msg, chatbot], outputs=[chatbot])
-            clear_btn.click(lambda: None, None, chatbot, queue=False)
+            clear_btn.click(self.clear_history, None, chatbot, queue=False)
             
             # Rebuild knowledge base
             rebuild_btn.click(
@@ -176,5 +198,20 @@ class WebInterface:
                 queue=True
             )
         
+        # Let concurrent requests reach the generation scheduler; without one
+        # (batching off or a draft model) requests would call generate() on
+        # the same model concurrently, so they are served one at a time
+        concurrency = self.config.get("web_concurrency", 8)
+        if self.generator is None or self.generator is self.llm_pipeline:
+            concurrency = 1
+        try:
+            demo.queue(default_concurrency_limit=concurrency)
+        except TypeError:  # Gradio 3.x
+            demo.queue(concurrency_count=concurrency)
+        
+        timer = get_startup_timer()
+        timer.mark("ui_ready")
+        timer.log()
+        
         # Launch the interface
         demo.launch(share=True)
\ No newline at end of file